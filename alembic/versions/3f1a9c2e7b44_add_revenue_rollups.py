@@ -0,0 +1,55 @@
+"""add_revenue_rollups
+
+Revision ID: 3f1a9c2e7b44
+Revises: 6d75ae6805b5
+Create Date: 2026-10-18 09:12:41.503218
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3f1a9c2e7b44"
+down_revision: Union[str, None] = "6d75ae6805b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "daily_revenue",
+        sa.Column("sale_date", sa.Date(), nullable=False),
+        sa.Column("total_amount", sa.DECIMAL(precision=14, scale=2), nullable=False),
+        sa.Column("sale_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("sale_date"),
+    )
+    op.create_table(
+        "daily_category_revenue",
+        sa.Column("category", sa.String(length=255), nullable=False),
+        sa.Column("sale_date", sa.Date(), nullable=False),
+        sa.Column("total_amount", sa.DECIMAL(precision=14, scale=2), nullable=False),
+        sa.Column("sale_count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("category", "sale_date"),
+    )
+
+    # Backfill from existing sales so the revenue endpoints stay correct right after upgrading.
+    op.execute(
+        "INSERT INTO daily_revenue (sale_date, total_amount, sale_count) "
+        "SELECT sale_date, SUM(total_amount), COUNT(id) FROM sales GROUP BY sale_date"
+    )
+    op.execute(
+        "INSERT INTO daily_category_revenue (category, sale_date, total_amount, sale_count) "
+        "SELECT products.category, sales.sale_date, SUM(sales.total_amount), COUNT(sales.id) "
+        "FROM sales JOIN products ON sales.product_id = products.id "
+        "GROUP BY products.category, sales.sale_date"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("daily_category_revenue")
+    op.drop_table("daily_revenue")
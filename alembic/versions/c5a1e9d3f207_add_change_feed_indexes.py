@@ -0,0 +1,35 @@
+"""add_change_feed_indexes
+
+Revision ID: c5a1e9d3f207
+Revises: 8b2d4e6f1a35
+Create Date: 2026-10-18 12:41:05.219874
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5a1e9d3f207"
+down_revision: Union[str, None] = "8b2d4e6f1a35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing sales get the migration time, which only delays them in the change feed by its settle interval.
+    op.add_column(
+        "sales", sa.Column("created_at", sa.TIMESTAMP(timezone=True), server_default=sa.text("now()"), nullable=False)
+    )
+    op.create_index("ix_products_updated_at_id", "products", ["updated_at", "id"], unique=False)
+    op.create_index("ix_inventory_last_updated_id", "inventory", ["last_updated", "id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_inventory_last_updated_id", table_name="inventory")
+    op.drop_index("ix_products_updated_at_id", table_name="products")
+    op.drop_column("sales", "created_at")
@@ -0,0 +1,48 @@
+"""add_sales_category
+
+Revision ID: d4b7e2a9c613
+Revises: c5a1e9d3f207
+Create Date: 2026-10-18 16:05:37.441092
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4b7e2a9c613"
+down_revision: Union[str, None] = "c5a1e9d3f207"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Sales backfilled per UPDATE; each batch commits on its own so no statement locks the whole table.
+BACKFILL_BATCH_SIZE = 10_000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("sales", sa.Column("category", sa.String(length=255), nullable=True))
+
+    bind = op.get_bind()
+    last_id = bind.execute(sa.text("SELECT MAX(id) FROM sales")).scalar() or 0
+    for start in range(0, last_id, BACKFILL_BATCH_SIZE):
+        with op.get_context().autocommit_block():
+            bind.execute(
+                sa.text(
+                    "UPDATE sales SET category = "
+                    "(SELECT products.category FROM products WHERE products.id = sales.product_id) "
+                    "WHERE sales.id > :start AND sales.id <= :end"
+                ),
+                {"start": start, "end": start + BACKFILL_BATCH_SIZE},
+            )
+
+    op.alter_column("sales", "category", existing_type=sa.String(length=255), nullable=False)
+    op.create_index("ix_sales_category_sale_date", "sales", ["category", "sale_date"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_sales_category_sale_date", table_name="sales")
+    op.drop_column("sales", "category")
@@ -0,0 +1,286 @@
+"""Async counterparts of ``app.services`` used when ``DB_ASYNC`` is enabled.
+
+They mirror the sync services method for method and raise the same errors. Pure reporting
+queries are delegated to the sync implementations through ``AsyncSession.run_sync`` so the
+SQL stays defined in one place. Columnar snapshot aggregations run in a worker thread instead, since
+refreshing the snapshot reads the primary through the sync engine and waits on a file lock. They share the sync services' caches, but concurrent identical
+revenue queries are not coalesced here: waiting on another request's query would block the event loop.
+"""
+
+import asyncio
+from collections.abc import Sequence
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app import models, schemas
+from app.cache import ResultScope
+from app.columnar import columnar_snapshot
+from app.conditional import watermark_query
+from app.config import DEFAULT_PAGE_SIZE
+from app.pagination import Page, before_keyset, decode_cursor
+from app.services import ProductService, RevenueRollupService, SaleService
+from app.stock_events import record_stock_change, stock_events
+
+
+class AsyncProductService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_product(self, product: schemas.ProductCreate) -> models.Product:
+        db_product = models.Product(**product.model_dump())
+        self.db.add(db_product)
+        await self.db.commit()
+        await self.db.refresh(db_product)
+        ProductService.cache.invalidate(db_product.id)
+        return db_product
+
+    async def get_product(self, product_id: int) -> Optional[schemas.Product]:
+        product = ProductService.cache.get(product_id)
+        if product is None:
+            db_product = await self.db.scalar(select(models.Product).where(models.Product.id == product_id))
+            if db_product is None:
+                return None
+            product = schemas.Product.model_validate(db_product)
+            ProductService.cache.set(product_id, product)
+        return product
+
+    async def get_products(
+        self,
+        skip: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[InstrumentedAttribute]] = None,
+    ) -> Page[models.Product]:
+        stmt = select(*columns) if columns else select(models.Product)
+        if cursor:
+            (last_id,) = decode_cursor(cursor, int)
+            stmt = stmt.where(models.Product.id > last_id)
+        elif skip:
+            stmt = stmt.offset(skip)
+
+        stmt = stmt.order_by(models.Product.id).limit(limit + 1)
+        rows = (await self.db.execute(stmt)).all() if columns else (await self.db.scalars(stmt)).all()
+        return Page.from_rows(rows, limit, lambda p: (p.id,))
+
+    async def get_watermark(self) -> tuple:
+        return tuple((await self.db.execute(watermark_query(models.Product.id, models.Product.updated_at))).one())
+
+
+class AsyncInventoryService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_inventory(self, inventory: schemas.InventoryCreate) -> models.Inventory:
+        if await self.get_inventory(inventory.product_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Inventory already exists for product_id {inventory.product_id}",
+            )
+
+        if not await AsyncProductService(self.db).get_product(inventory.product_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Product with id {inventory.product_id} does not exist",
+            )
+
+        db_inventory = models.Inventory(**inventory.model_dump())
+        self.db.add(db_inventory)
+
+        log = models.InventoryLog(product_id=inventory.product_id, change=inventory.stock, reason="initial stock")
+        self.db.add(log)
+        record_stock_change(self.db, inventory.product_id, inventory.stock, None, "initial stock")
+
+        await self.db.commit()
+        await self.db.refresh(db_inventory)
+        return db_inventory
+
+    async def get_inventory(self, product_id: int) -> Optional[models.Inventory]:
+        return await self.db.scalar(select(models.Inventory).where(models.Inventory.product_id == product_id))
+
+    async def get_all_inventory(
+        self, columns: Optional[Sequence[InstrumentedAttribute]] = None
+    ) -> list[models.Inventory]:
+        if columns:
+            return list((await self.db.execute(select(*columns))).all())
+        return list((await self.db.scalars(select(models.Inventory))).all())
+
+    async def get_watermark(self) -> tuple:
+        stmt = watermark_query(models.Inventory.id, models.Inventory.last_updated)
+        return tuple((await self.db.execute(stmt)).one())
+
+    async def get_low_stock(
+        self, threshold: int = 10, columns: Optional[Sequence[InstrumentedAttribute]] = None
+    ) -> list[models.Inventory]:
+        stmt = (select(*columns) if columns else select(models.Inventory)).where(models.Inventory.stock < threshold)
+        return list((await self.db.execute(stmt)).all() if columns else (await self.db.scalars(stmt)).all())
+
+    async def update_inventory_stock(self, product_id: int, stock: int) -> Optional[models.Inventory]:
+        inventory = await self.get_inventory(product_id)
+        if inventory:
+            change = stock - inventory.stock
+            record_stock_change(self.db, product_id, stock, inventory.stock, "manual adjustment")
+            inventory.stock = stock
+
+            log = models.InventoryLog(product_id=product_id, change=change, reason="manual adjustment")
+            self.db.add(log)
+            await self.db.commit()
+            await self.db.refresh(inventory)
+        return inventory
+
+    async def get_logs(
+        self,
+        product_id: int,
+        skip: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[InstrumentedAttribute]] = None,
+    ) -> Page[models.InventoryLog]:
+        if not await AsyncProductService(self.db).get_product(product_id):
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Product with id {product_id} not found")
+
+        log = models.InventoryLog
+        stmt = (select(*columns) if columns else select(log)).where(log.product_id == product_id)
+        if cursor:
+            changed_at, last_id = decode_cursor(cursor, datetime, int)
+            stmt = stmt.where(before_keyset(log.changed_at, changed_at, log.id, last_id))
+        elif skip:
+            stmt = stmt.offset(skip)
+
+        stmt = stmt.order_by(log.changed_at.desc(), log.id.desc()).limit(limit + 1)
+        rows = (await self.db.execute(stmt)).all() if columns else (await self.db.scalars(stmt)).all()
+        return Page.from_rows(rows, limit, lambda r: (r.changed_at, r.id))
+
+
+class AsyncSaleService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create_sale(self, sale: schemas.SaleCreate) -> schemas.Sale:
+        try:
+            product = ProductService.cache.get(sale.product_id)
+            returning = (product is None or stock_events.enabled) and self.db.get_bind().dialect.update_returning
+
+            result = await self.db.execute(
+                SaleService._decrement_stock_statement(
+                    sale.product_id, sale.quantity, returning, with_product=product is None
+                )
+            )
+            updated = None
+            if returning:
+                updated = result.first()
+                decremented = updated is not None
+            else:
+                decremented = result.rowcount > 0
+            if not decremented:
+                await self.db.rollback()
+                row = (await self.db.execute(SaleService._sale_rejection_statement(sale.product_id))).first()
+                raise SaleService._sale_rejection_error(row, sale)
+
+            if product is None:
+                product = updated or await AsyncProductService(self.db).get_product(sale.product_id)
+            price, category = product.price, product.category
+            if stock_events.enabled:
+                stock = (
+                    updated.stock if updated else await self.db.scalar(SaleService._stock_statement(sale.product_id))
+                )
+                record_stock_change(self.db, sale.product_id, stock, stock + sale.quantity, "sale")
+
+            total_amount = price * sale.quantity
+            db_sale = models.Sale(
+                product_id=sale.product_id,
+                quantity=sale.quantity,
+                sale_date=sale.sale_date,
+                total_amount=total_amount,
+                category=category,
+            )
+            self.db.add(db_sale)
+
+            log = models.InventoryLog(product_id=sale.product_id, change=-sale.quantity, reason="sale")
+            self.db.add(log)
+
+            await self.db.run_sync(
+                lambda session: RevenueRollupService(session).apply(sale.sale_date, category, total_amount)
+            )
+
+            await self.db.flush()
+            created = schemas.Sale.model_validate(db_sale)
+            await self.db.commit()
+            SaleService.analytics_cache.invalidate(sale.sale_date, category)
+            return created
+        except SQLAlchemyError:
+            await self.db.rollback()
+            raise HTTPException(status_code=500, detail="Internal server error during sale transaction")
+
+    async def get_filtered_sales(
+        self,
+        product_id: Optional[int] = None,
+        category: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[InstrumentedAttribute]] = None,
+    ) -> Page[models.Sale]:
+        stmt = select(*columns) if columns else select(models.Sale)
+        stmt = SaleService._filter_sales(stmt, product_id, category, start_date, end_date)
+
+        if cursor:
+            sale_date, last_id = decode_cursor(cursor, date, int)
+            stmt = stmt.where(before_keyset(models.Sale.sale_date, sale_date, models.Sale.id, last_id))
+
+        stmt = stmt.order_by(models.Sale.sale_date.desc(), models.Sale.id.desc()).limit(limit + 1)
+        rows = (await self.db.execute(stmt)).all() if columns else (await self.db.scalars(stmt)).all()
+        return Page.from_rows(rows, limit, lambda s: (s.sale_date, s.id))
+
+    async def get_revenue_by_period(
+        self, period: str = "day", start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> list[dict]:
+        key = SaleService._revenue_by_period_key(period, start_date, end_date)
+        results = SaleService.analytics_cache.peek(key)
+        if results is None:
+            generation = SaleService.analytics_cache.generation()
+            snapshot = columnar_snapshot(self.db.sync_session)
+            if snapshot is not None:
+                results = await asyncio.to_thread(snapshot.revenue_by_period, period, start_date, end_date)
+            else:
+                results = await self.db.run_sync(
+                    lambda session: SaleService(session)._sql_revenue_by_period(period, start_date, end_date)
+                )
+            scope = ResultScope(start_date=start_date, end_date=end_date)
+            SaleService.analytics_cache.put(key, results, scope, generation)
+        return results
+
+    async def get_revenue_comparison(
+        self,
+        period: str = "month",
+        category: Optional[str] = None,
+        compare_periods: int = 2,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> list[dict]:
+        key = SaleService._revenue_comparison_key(period, category, compare_periods, start_date, end_date)
+        results = SaleService.analytics_cache.peek(key)
+        if results is None:
+            generation = SaleService.analytics_cache.generation()
+            snapshot = columnar_snapshot(self.db.sync_session)
+            if snapshot is not None:
+                results = await asyncio.to_thread(
+                    snapshot.revenue_comparison, period, category, compare_periods, start_date, end_date
+                )
+            else:
+                results = await self.db.run_sync(
+                    lambda session: SaleService(session)._sql_revenue_comparison(
+                        period, category, compare_periods, start_date, end_date
+                    )
+                )
+            scope = SaleService._revenue_comparison_scope(
+                period, category, compare_periods, start_date, end_date, results
+            )
+            SaleService.analytics_cache.put(key, results, scope, generation)
+        return results
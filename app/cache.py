@@ -0,0 +1,256 @@
+"""In-process caches used by the service layer.
+
+``Cache`` is the interface the services depend on, so a shared backend (e.g. Redis) can be
+swapped in by assigning another implementation to the service's ``cache`` attribute.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Cache(ABC):
+    """Minimal cache interface: ``get`` returns ``None`` on a miss."""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]: ...
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any) -> None: ...
+
+    @abstractmethod
+    def invalidate(self, key: Hashable) -> None: ...
+
+    @abstractmethod
+    def clear(self) -> None: ...
+
+    @abstractmethod
+    def stats(self) -> dict[str, Any]: ...
+
+
+class NullCache(Cache):
+    """Cache that stores nothing, used when caching is switched off."""
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        pass
+
+    def invalidate(self, key: Hashable) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+    def stats(self) -> dict[str, Any]:
+        return {"enabled": False}
+
+
+class LRUCache(Cache):
+    """Thread-safe, size-bounded LRU cache whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Any], bool]) -> int:
+        """Drops every entry whose value matches ``predicate``; returns how many were dropped."""
+        with self._lock:
+            keys = [key for key, (_, value) in self._entries.items() if predicate(value)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": True,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+def build_cache(enabled: bool, maxsize: int, ttl: float) -> Cache:
+    return LRUCache(maxsize=maxsize, ttl=ttl) if enabled and maxsize > 0 else NullCache()
+
+
+@dataclass(frozen=True)
+class ResultScope:
+    """The slice of sales a cached result was computed from; ``None`` means unbounded."""
+
+    category: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    def covers(self, sale_date: date, category: str) -> bool:
+        return (
+            (self.category is None or self.category == category)
+            and (self.start_date is None or sale_date >= self.start_date)
+            and (self.end_date is None or sale_date <= self.end_date)
+        )
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.stale = False
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class ResultCache:
+    """Caches aggregate query results and invalidates them by the sales they depend on.
+
+    ``get_or_compute`` coalesces concurrent calls for the same key: one caller runs the query
+    while the others block until its result is ready. A result whose computation overlapped an
+    invalidation is handed to the waiting callers but not stored. Callers that compute on their
+    own (the async services) get the same guarantee by taking a ``generation`` before computing
+    and passing it to ``put``.
+
+    Each result is stored in the LRU together with its scope, so evicted and expired results take
+    their scopes with them and an invalidation scans at most ``maxsize`` entries.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, enabled: bool = True, clock: Callable[[], float] = time.monotonic):
+        self.enabled = enabled and maxsize > 0
+        # Values are (scope, result) pairs.
+        self._entries = LRUCache(maxsize=maxsize, ttl=ttl, clock=clock)
+        self._flights: dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by every invalidation
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T], scope: Callable[[T], ResultScope]) -> T:
+        if not self.enabled:
+            return compute()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry[1]
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+                if flight.error is None and not flight.stale:
+                    self._entries.set(key, (scope(flight.value), flight.value))
+            flight.done.set()
+        return flight.value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key) if self.enabled else None
+        return entry[1] if entry is not None else None
+
+    def generation(self) -> int:
+        """A token to take before computing a result that will be ``put``."""
+        with self._lock:
+            return self._generation
+
+    def put(self, key: Hashable, value: Any, scope: ResultScope, generation: Optional[int] = None) -> None:
+        """Stores ``value``, unless an invalidation happened since ``generation`` was taken."""
+        if self.enabled:
+            with self._lock:
+                if generation is None or generation == self._generation:
+                    self._entries.set(key, (scope, value))
+
+    def invalidate(self, sale_date: date, category: str) -> None:
+        """Drops every cached result whose scope includes a sale on ``sale_date`` in ``category``."""
+        if not self.enabled:
+            return
+        with self._lock:
+            # Results being computed right now may or may not include the new sale; don't keep them.
+            self._generation += 1
+            for flight in self._flights.values():
+                flight.stale = True
+            self._flights.clear()
+
+            self.invalidations += self._entries.invalidate_where(lambda entry: entry[0].covers(sale_date, category))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            for flight in self._flights.values():
+                flight.stale = True
+            self._flights.clear()
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        if not self.enabled:
+            return {"enabled": False}
+        return {**self._entries.stats(), "coalesced": self.coalesced, "invalidations": self.invalidations}
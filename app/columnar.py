@@ -0,0 +1,378 @@
+"""Columnar sales snapshot for the revenue endpoints.
+
+With ``ANALYTICS_ENGINE=columnar``, ``/sales/revenue`` and ``/sales/revenue/comparison`` aggregate over a
+copy of ``sales`` kept as NumPy columns instead of querying the revenue rollups. Each column is a file in
+``COLUMNAR_DIR``, memory-mapped so the operating system pages it in and shares it between worker processes:
+
+- ``sale_date``: days since 1970-01-01 (int32)
+- ``category``: ``sales.category``, as an index into ``categories.json`` (int32)
+- ``total_cents``: ``total_amount`` in cents (int64)
+
+Each query first appends the sales added since the previous one, in id order. They are always read from the
+primary, whichever session the route was given, so a lagging read replica can't hold the snapshot back or
+make it look as if sales were deleted. Sales younger than ``CHANGES_SETTLE_SECONDS`` are only held in
+memory and read again by the next query, because a transaction that commits late can still add lower ids
+behind them. Older sales are appended to the files and recorded in ``meta.json``. A file lock serialises
+appends between processes. Where ``fcntl`` is missing (Windows) there is no lock, so only one process may
+use a snapshot directory there.
+
+Revenue is grouped by summing cents per integer period key with ``np.bincount``, so a query costs a few
+passes over the columns however many periods it returns. The mapped columns and the unsettled rows are
+summed separately and their per-period sums added, so the maps are never copied. Week numbers follow the
+database's ``EXTRACT(WEEK)``.
+SQLite uses ``%W``, where weeks start on Monday. MySQL uses ``WEEK(date, 0)``, where weeks start on Sunday.
+Other backends keep using SQL.
+
+The API only ever appends sales, except that renaming a product's category rewrites its sales. That marks
+the snapshot dirty, and the next query rebuilds it. If sales are changed or deleted some other way, or a
+product's category is changed outside the app, run ``scripts/check_columnar.py``. It compares the snapshot
+with the SQL answers, and rebuilds it when given ``--rebuild``.
+
+NumPy is optional (``poetry install --extras columnar``). Without it, SQL is used.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import takewhile
+from typing import Any, Optional
+
+from loguru import logger
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import database, models
+from app.config import (
+    ANALYTICS_ENGINE,
+    CHANGES_SETTLE_SECONDS,
+    COLUMNAR_DIR,
+    EXPORT_CHUNK_SIZE,
+)
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+FORMAT_VERSION = 1
+COLUMNS = {"sale_date": "int32", "category": "int32", "total_cents": "int64"}
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Day 0 was a Thursday: its position in the week, by backend, for the week numbering described above
+WEEK_OFFSETS = {"sqlite": 3, "mysql": 4}
+# Week keys are year * WEEKS_PER_KEY + week
+WEEKS_PER_KEY = 64
+
+
+def period_keys(days, period: str, week_offset: int):
+    """Integer key of the period each day (days since 1970-01-01) falls in."""
+    if period == "day":
+        return days.astype(np.int64)
+    calendar_days = days.astype("datetime64[D]")
+    if period == "month":
+        return calendar_days.astype("datetime64[M]").astype(np.int64)  # months since 1970-01
+    years = calendar_days.astype("datetime64[Y]").astype(np.int64) + 1970
+    if period == "week":
+        day_of_year = (calendar_days - calendar_days.astype("datetime64[Y]")).astype(np.int64)
+        weeks = (day_of_year + 7 - (days.astype(np.int64) + week_offset) % 7) // 7
+        return years * WEEKS_PER_KEY + weeks
+    return years
+
+
+def sum_by_key(keys, cents) -> tuple[Any, Any]:
+    """Keys that occur, ascending, and the cents summed for each."""
+    if not len(keys):
+        return keys, cents
+    low = keys.min()
+    shifted = keys - low
+    present = np.flatnonzero(np.bincount(shifted))
+    totals = np.bincount(shifted, weights=cents)[present]
+    # float64 sums of whole cents are exact below 2**53 cents
+    return present + low, np.rint(totals).astype(np.int64)
+
+
+class SalesSnapshot:
+    """The memory-mapped columns in ``directory`` and the revenue aggregations over them. Thread-safe.
+
+    Sales are read from ``engine``, the primary database (``database.engine``) unless given.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        settle_seconds: float = CHANGES_SETTLE_SECONDS,
+        chunk_size: int = EXPORT_CHUNK_SIZE,
+        engine: Optional[Engine] = None,
+    ):
+        self.directory = directory
+        self.settle_seconds = settle_seconds
+        self.chunk_size = chunk_size
+        self.engine = engine or database.engine
+        self._lock = threading.Lock()
+        self._meta: dict[str, Any] = {}
+        self._categories: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._columns: dict[str, Any] = {}  # memory maps of the rows in meta.json
+        self._tail: dict[str, Any] = {}  # unsettled rows, read again on every refresh
+        self._dirty = False
+
+    def revenue_by_period(self, period: str, start_date: Optional[date], end_date: Optional[date]) -> list[dict]:
+        """``SaleService.get_revenue_by_period`` results, in ascending period order."""
+        if period not in ("day", "week", "month", "year"):
+            return []
+        keys, totals = self._sum_by_period(period, start_date, end_date)
+
+        results = []
+        for key, total in zip(keys.tolist(), totals.tolist()):
+            total_amount = total / 100
+            if period == "day":
+                results.append({"date": date.fromordinal(EPOCH_ORDINAL + key), "total_amount": total_amount})
+            elif period == "week":
+                year, week = divmod(key, WEEKS_PER_KEY)
+                results.append({"year": year, "week": week, "total_amount": total_amount})
+            elif period == "month":
+                year, month = divmod(key, 12)
+                results.append({"year": year + 1970, "month": month + 1, "total_amount": total_amount})
+            else:
+                results.append({"year": key, "total_amount": total_amount})
+        return results
+
+    def revenue_comparison(
+        self,
+        period: str,
+        category: Optional[str],
+        compare_periods: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> list[dict]:
+        """``SaleService.get_revenue_comparison`` results: the newest ``compare_periods`` periods, newest first."""
+        period = period if period in ("day", "week", "month") else "year"
+        keys, totals = self._sum_by_period(period, start_date, end_date, category)
+
+        newest = list(zip(keys.tolist(), totals.tolist()))[::-1]
+        results = []
+        for key, total in newest[:compare_periods] if compare_periods >= 0 else newest:
+            if period == "day":
+                label = date.fromordinal(EPOCH_ORDINAL + key).isoformat()
+            elif period == "week":
+                label = "{}-W{:02d}".format(*divmod(key, WEEKS_PER_KEY))
+            elif period == "month":
+                label = f"{key // 12 + 1970}-{key % 12 + 1:02d}"
+            else:
+                label = str(key)
+            results.append({"total_amount": total / 100, "category": category if category else "all", "period": label})
+        return results
+
+    def columns(self) -> tuple[list[dict[str, Any]], dict[str, int]]:
+        """The mapped columns and the unsettled rows, brought up to date with ``sales``, and the category codes."""
+        with self._lock, self._file_lock():
+            self._refresh()
+            return [dict(self._columns), dict(self._tail)], dict(self._codes)
+
+    def rebuild(self) -> int:
+        """Rebuilds the snapshot from scratch; returns the number of rows written."""
+        with self._lock, self._file_lock():
+            self._reset(self._source())
+            self._refresh()
+            return self._meta["rows"]
+
+    def mark_dirty(self) -> None:
+        """Makes the next refresh rebuild the snapshot, after sales changed in ways appending can't pick up."""
+        with self._lock:
+            self._dirty = True
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "rows": self._meta.get("rows", 0),
+                "last_id": self._meta.get("last_id", 0),
+                "unsettled_rows": len(self._tail.get("sale_date", ())),
+                "categories": len(self._categories),
+            }
+
+    def _sum_by_period(
+        self, period: str, start_date: Optional[date], end_date: Optional[date], category: Optional[str] = None
+    ) -> tuple[Any, Any]:
+        parts, codes = self.columns()
+        week_offset = WEEK_OFFSETS[self.engine.dialect.name]
+        sums = [
+            sum_by_key(period_keys(days, period, week_offset), cents)
+            for days, cents in (self._select(part, codes, start_date, end_date, category) for part in parts)
+        ]
+        # Only the per-period sums are joined, so the mapped columns are never copied.
+        return sum_by_key(np.concatenate([keys for keys, _ in sums]), np.concatenate([totals for _, totals in sums]))
+
+    @staticmethod
+    def _select(columns, codes, start_date, end_date, category=None) -> tuple[Any, Any]:
+        days, cents = columns["sale_date"], columns["total_cents"]
+        if category and category not in codes:
+            return days[:0], cents[:0]
+        if not (start_date or end_date or category):
+            return days, cents
+        mask = np.ones(len(days), dtype=bool)
+        if start_date:
+            mask &= days >= start_date.toordinal() - EPOCH_ORDINAL
+        if end_date:
+            mask &= days <= end_date.toordinal() - EPOCH_ORDINAL
+        if category:
+            mask &= columns["category"] == codes[category]
+        return days[mask], cents[mask]
+
+    def _refresh(self) -> None:
+        source = self._source()
+        self._load(source)
+        if self._dirty:
+            self._reset(source)
+            self._dirty = False
+        with Session(self.engine) as db:
+            self._read_new_sales(db, source)
+
+    def _read_new_sales(self, db: Session, source: str) -> None:
+        if (db.scalar(select(func.max(models.Sale.id))) or 0) < self._meta["last_id"]:
+            logger.warning("Sales were deleted since the columnar snapshot was built; rebuilding it")
+            self._reset(source)
+
+        cutoff = db.scalar(select(func.now())) - timedelta(seconds=self.settle_seconds)
+        stmt = (
+            select(
+                models.Sale.id,
+                models.Sale.sale_date,
+                models.Sale.category,
+                models.Sale.total_amount,
+                models.Sale.created_at,
+            )
+            .where(models.Sale.id > self._meta["last_id"])
+            .order_by(models.Sale.id)
+        )
+        tail: list = []
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=self.chunk_size))
+        for rows in result.partitions():
+            if not tail:
+                # Stop at the first unsettled sale: nothing behind it may be passed over.
+                settled = list(takewhile(lambda row: row.created_at < cutoff, rows))
+                self._append(settled)
+                rows = rows[len(settled) :]
+            tail.extend(rows)
+        self._tail = self._encode(tail)
+
+    def _load(self, source: str) -> None:
+        """Maps the rows another process (or an earlier run) has written since the last refresh."""
+        meta = self._read_json("meta.json")
+        if meta is None or meta.get("version") != FORMAT_VERSION or meta.get("source") != source:
+            self._reset(source)
+            return
+        if meta == self._meta:
+            return
+        self._categories = self._read_json("categories.json") or []
+        self._codes = {name: code for code, name in enumerate(self._categories)}
+        self._meta = meta
+        self._columns = {name: self._map(name, meta["rows"]) for name in COLUMNS}
+
+    def _reset(self, source: str) -> None:
+        """Starts an empty snapshot. Files are replaced rather than truncated, so other processes' maps stay valid."""
+        os.makedirs(self.directory, exist_ok=True)
+        for name in COLUMNS:
+            self._write_file(name, b"")
+        self._categories, self._codes = [], {}
+        self._write_json("categories.json", [])
+        self._meta = {"version": FORMAT_VERSION, "source": source, "rows": 0, "last_id": 0}
+        self._write_json("meta.json", self._meta)
+        self._columns = {name: self._map(name, 0) for name in COLUMNS}
+
+    def _append(self, rows: list) -> None:
+        if not rows:
+            return
+        known = len(self._categories)
+        encoded = self._encode(rows)
+        count = self._meta["rows"]
+        for name, dtype in COLUMNS.items():
+            with open(self._path(name), "ab") as column:
+                # Drops bytes past the recorded rows, left by a process that stopped mid-append.
+                column.truncate(count * np.dtype(dtype).itemsize)
+                column.write(encoded[name].tobytes())
+        if len(self._categories) > known:
+            self._write_json("categories.json", self._categories)
+        # Written last: the rows only count once meta.json says so.
+        self._meta = {**self._meta, "rows": count + len(rows), "last_id": rows[-1].id}
+        self._write_json("meta.json", self._meta)
+        self._columns = {name: self._map(name, self._meta["rows"]) for name in COLUMNS}
+
+    def _encode(self, rows: list) -> dict[str, Any]:
+        return {
+            "sale_date": np.fromiter((row.sale_date.toordinal() - EPOCH_ORDINAL for row in rows), np.int32, len(rows)),
+            "category": np.fromiter((self._code(row.category) for row in rows), np.int32, len(rows)),
+            "total_cents": np.fromiter((round(row.total_amount * 100) for row in rows), np.int64, len(rows)),
+        }
+
+    def _code(self, category: str) -> int:
+        code = self._codes.get(category)
+        if code is None:
+            code = self._codes[category] = len(self._categories)
+            self._categories.append(category)
+        return code
+
+    def _map(self, name: str, rows: int):
+        if not rows:
+            return np.empty(0, dtype=COLUMNS[name])
+        return np.memmap(self._path(name), dtype=COLUMNS[name], mode="r", shape=(rows,))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _write_file(self, name: str, content: bytes) -> None:
+        partial = self._path(f"{name}.part")
+        with open(partial, "wb") as file:
+            file.write(content)
+        os.replace(partial, self._path(name))
+
+    def _read_json(self, name: str) -> Optional[Any]:
+        try:
+            with open(self._path(name), encoding="utf-8") as file:
+                return json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_json(self, name: str, content: Any) -> None:
+        self._write_file(name, json.dumps(content).encode())
+
+    def _source(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    @contextmanager
+    def _file_lock(self):
+        os.makedirs(self.directory, exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(self._path("lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _configured_snapshot() -> Optional[SalesSnapshot]:
+    if ANALYTICS_ENGINE != "columnar":
+        return None
+    if np is None:
+        logger.warning("ANALYTICS_ENGINE=columnar needs numpy, which is not installed; revenue queries use SQL")
+        return None
+    return SalesSnapshot(COLUMNAR_DIR)
+
+
+sales_snapshot = _configured_snapshot()
+
+
+def columnar_snapshot(db: Session) -> Optional[SalesSnapshot]:
+    """The snapshot to aggregate ``db``'s sales with, or None to query SQL."""
+    if sales_snapshot is None or db.get_bind().dialect.name not in WEEK_OFFSETS:
+        return None
+    return sales_snapshot
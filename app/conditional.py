@@ -0,0 +1,61 @@
+"""Conditional GET for list endpoints that dashboards poll.
+
+A list's ETag is derived from a watermark of its table: row count, highest id and latest update
+timestamp, all read with one aggregate query. Inserts raise the count and max id, deletes lower the
+count and updates move the timestamp, so the tag changes with the data and a matching
+``If-None-Match`` is answered with 304 before any rows are loaded or serialized.
+
+Timestamps have second precision, so while the latest update falls in the database's current second
+another change could still land with the same watermark; no ETag is sent until that second is over.
+The tags are weak: they identify the data, not the exact bytes.
+"""
+
+from hashlib import blake2b
+from typing import Any, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.config import VERSION
+
+
+def watermark_query(id_column: InstrumentedAttribute, updated_column: InstrumentedAttribute) -> Select:
+    """Count, max id, max update time and whether that time is still the current second."""
+    latest = func.max(updated_column)
+    return select(func.count(id_column), func.max(id_column), latest, latest >= func.now())
+
+
+def watermark_etag(watermark: tuple, *parts: Any) -> Optional[str]:
+    """A weak ETag for a ``watermark_query`` row plus ``parts`` (e.g. the path and query string), or None if unsettled."""
+    count, max_id, latest, unsettled = watermark
+    if unsettled:
+        return None
+    digest = blake2b(repr((VERSION, count, max_id, latest, *parts)).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """Weak comparison of ``etag`` against the request's ``If-None-Match`` header."""
+    header = request.headers.get("if-none-match")
+    if not header or etag is None:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def set_validators(response: Response, etag: Optional[str], cache_control: str) -> Response:
+    if etag:
+        response.headers["ETag"] = etag
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return set_validators(Response(status_code=304), etag, cache_control)
+
+
+NOT_MODIFIED_RESPONSE = {304: {"description": "Not modified since the version identified by If-None-Match"}}
@@ -1,9 +1,11 @@
 import logging
+import os
 import sys
+import tempfile
 
 from loguru import logger
 from starlette.config import Config
-from starlette.datastructures import Secret
+from starlette.datastructures import CommaSeparatedStrings, Secret
 
 from app.logger import InterceptHandler
 
@@ -14,6 +16,54 @@ VERSION = "0.1.0"
 DEBUG: bool = config("DEBUG", cast=bool, default=False)
 MAX_CONNECTIONS_COUNT: int = config("MAX_CONNECTIONS_COUNT", cast=int, default=10)
 MIN_CONNECTIONS_COUNT: int = config("MIN_CONNECTIONS_COUNT", cast=int, default=10)
+DB_POOL_TIMEOUT: float = config("DB_POOL_TIMEOUT", cast=float, default=30.0)  # seconds to wait for a connection
+DB_POOL_RECYCLE: int = config("DB_POOL_RECYCLE", cast=int, default=1800)  # below MySQL's wait_timeout
+DB_POOL_PRE_PING: bool = config("DB_POOL_PRE_PING", cast=bool, default=True)
+# Serve the core routes with async def endpoints on an AsyncEngine instead of the threadpool + sync engine
+DB_ASYNC: bool = config("DB_ASYNC", cast=bool, default=False)
+PRODUCT_CACHE_ENABLED: bool = config("PRODUCT_CACHE_ENABLED", cast=bool, default=True)
+PRODUCT_CACHE_SIZE: int = config("PRODUCT_CACHE_SIZE", cast=int, default=10000)
+PRODUCT_CACHE_TTL: float = config("PRODUCT_CACHE_TTL", cast=float, default=300.0)  # seconds
+ANALYTICS_CACHE_ENABLED: bool = config("ANALYTICS_CACHE_ENABLED", cast=bool, default=True)
+ANALYTICS_CACHE_SIZE: int = config("ANALYTICS_CACHE_SIZE", cast=int, default=256)
+ANALYTICS_CACHE_TTL: float = config("ANALYTICS_CACHE_TTL", cast=float, default=60.0)  # seconds
+# "columnar" computes revenue with NumPy over a memory-mapped copy of sales kept in COLUMNAR_DIR instead of SQL
+ANALYTICS_ENGINE: str = config("ANALYTICS_ENGINE", default="sql")
+COLUMNAR_DIR: str = config("COLUMNAR_DIR", default=os.path.join(tempfile.gettempdir(), "test_mart_columnar"))
+DEFAULT_PAGE_SIZE: int = config("DEFAULT_PAGE_SIZE", cast=int, default=100)
+MAX_PAGE_SIZE: int = config("MAX_PAGE_SIZE", cast=int, default=1000)
+EXPORT_CHUNK_SIZE: int = config("EXPORT_CHUNK_SIZE", cast=int, default=1000)
+BULK_SALES_MAX_ROWS: int = config("BULK_SALES_MAX_ROWS", cast=int, default=10000)
+ORDER_MAX_LINES: int = config("ORDER_MAX_LINES", cast=int, default=500)
+# Cache-Control sent with the conditional (ETag) list responses; no-cache makes clients revalidate every time
+PRODUCTS_CACHE_CONTROL: str = config("PRODUCTS_CACHE_CONTROL", default="private, no-cache")
+INVENTORY_CACHE_CONTROL: str = config("INVENTORY_CACHE_CONTROL", default="private, no-cache")
+# Server-sent stock events at /inventory/events: recent events kept for Last-Event-ID resume, per-subscriber queue
+# bound (a subscriber that falls this far behind is disconnected and resumes from the buffer) and keepalive interval
+STOCK_EVENTS_ENABLED: bool = config("STOCK_EVENTS_ENABLED", cast=bool, default=True)
+STOCK_EVENTS_BUFFER_SIZE: int = config("STOCK_EVENTS_BUFFER_SIZE", cast=int, default=1000)
+STOCK_EVENTS_QUEUE_SIZE: int = config("STOCK_EVENTS_QUEUE_SIZE", cast=int, default=100)
+STOCK_EVENTS_MAX_SUBSCRIBERS: int = config("STOCK_EVENTS_MAX_SUBSCRIBERS", cast=int, default=100)
+STOCK_EVENTS_KEEPALIVE: float = config("STOCK_EVENTS_KEEPALIVE", cast=float, default=15.0)  # seconds
+# Seconds the change feed holds back new changes, so writes committed that much after their timestamp aren't skipped
+CHANGES_SETTLE_SECONDS: float = config("CHANGES_SETTLE_SECONDS", cast=float, default=5.0)
+# Read replicas for the read-only list and analytics routes (comma-separated URLs; empty reads from the primary),
+# how long an unreachable replica is skipped, and how long a client that wrote keeps reading from the primary
+READ_REPLICA_URLS: CommaSeparatedStrings = config("READ_REPLICA_URLS", cast=CommaSeparatedStrings, default="")
+READ_REPLICA_RETRY_INTERVAL: float = config("READ_REPLICA_RETRY_INTERVAL", cast=float, default=30.0)  # seconds
+READ_YOUR_WRITES_SECONDS: float = config("READ_YOUR_WRITES_SECONDS", cast=float, default=5.0)  # 0 disables
+# Background report jobs (POST /reports): worker threads, jobs allowed queued or running at once, where results are
+# written and how long a finished job and its result are kept
+REPORT_WORKERS: int = config("REPORT_WORKERS", cast=int, default=2)
+REPORT_MAX_PENDING: int = config("REPORT_MAX_PENDING", cast=int, default=20)
+REPORT_DIR: str = config("REPORT_DIR", default=os.path.join(tempfile.gettempdir(), "test_mart_reports"))
+REPORT_TTL: float = config("REPORT_TTL", cast=float, default=3600.0)  # seconds
+# Per-request statement counts/DB time in a Server-Timing header and the logs
+SQL_INSTRUMENTATION_ENABLED: bool = config("SQL_INSTRUMENTATION_ENABLED", cast=bool, default=True)
+SQL_SLOW_QUERY_MS: float = config("SQL_SLOW_QUERY_MS", cast=float, default=100.0)
+SQL_REPEATED_QUERY_THRESHOLD: int = config("SQL_REPEATED_QUERY_THRESHOLD", cast=int, default=5)  # N+1 warning
+# Per-route latency histograms served at /metrics
+METRICS_ENABLED: bool = config("METRICS_ENABLED", cast=bool, default=True)
 
 
 def get_config_secret(key: str, default: str = "") -> Secret:
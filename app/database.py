@@ -1,21 +1,110 @@
 import os
 
+from fastapi import Depends, Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import (
+    DB_ASYNC,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_TIMEOUT,
+    MAX_CONNECTIONS_COUNT,
+    MIN_CONNECTIONS_COUNT,
+    READ_REPLICA_RETRY_INTERVAL,
+    READ_REPLICA_URLS,
+)
+from app.pool import InstrumentedAsyncAdaptedQueuePool, InstrumentedQueuePool
+from app.replicas import ReplicaSet, reads_own_writes
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)  # type: ignore
+# asyncio drivers used in place of the sync ones when DB_ASYNC is enabled
+ASYNC_DRIVERS = {"mysql": "aiomysql", "sqlite": "aiosqlite"}
+
+
+def get_pool_options(url: str, async_mode: bool = False) -> dict:
+    """Pool settings from config: MIN_CONNECTIONS_COUNT pooled connections, bursting up to MAX_CONNECTIONS_COUNT."""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # In-memory SQLite lives inside a single connection, pooling it would lose the data.
+        return {}
+
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if async_mode else InstrumentedQueuePool,
+        "pool_size": MIN_CONNECTIONS_COUNT,
+        "max_overflow": max(MAX_CONNECTIONS_COUNT - MIN_CONNECTIONS_COUNT, 0),
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **get_pool_options(SQLALCHEMY_DATABASE_URL))  # type: ignore
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Each replica gets its own pool sized like the primary's.
+replica_engines = [create_engine(url, **get_pool_options(url)) for url in READ_REPLICA_URLS]
+
+read_replicas = ReplicaSet(replica_engines, READ_REPLICA_RETRY_INTERVAL)
+
 Base = declarative_base()
 
 
+def get_async_url(url: str) -> URL:
+    """Returns ``url`` with its driver swapped for the asyncio one (e.g. ``mysql+pymysql`` -> ``mysql+aiomysql``)."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    return parsed.set(drivername=f"{parsed.get_backend_name()}+{driver}") if driver else parsed
+
+
+async_engine = (
+    create_async_engine(
+        get_async_url(SQLALCHEMY_DATABASE_URL),  # type: ignore
+        **get_pool_options(SQLALCHEMY_DATABASE_URL, async_mode=True),  # type: ignore
+    )
+    if DB_ASYNC
+    else None
+)
+
+# expire_on_commit is off because expired attributes would need lazy IO, which AsyncSession cannot do implicitly.
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db(request: Request, db: Session = Depends(get_db)):
+    """Session for read-only routes: a read replica when one is configured and reachable, else the primary.
+
+    Clients that wrote within READ_YOUR_WRITES_SECONDS read from the primary so they see their own changes.
+    Replica reads may lag the primary by the replication delay.
+    """
+    replica = None if not read_replicas or reads_own_writes(request) else read_replicas.open_session()
+    if replica is None:
+        yield db
+        return
+
+    try:
+        yield replica
+    except DBAPIError as error:
+        if error.connection_invalidated:
+            read_replicas.mark_down(replica.get_bind(), error)
+        raise
+    finally:
+        replica.close()
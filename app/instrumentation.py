@@ -0,0 +1,161 @@
+"""Per-request SQL instrumentation.
+
+``QueryInstrumentationMiddleware`` opens a ``RequestQueries`` record for every HTTP request and the
+engine event hooks below add each statement executed while it is active: how many ran, the total
+time spent in the database and the slowest one. The totals are returned in a ``Server-Timing``
+header and logged when the request finishes.
+
+Statements are grouped by fingerprint, their SQL with literals, bind placeholders and ``IN`` lists
+normalized, so a loop issuing the same query per row (N+1) shows up as one fingerprint repeated
+``SQL_REPEATED_QUERY_THRESHOLD`` times or more and is logged as a warning, as is any statement
+slower than ``SQL_SLOW_QUERY_MS``.
+"""
+
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import SQL_REPEATED_QUERY_THRESHOLD, SQL_SLOW_QUERY_MS
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?|__\[POSTCOMPILE_\w+\]")
+_IN_LIST = re.compile(r"\bIN \((?:\?, )*\?\)", re.IGNORECASE)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalizes ``statement`` so executions differing only in their values compare equal."""
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return _IN_LIST.sub("IN (...)", statement)
+
+
+@dataclass
+class RequestQueries:
+    """Statements executed on behalf of one request."""
+
+    count: int = 0
+    duration: float = 0.0
+    slowest_duration: float = 0.0
+    slowest_statement: Optional[str] = None
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.fingerprints[fingerprint(statement)] += 1
+        if duration > self.slowest_duration:
+            self.slowest_duration = duration
+            self.slowest_statement = statement
+
+    def repeated(self, threshold: int = SQL_REPEATED_QUERY_THRESHOLD) -> list[tuple[str, int]]:
+        """Fingerprints executed at least ``threshold`` times, most repeated first."""
+        return [(sql, count) for sql, count in self.fingerprints.most_common() if count >= threshold]
+
+    def server_timing(self, total: float) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries", total;dur={total * 1000:.1f}'
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.duration * 1000, 3),
+            "slowest_ms": round(self.slowest_duration * 1000, 3),
+            "slowest_sql": fingerprint(self.slowest_statement) if self.slowest_statement else None,
+        }
+
+
+_current_request: ContextVar[Optional[RequestQueries]] = ContextVar("current_request_queries", default=None)
+
+
+def current_request_queries() -> Optional[RequestQueries]:
+    """The record of the request being served in this context, if any."""
+    return _current_request.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start_time"].pop()
+    queries = _current_request.get()
+    if queries is not None:
+        queries.record(statement, duration)
+    if duration * 1000 >= SQL_SLOW_QUERY_MS:
+        sql = fingerprint(statement)
+        logger.bind(duration_ms=round(duration * 1000, 3), sql=sql).warning(
+            f"Slow query ({duration * 1000:.1f} ms): {sql}"
+        )
+
+
+def _handle_error(exception_context):
+    # The statement failed, so after_cursor_execute won't run to pop its start time.
+    starts = exception_context.connection.info.get("query_start_time") if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engines() -> None:
+    """Times statements on every engine, sync or async; safe to call more than once."""
+    for name, listener in (
+        ("before_cursor_execute", _before_cursor_execute),
+        ("after_cursor_execute", _after_cursor_execute),
+        ("handle_error", _handle_error),
+    ):
+        if not event.contains(Engine, name, listener):
+            event.listen(Engine, name, listener)
+
+
+class QueryInstrumentationMiddleware:
+    """Pure ASGI middleware, so streaming responses pass through without buffering."""
+
+    def __init__(self, app: ASGIApp, repeated_threshold: int = SQL_REPEATED_QUERY_THRESHOLD):
+        self.app = app
+        self.repeated_threshold = repeated_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries()
+        token = _current_request.set(queries)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Statements run while a streaming body is sent are logged but can't be in the header.
+                timing = queries.server_timing(time.perf_counter() - start)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            self._log(scope, status_code, queries, time.perf_counter() - start)
+
+    def _log(self, scope: Scope, status_code: int, queries: RequestQueries, total: float) -> None:
+        request = f"{scope['method']} {scope['path']}"
+        log = logger.bind(
+            request=request, status_code=status_code, total_ms=round(total * 1000, 3), **queries.summary()
+        )
+        log.debug(f"{request} {status_code}: {queries.count} queries in {queries.duration * 1000:.1f} ms")
+        for sql, count in queries.repeated(self.repeated_threshold):
+            log.bind(repeated_sql=sql, repeated_count=count).warning(
+                f"Possible N+1 in {request}: query ran {count} times: {sql}"
+            )
@@ -2,15 +2,61 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from fastapi import FastAPI  # noqa: E402
+from contextlib import asynccontextmanager  # noqa: E402
 
-from app.config import API_PREFIX, DEBUG, PROJECT_NAME, VERSION  # noqa: E402
-from app.routers import api_router  # noqa: E402
+from fastapi import Depends, FastAPI  # noqa: E402
+from fastapi.concurrency import run_in_threadpool  # noqa: E402
 
+from app import database  # noqa: E402
+from app.config import (  # noqa: E402
+    API_PREFIX,
+    DB_ASYNC,
+    DEBUG,
+    METRICS_ENABLED,
+    MIN_CONNECTIONS_COUNT,
+    PROJECT_NAME,
+    READ_YOUR_WRITES_SECONDS,
+    SQL_INSTRUMENTATION_ENABLED,
+    VERSION,
+)
+from app.instrumentation import (  # noqa: E402
+    QueryInstrumentationMiddleware,
+    instrument_engines,
+)
+from app.metrics import MetricsMiddleware, track_in_flight  # noqa: E402
+from app.pool import warm_up_pool  # noqa: E402
+from app.replicas import ReadYourWritesMiddleware  # noqa: E402
+from app.reports import report_jobs  # noqa: E402
+from app.routers import api_router, async_api_router  # noqa: E402
+from app.routers.metrics import router as metrics_router  # noqa: E402
 
-def get_application() -> FastAPI:
-    application = FastAPI(title=PROJECT_NAME, debug=DEBUG, version=VERSION)
-    application.include_router(api_router, prefix=API_PREFIX)
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    # Open the minimum number of connections up front so the first requests don't pay for them.
+    for engine in (database.engine, *database.replica_engines):
+        await run_in_threadpool(warm_up_pool, engine, MIN_CONNECTIONS_COUNT)
+    await run_in_threadpool(report_jobs.remove_stale_files)
+    yield
+    report_jobs.shutdown()
+
+
+def get_application(async_mode: bool = DB_ASYNC) -> FastAPI:
+    # The in-flight gauges are keyed by route, which only a dependency sees; it must be set before routers are included.
+    dependencies = [Depends(track_in_flight)] if METRICS_ENABLED else None
+    application = FastAPI(
+        title=PROJECT_NAME, debug=DEBUG, version=VERSION, lifespan=lifespan, dependencies=dependencies
+    )
+    application.include_router(async_api_router if async_mode else api_router, prefix=API_PREFIX)
+    if SQL_INSTRUMENTATION_ENABLED:
+        instrument_engines()
+        application.add_middleware(QueryInstrumentationMiddleware)
+    if database.read_replicas and READ_YOUR_WRITES_SECONDS > 0:
+        application.add_middleware(ReadYourWritesMiddleware, window=READ_YOUR_WRITES_SECONDS)
+    if METRICS_ENABLED:
+        # Added last so it is outermost and its timings include the other middleware.
+        application.add_middleware(MetricsMiddleware)
+        application.include_router(metrics_router)
     return application
 
 
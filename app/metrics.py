@@ -0,0 +1,195 @@
+"""Request metrics in the Prometheus text format.
+
+``MetricsMiddleware`` times every HTTP request into a latency histogram per route template, method
+and status code. ``track_in_flight``, an app-wide dependency, counts requests in flight per method and
+route template: the route is only known once routing has run, after the middleware has started.
+``GET /metrics`` renders them together with the connection pool and cache counters.
+
+Recording runs on the event loop for every request, so it is kept to a lock, a dict lookup and a
+bisect over the bucket bounds: about a microsecond (``scripts/benchmark_metrics.py`` measures it).
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterable
+from typing import Any, Optional
+
+from fastapi import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Upper bounds in seconds; the +Inf bucket is implicit.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Requests that matched no route share one label so scanners probing random paths can't grow the series.
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Scope keys: the middleware's RequestMetrics, and whether track_in_flight counted the request.
+METRICS_SCOPE_KEY = "request_metrics"
+IN_FLIGHT_SCOPE_KEY = "request_metrics.in_flight"
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)
+        self.total = 0.0
+        self.count = 0
+
+
+class RequestMetrics:
+    """Thread-safe per-(method, route, status) latency histograms and per-(method, route) in-flight gauges."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms: dict[tuple[str, str, str], _Histogram] = {}
+        self._in_flight: dict[tuple[str, str], int] = {}
+
+    def start(self, method: str, route: str) -> None:
+        key = (method, route)
+        with self._lock:
+            self._in_flight[key] = self._in_flight.get(key, 0) + 1
+
+    def observe(self, method: str, route: str, status: str, duration: float, in_flight: bool = False) -> None:
+        """Records a finished request that took ``duration`` seconds; ``in_flight`` if ``start`` counted it."""
+        key = (method, route, status)
+        with self._lock:
+            if in_flight:
+                self._in_flight[(method, route)] -= 1
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(len(self.buckets))
+            histogram.counts[bisect_left(self.buckets, duration)] += 1
+            histogram.total += duration
+            histogram.count += 1
+
+    def in_flight(self) -> dict[tuple[str, str], int]:
+        with self._lock:
+            return dict(self._in_flight)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> Iterable[str]:
+        with self._lock:
+            histograms = [
+                (key, list(histogram.counts), histogram.total, histogram.count)
+                for key, histogram in sorted(self._histograms.items())
+            ]
+            in_flight = sorted(self._in_flight.items())
+
+        yield "# HELP http_request_duration_seconds Time to serve HTTP requests."
+        yield "# TYPE http_request_duration_seconds histogram"
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for (method, route, status), counts, total, count in histograms:
+            labels = f'method="{method}",route="{_escape(route)}",status="{status}"'
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                yield f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}'
+            yield f"http_request_duration_seconds_sum{{{labels}}} {_format_value(total)}"
+            yield f"http_request_duration_seconds_count{{{labels}}} {count}"
+        yield "# HELP http_requests_in_flight HTTP requests currently being served."
+        yield "# TYPE http_requests_in_flight gauge"
+        for (method, route), count in in_flight:
+            yield f'http_requests_in_flight{{method="{method}",route="{_escape(route)}"}} {count}'
+
+
+request_metrics = RequestMetrics()
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that served ``scope`` (e.g. ``/api/products/{product_id}``)."""
+    # FastAPI versions with lazily included routers keep the prefixed template on the effective route context;
+    # older ones copy included routes with the prefix already in ``route.path_format``.
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    template: Optional[str] = getattr(context, "path_format", None) or getattr(scope.get("route"), "path_format", None)
+    return template or UNMATCHED_ROUTE
+
+
+async def track_in_flight(request: Request) -> None:
+    """App-wide dependency counting the request in flight on its route in the ``MetricsMiddleware``'s metrics."""
+    metrics: Optional[RequestMetrics] = request.scope.get(METRICS_SCOPE_KEY)
+    if metrics is not None and not request.scope.get(IN_FLIGHT_SCOPE_KEY):
+        metrics.start(request.method, route_template(request.scope))
+        request.scope[IN_FLIGHT_SCOPE_KEY] = True
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware feeding ``request_metrics``; streaming responses are timed until their last chunk."""
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = "500"
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        scope[METRICS_SCOPE_KEY] = self.metrics
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - start
+            in_flight = scope.get(IN_FLIGHT_SCOPE_KEY, False)
+            self.metrics.observe(scope["method"], route_template(scope), status, duration, in_flight)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# (metric, type, help, stats key, scale) for the pool and cache figures reported by /system/pool and /system/cache.
+POOL_METRICS = (
+    ("db_pool_size", "gauge", "Connections kept open by the pool.", "size", 1),
+    ("db_pool_checked_out", "gauge", "Connections currently checked out.", "checked_out", 1),
+    ("db_pool_checked_in", "gauge", "Idle connections in the pool.", "checked_in", 1),
+    ("db_pool_overflow", "gauge", "Overflow connections currently open.", "overflow", 1),
+    ("db_pool_checkouts_total", "counter", "Successful connection checkouts.", "checkouts", 1),
+    ("db_pool_checkout_timeouts_total", "counter", "Checkouts that timed out.", "checkout_timeouts", 1),
+    (
+        "db_pool_checkout_wait_seconds_total",
+        "counter",
+        "Time spent waiting for connections.",
+        "wait_time_total_ms",
+        1e-3,
+    ),
+)
+CACHE_METRICS = (
+    ("cache_entries", "gauge", "Entries currently cached.", "size", 1),
+    ("cache_hits_total", "counter", "Cache lookups that found an entry.", "hits", 1),
+    ("cache_misses_total", "counter", "Cache lookups that found no entry.", "misses", 1),
+    ("cache_evictions_total", "counter", "Entries evicted to make room.", "evictions", 1),
+    ("cache_expirations_total", "counter", "Entries dropped after their TTL.", "expirations", 1),
+    ("cache_coalesced_total", "counter", "Lookups that waited for an identical query in flight.", "coalesced", 1),
+    ("cache_invalidations_total", "counter", "Entries dropped by writes.", "invalidations", 1),
+)
+
+
+def render_stats(definitions: tuple, label: str, stats: dict[str, dict[str, Any]]) -> Iterable[str]:
+    """Renders ``stats`` (label value -> stats dict) as one metric family per definition."""
+    for name, kind, description, key, scale in definitions:
+        samples = [(value, figures[key]) for value, figures in stats.items() if key in figures]
+        if not samples:
+            continue
+        yield f"# HELP {name} {description}"
+        yield f"# TYPE {name} {kind}"
+        for value, figure in samples:
+            yield f'{name}{{{label}="{value}"}} {_format_value(figure * scale if scale != 1 else figure)}'
@@ -7,17 +7,28 @@ from sqlalchemy import (  # Keep these for column types
     TIMESTAMP,
     Date,
     ForeignKey,
+    Index,
     Integer,
     String,
     func,
+    select,
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
 
+# SQLite fills server defaults as "YYYY-MM-DD HH:MM:SS"; store ORM-written values the same way so range
+# comparisons on timestamps (keyset cursors) behave like on MySQL, whose TIMESTAMP has second precision too.
+_sqlite_timestamp = sqlite.DATETIME(truncate_microseconds=True)
+
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (
+        # The change feed walks products in (updated_at, id) order from a cursor.
+        Index("ix_products_updated_at_id", "updated_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     name: Mapped[str] = mapped_column(String(255), nullable=False)
@@ -25,10 +36,15 @@ class Product(Base):
     price: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
     description: Mapped[Optional[str]] = mapped_column(String(2000), nullable=True, default="")
 
-    created_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True).with_variant(_sqlite_timestamp, "sqlite"), server_default=func.now(), nullable=False
+    )
 
     updated_at: Mapped[datetime] = mapped_column(
-        TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+        TIMESTAMP(timezone=True).with_variant(_sqlite_timestamp, "sqlite"),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
     )
 
     sales: Mapped[list["Sale"]] = relationship(back_populates="product")
@@ -41,34 +57,90 @@ class Product(Base):
 
 class Inventory(Base):
     __tablename__ = "inventory"
+    __table_args__ = (
+        # The change feed walks inventory in (last_updated, id) order from a cursor.
+        Index("ix_inventory_last_updated_id", "last_updated", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), unique=True, nullable=False)
-    stock: Mapped[int] = mapped_column(Integer, nullable=False)
-    last_updated: Mapped[datetime] = mapped_column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    stock: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    last_updated: Mapped[datetime] = mapped_column(
+        TIMESTAMP().with_variant(_sqlite_timestamp, "sqlite"), server_default=func.now(), onupdate=func.now()
+    )
 
     product: Mapped["Product"] = relationship(back_populates="inventory")
 
 
+def _product_category(context) -> str:
+    """Column default for ``Sale.category``: the product's category, for inserts that don't set it."""
+    product_id = context.get_current_parameters()["product_id"]
+    return context.connection.scalar(select(Product.category).where(Product.id == product_id))
+
+
 class Sale(Base):
     __tablename__ = "sales"
+    __table_args__ = (
+        # Sales of one product in a date range.
+        Index("ix_sales_product_id_sale_date", "product_id", "sale_date"),
+        # Category filters, newest first, without joining products.
+        Index("ix_sales_category_sale_date", "category", "sale_date"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"))
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     sale_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
     total_amount: Mapped[Decimal] = mapped_column(DECIMAL(10, 2), nullable=False)
+    # Copy of ``products.category`` so category filters skip the join; kept in step with the product
+    # (see ``SaleCategoryService``).
+    category: Mapped[str] = mapped_column(String(255), nullable=False, default=_product_category)
+    # When the row was written, as opposed to the business date; the change feed holds back recent rows by it.
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True).with_variant(_sqlite_timestamp, "sqlite"), server_default=func.now(), nullable=False
+    )
 
     product: Mapped["Product"] = relationship(back_populates="sales")
 
 
 class InventoryLog(Base):
     __tablename__ = "inventory_log"
+    __table_args__ = (
+        # A product's log newest first (``get_logs``); the primary key breaks ties on ``changed_at``.
+        Index("ix_inventory_log_product_id_changed_at", "product_id", "changed_at", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     product_id: Mapped[int] = mapped_column(ForeignKey("products.id"), nullable=False)
     change: Mapped[int] = mapped_column(Integer, nullable=False)
     reason: Mapped[str] = mapped_column(String(255), nullable=False)
-    changed_at: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True), server_default=func.now(), nullable=False)
+    changed_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True).with_variant(_sqlite_timestamp, "sqlite"), server_default=func.now(), nullable=False
+    )
 
     product: Mapped["Product"] = relationship(back_populates="inventory_logs")
+
+
+class DailyRevenue(Base):
+    """Per-day revenue rollup maintained by ``SaleService.create_sale``."""
+
+    __tablename__ = "daily_revenue"
+
+    sale_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    total_amount: Mapped[Decimal] = mapped_column(DECIMAL(14, 2), nullable=False, default=0)
+    sale_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+class DailyCategoryRevenue(Base):
+    """Per-day, per-category revenue rollup maintained alongside ``DailyRevenue``."""
+
+    __tablename__ = "daily_category_revenue"
+    __table_args__ = (
+        # Date-range rebuilds across all categories; the primary key only serves per-category lookups.
+        Index("ix_daily_category_revenue_sale_date", "sale_date"),
+    )
+
+    category: Mapped[str] = mapped_column(String(255), primary_key=True)
+    sale_date: Mapped[date] = mapped_column(Date, primary_key=True)
+    total_amount: Mapped[Decimal] = mapped_column(DECIMAL(14, 2), nullable=False, default=0)
+    sale_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
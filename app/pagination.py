@@ -0,0 +1,77 @@
+import base64
+import binascii
+import json
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Generic, Optional, TypeVar
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import ColumnElement, and_, or_
+
+T = TypeVar("T")
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of a keyset-paginated listing."""
+
+    items: list[T]
+    next_cursor: Optional[str] = None
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[T], limit: int, key: Callable[[T], tuple]) -> "Page[T]":
+        """Builds a page from ``limit + 1`` fetched rows; the extra row only signals that more exist."""
+        items = list(rows[:limit])
+        next_cursor = encode_cursor(*key(items[-1])) if len(rows) > limit else None
+        return cls(items=items, next_cursor=next_cursor)
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encodes the sort key of the last row of a page into an opaque, URL-safe cursor."""
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decodes a cursor produced by ``encode_cursor`` back into values of the given types."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError(cursor)
+        return tuple(_parse(value, type_) for value, type_ in zip(values, types))
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def before_keyset(column: ColumnElement, value: Any, id_column: ColumnElement, last_id: int) -> ColumnElement:
+    """Rows after ``(value, last_id)`` in ``column DESC, id DESC`` order.
+
+    Written as ``column <= value AND (column < value OR id < last_id)`` rather than the equivalent
+    ``column < value OR (column = value AND id < last_id)`` so the first term is an index range.
+    """
+    return and_(column <= value, or_(column < value, id_column < last_id))
+
+
+def after_keyset(column: ColumnElement, value: Any, id_column: ColumnElement, last_id: int) -> ColumnElement:
+    """Rows after ``(value, last_id)`` in ``column ASC, id ASC`` order, written as an index range like ``before_keyset``."""
+    return and_(column >= value, or_(column > value, id_column > last_id))
+
+
+def set_next_cursor(response: Response, page: Page) -> None:
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+
+
+def _parse(value: Any, type_: type) -> Any:
+    if type_ is datetime:
+        return datetime.fromisoformat(value)
+    if type_ is date:
+        return date.fromisoformat(value)
+    if type_ is int and not isinstance(value, int):
+        raise TypeError(value)
+    return type_(value)
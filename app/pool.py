@@ -0,0 +1,122 @@
+"""Connection pool instrumentation.
+
+The engines in ``app.database`` use the pool classes below so operators can see how close the
+pool is to exhaustion: connections checked out, overflow in use, time spent waiting for a
+connection and how many checkouts gave up after ``DB_POOL_TIMEOUT``.
+"""
+
+import threading
+import time
+from typing import Any
+
+from loguru import logger
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Thread-safe checkout counters shared by a pool and the pools it is recreated into."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def record(self, wait_time: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_time_total += wait_time
+            self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.checkout_timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+                "wait_time_avg_ms": round(self.wait_time_total * 1000 / attempts, 3) if attempts else 0.0,
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            }
+
+
+class _InstrumentedPoolMixin:
+    stats: PoolStats
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # Engine.dispose() swaps in a fresh pool; keep the counters so they survive it.
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def warm_up_pool(engine: Engine, size: int) -> int:
+    """Opens up to ``size`` connections at once and returns them to the pool.
+
+    Returns the number of connections opened. Pools that do not keep idle connections
+    (e.g. SQLite in-memory ones) are left alone.
+    """
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return 0
+
+    connections = []
+    try:
+        for _ in range(min(size, pool.size())):
+            connections.append(engine.raw_connection())
+    except exc.SQLAlchemyError as error:
+        logger.warning(f"Connection pool warm-up stopped after {len(connections)} connection(s): {error}")
+    finally:
+        for connection in connections:
+            connection.close()
+
+    logger.info(f"Connection pool warmed up with {len(connections)} connection(s)")
+    return len(connections)
+
+
+def pool_status(engine: Engine) -> dict[str, Any]:
+    """Returns live usage figures for the engine's pool."""
+    pool = engine.pool
+    status: dict[str, Any] = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, _InstrumentedPoolMixin):
+        status.update(pool.stats.snapshot())
+
+    return status
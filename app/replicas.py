@@ -0,0 +1,155 @@
+"""Read replica routing.
+
+Read-only list and analytics routes take their session from ``database.get_read_db``. It hands out
+sessions on the read replicas in ``READ_REPLICA_URLS`` in round-robin order and falls back to the primary
+in three cases:
+
+- no replicas are configured;
+- every replica is marked down;
+- the client wrote something within the last ``READ_YOUR_WRITES_SECONDS``.
+
+A replica's connection is checked out when its session is opened, so a replica that can't be reached is
+skipped before the route runs. It is then marked down and skipped for ``READ_REPLICA_RETRY_INTERVAL``
+seconds. A connection lost while a route is reading fails that request and marks the replica down too.
+
+Read-your-writes works through ``ReadYourWritesMiddleware``. It sets a short-lived cookie on every
+successful write, and reads carrying that cookie go to the primary. Without it, a client could miss its
+own change until the replicas caught up.
+
+Replica sessions are flagged in ``Session.info`` (see ``is_replica_session``) so the services don't fill
+the shared caches with results that may lag the primary.
+"""
+
+import itertools
+import threading
+import time
+from collections.abc import Callable, Sequence
+from typing import Any, Optional
+
+from fastapi import Request
+from loguru import logger
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+READ_YOUR_WRITES_COOKIE = "read_primary_until"
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+REPLICA_SESSION_INFO = "read_replica"
+
+
+class ReplicaSet:
+    """Round-robin over read replica engines, skipping those marked down. Thread-safe."""
+
+    def __init__(self, engines: Sequence[Engine], retry_interval: float, clock: Callable[[], float] = time.monotonic):
+        self.engines = list(engines)
+        self.retry_interval = retry_interval
+        self._clock = clock
+        self._sessionmakers = [
+            sessionmaker(autocommit=False, autoflush=False, bind=engine, info={REPLICA_SESSION_INFO: True})
+            for engine in self.engines
+        ]
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._down_until: dict[int, float] = {}
+        self._reads = [0] * len(self.engines)
+        self._failures = [0] * len(self.engines)
+        self._fallbacks = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def open_session(self) -> Optional[Session]:
+        """A session on the next healthy replica with its connection checked out, or None if none is reachable."""
+        for index in self._candidates():
+            session = self._sessionmakers[index]()
+            try:
+                # Checking out a connection now (pinged when DB_POOL_PRE_PING is on) finds a dead replica
+                # before the route runs, while falling back is still possible.
+                session.connection()
+            except DBAPIError as error:
+                session.close()
+                self.mark_down(session.get_bind(), error)
+                continue
+            with self._lock:
+                self._reads[index] += 1
+                self._down_until.pop(index, None)
+            return session
+
+        with self._lock:
+            self._fallbacks += 1
+        return None
+
+    def mark_down(self, engine: Engine, error: Optional[BaseException] = None) -> None:
+        """Skips ``engine`` for ``retry_interval`` seconds."""
+        index = self.engines.index(engine)
+        with self._lock:
+            self._down_until[index] = self._clock() + self.retry_interval
+            self._failures[index] += 1
+        logger.warning(f"Read replica {index} marked down for {self.retry_interval:g}s: {error}")
+
+    def _candidates(self) -> list[int]:
+        count = len(self.engines)
+        if not count:
+            return []
+        now = self._clock()
+        with self._lock:
+            start = next(self._turn) % count
+            down_until = dict(self._down_until)
+        order = [(start + offset) % count for offset in range(count)]
+        return [index for index in order if down_until.get(index, 0) <= now]
+
+    def stats(self) -> dict[str, Any]:
+        now = self._clock()
+        with self._lock:
+            return {
+                "replicas": [
+                    {
+                        "url": engine.url.render_as_string(hide_password=True),
+                        "healthy": self._down_until.get(index, 0) <= now,
+                        "reads": self._reads[index],
+                        "failures": self._failures[index],
+                    }
+                    for index, engine in enumerate(self.engines)
+                ],
+                "primary_fallbacks": self._fallbacks,
+            }
+
+
+def is_replica_session(session: Session) -> bool:
+    """Whether ``session`` was opened on a read replica rather than the primary."""
+    return session.info.get(REPLICA_SESSION_INFO, False)
+
+
+def reads_own_writes(request: Request, clock: Callable[[], float] = time.time) -> bool:
+    """Whether the client wrote recently enough that its reads must see the primary."""
+    until = request.cookies.get(READ_YOUR_WRITES_COOKIE)
+    try:
+        return until is not None and float(until) > clock()
+    except ValueError:
+        return False
+
+
+class ReadYourWritesMiddleware:
+    """Pure ASGI middleware that marks clients whose writes succeeded to read from the primary for ``window`` seconds."""
+
+    def __init__(self, app: ASGIApp, window: float, clock: Callable[[], float] = time.time):
+        self.app = app
+        self.window = window
+        self.clock = clock
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = self.clock() + self.window
+                cookie = f"{READ_YOUR_WRITES_COOKIE}={until:.3f}; Max-Age={max(int(self.window), 1)}; Path=/; HttpOnly"
+                message["headers"] = [*message.get("headers", []), (b"set-cookie", f"{cookie}; SameSite=Lax".encode())]
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
@@ -0,0 +1,298 @@
+"""Background report jobs.
+
+``POST /reports`` queues a revenue report or a sales export and returns at once. Jobs run on a thread pool of
+their own with ``REPORT_WORKERS`` threads, so a long export never holds a thread that serves API requests. At
+most ``REPORT_MAX_PENDING`` jobs may be queued or running at a time; further submissions get a 429.
+
+Results are written to ``REPORT_DIR`` under a temporary name and renamed once complete, so a download never
+sees a partial file. A finished job and its file are deleted ``REPORT_TTL`` seconds after it finishes.
+
+Cancelling a queued job stops it from running. A running export stops before its next chunk. A running
+revenue report stops once its query returns, and the result is discarded.
+
+Jobs are kept in process memory. A restart forgets them, and their leftover files are deleted at startup
+once they are older than ``REPORT_TTL``. With several worker processes, a job is only visible to the
+process that accepted it.
+"""
+
+import os
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import IO, Any, Optional
+
+from fastapi import HTTPException, status
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app import database, schemas
+from app.config import REPORT_DIR, REPORT_MAX_PENDING, REPORT_TTL, REPORT_WORKERS
+from app.serialization import dumps
+from app.services import SaleService
+
+MEDIA_TYPES = {"json": "application/json", "csv": "text/csv", "ndjson": "application/x-ndjson"}
+
+
+class ReportCancelled(Exception):
+    """Raised inside a running job once it has been cancelled."""
+
+
+@dataclass
+class ReportJob:
+    kind: str
+    parameters: dict[str, Any]
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: str = "queued"
+    progress: float = 0.0
+    rows: int = 0
+    total: Optional[int] = None  # rows expected, when known up front
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
+    path: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    @property
+    def extension(self) -> str:
+        return self.parameters.get("format", "csv") if self.kind == "sales_export" else "json"
+
+    @property
+    def filename(self) -> str:
+        return f"{self.kind}-{self.id}.{self.extension}"
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.extension]
+
+    def check_cancelled(self) -> None:
+        if self.cancel_event.is_set():
+            raise ReportCancelled
+
+    def add_rows(self, count: int) -> None:
+        """Records progress, stopping the job here if it has been cancelled."""
+        self.check_cancelled()
+        self.rows += count
+        if self.total:
+            self.progress = min(self.rows / self.total, 1.0)
+
+
+def open_read_session() -> Session:
+    """A session on a read replica when one is reachable, else on the primary."""
+    return database.read_replicas.open_session() or database.SessionLocal()
+
+
+class ReportJobManager:
+    """Runs report jobs on a bounded thread pool and keeps their results on disk until they expire. Thread-safe."""
+
+    def __init__(
+        self,
+        directory: str = REPORT_DIR,
+        workers: int = REPORT_WORKERS,
+        max_pending: int = REPORT_MAX_PENDING,
+        ttl: float = REPORT_TTL,
+        session_factory: Callable[[], Session] = open_read_session,
+    ):
+        self.directory = directory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._jobs: dict[str, ReportJob] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def submit(self, report: schemas.ReportCreate) -> ReportJob:
+        """Queues ``report``.
+
+        Raises:
+            HTTPException: 429 if ``max_pending`` jobs are already queued or running.
+        """
+        self.purge_expired()
+        job = ReportJob(report.kind, report.parameters())
+        with self._lock:
+            if sum(not pending.finished for pending in self._jobs.values()) >= self.max_pending:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many report jobs are pending",
+                    headers={"Retry-After": "30"},
+                )
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="report")
+            self._jobs[job.id] = job
+            job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> ReportJob:
+        """The job with ``job_id``.
+
+        Raises:
+            HTTPException: 404 if there is no such job or it has expired.
+        """
+        self.purge_expired()
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report job not found")
+        return job
+
+    def list(self) -> list[ReportJob]:
+        """Every job that has not expired, newest first."""
+        self.purge_expired()
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def result(self, job_id: str) -> ReportJob:
+        """The job with ``job_id``, once its result is ready to download.
+
+        Raises:
+            HTTPException: 404 if there is no such job, 409 if it has not succeeded.
+        """
+        job = self.get(job_id)
+        if job.status != "succeeded":
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Report job is {job.status}")
+        return job
+
+    def cancel(self, job_id: str) -> ReportJob:
+        """Cancels a queued job or asks a running one to stop. Finished jobs are left as they are."""
+        job = self.get(job_id)
+        with self._lock:
+            if not job.finished:
+                job.cancel_event.set()
+                if job.future is not None and job.future.cancel():
+                    self._finish(job, "cancelled")
+        return job
+
+    def discard(self, job_id: str) -> None:
+        """Cancels the job if it is still pending and deletes it along with its result."""
+        job = self.cancel(job_id)
+        with self._lock:
+            self._jobs.pop(job.id, None)
+        self._remove(job.path)
+
+    def purge_expired(self) -> int:
+        """Deletes finished jobs past their expiry and their results; returns how many were deleted."""
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            expired = [job for job in self._jobs.values() if job.expires_at is not None and job.expires_at <= now]
+            for job in expired:
+                del self._jobs[job.id]
+        for job in expired:
+            self._remove(job.path)
+        return len(expired)
+
+    def remove_stale_files(self) -> int:
+        """Deletes result files left by an earlier process once they are older than ``ttl``."""
+        if not os.path.isdir(self.directory):
+            return 0
+        cutoff = time.time() - self.ttl
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                self._remove(entry.path)
+                removed += 1
+        return removed
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancels pending jobs, waiting for running ones to stop if ``wait``; a later ``submit`` starts a new pool."""
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.finished:
+                    job.cancel_event.set()
+                    if job.future is not None and job.future.cancel():
+                        self._finish(job, "cancelled")
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            counts = {state: 0 for state in ("queued", "running", "succeeded", "failed", "cancelled")}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"workers": self.workers, "max_pending": self.max_pending, **counts}
+
+    def _run(self, job: ReportJob) -> None:
+        with self._lock:
+            if job.finished:
+                return
+            job.status = "running"
+            job.started_at = datetime.now(timezone.utc)
+
+        path = os.path.join(self.directory, job.filename)
+        partial = f"{path}.part"
+        outcome, error = "succeeded", None
+        try:
+            job.check_cancelled()
+            os.makedirs(self.directory, exist_ok=True)
+            with self.session_factory() as db, open(partial, "w", encoding="utf-8", newline="") as out:
+                self._write(job, SaleService(db), out)
+            os.replace(partial, path)
+        except ReportCancelled:
+            outcome = "cancelled"
+        except HTTPException as exc:
+            outcome, error = "failed", str(exc.detail)
+        except Exception as exc:
+            logger.exception(f"Report job {job.id} failed")
+            outcome, error = "failed", f"Report failed: {type(exc).__name__}"
+        finally:
+            self._remove(partial)
+
+        with self._lock:
+            if outcome == "succeeded":
+                job.path = path
+                job.progress = 1.0
+            self._finish(job, outcome, error)
+            discarded = job.id not in self._jobs
+        if discarded:
+            self._remove(job.path)
+
+    @staticmethod
+    def _write(job: ReportJob, service: SaleService, out: IO[str]) -> None:
+        parameters = dict(job.parameters)
+        if job.kind == "sales_export":
+            export_format = parameters.pop("format", "csv")
+            job.total = service.count_sales(**parameters)
+            for chunk in service.export_sales(export_format, on_rows=job.add_rows, **parameters):
+                out.write(chunk)
+            return
+
+        if job.kind == "revenue":
+            results = service.get_revenue_by_period(**parameters)
+        else:
+            results = service.get_revenue_comparison(**parameters)
+        job.check_cancelled()
+        job.add_rows(len(results))
+        out.write(dumps(results).decode())
+
+    def _finish(self, job: ReportJob, outcome: str, error: Optional[str] = None) -> None:
+        job.status = outcome
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+        job.expires_at = job.finished_at + timedelta(seconds=self.ttl)
+
+    @staticmethod
+    def _remove(path: Optional[str]) -> None:
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+report_jobs = ReportJobManager()
+
+
+def get_report_jobs() -> ReportJobManager:
+    return report_jobs
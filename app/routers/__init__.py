@@ -1,10 +1,29 @@
 from fastapi import APIRouter
 
+from .async_inventory import router as async_inventory_router
+from .async_products import router as async_product_router
+from .async_sales import router as async_sales_router
+from .changes import router as changes_router
 from .inventory import router as inventory_router
+from .orders import router as orders_router
 from .products import router as product_router
+from .reports import router as reports_router
 from .sales import router as sales_router
+from .system import router as system_router
 
 api_router = APIRouter()
 api_router.include_router(product_router)
 api_router.include_router(inventory_router)
 api_router.include_router(sales_router)
+api_router.include_router(orders_router)
+api_router.include_router(changes_router)
+api_router.include_router(reports_router)
+api_router.include_router(system_router)
+
+# Used when DB_ASYNC is enabled. Routes are matched in order, so endpoints without an async
+# port (bulk upload, orders, export) fall through to the sync routers included last.
+async_api_router = APIRouter()
+async_api_router.include_router(async_product_router)
+async_api_router.include_router(async_inventory_router)
+async_api_router.include_router(async_sales_router)
+async_api_router.include_router(api_router)
@@ -0,0 +1,81 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.async_services import AsyncInventoryService
+from app.conditional import (
+    NOT_MODIFIED_RESPONSE,
+    etag_matches,
+    not_modified,
+    set_validators,
+    watermark_etag,
+)
+from app.config import DEFAULT_PAGE_SIZE, INVENTORY_CACHE_CONTROL, MAX_PAGE_SIZE
+from app.database import get_async_db
+from app.pagination import set_next_cursor
+from app.serialization import Fields, field_set, rows_response
+
+router = APIRouter(prefix="/inventory", tags=["Inventory"])
+
+
+@router.post("/", response_model=schemas.Inventory)
+async def add_inventory(inventory: schemas.InventoryCreate, db: AsyncSession = Depends(get_async_db)):
+    """Async variant of ``inventory.add_inventory``."""
+    return await AsyncInventoryService(db).create_inventory(inventory)
+
+
+@router.get("/", response_model=list[schemas.Inventory], responses=NOT_MODIFIED_RESPONSE)
+async def list_inventory(request: Request, fields: Fields = None, db: AsyncSession = Depends(get_async_db)):
+    """Async variant of ``inventory.list_inventory``."""
+    selected = field_set(schemas.Inventory, models.Inventory, fields)
+    service = AsyncInventoryService(db)
+    etag = watermark_etag(await service.get_watermark(), request.url.path, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag, INVENTORY_CACHE_CONTROL)
+
+    response = rows_response(await service.get_all_inventory(columns=selected.columns), selected)
+    return set_validators(response, etag, INVENTORY_CACHE_CONTROL)
+
+
+@router.get("/low-stock", response_model=list[schemas.Inventory], responses=NOT_MODIFIED_RESPONSE)
+async def get_low_stock(
+    request: Request, threshold: int = 10, fields: Fields = None, db: AsyncSession = Depends(get_async_db)
+):
+    """Async variant of ``inventory.get_low_stock``."""
+    selected = field_set(schemas.Inventory, models.Inventory, fields)
+    service = AsyncInventoryService(db)
+    etag = watermark_etag(await service.get_watermark(), request.url.path, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag, INVENTORY_CACHE_CONTROL)
+
+    response = rows_response(await service.get_low_stock(threshold, columns=selected.columns), selected)
+    return set_validators(response, etag, INVENTORY_CACHE_CONTROL)
+
+
+@router.put("/{product_id}", response_model=schemas.Inventory)
+async def update_stock(product_id: int, data: schemas.InventoryBase, db: AsyncSession = Depends(get_async_db)):
+    """Async variant of ``inventory.update_stock``."""
+    inventory = await AsyncInventoryService(db).update_inventory_stock(product_id, data.stock)
+    if not inventory:
+        raise HTTPException(status_code=404, detail="Inventory not found")
+    return inventory
+
+
+@router.get("/{product_id}/logs", response_model=list[schemas.InventoryLog])
+async def get_inventory_logs(
+    product_id: int,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Fields = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Async variant of ``inventory.get_inventory_logs``."""
+    selected = field_set(schemas.InventoryLog, models.InventoryLog, fields, keys=("changed_at", "id"))
+    service = AsyncInventoryService(db)
+    page = await service.get_logs(product_id, skip=skip, limit=limit, cursor=cursor, columns=selected.columns)
+    response = rows_response(page.items, selected)
+    set_next_cursor(response, page)
+    return response
@@ -0,0 +1,57 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.async_services import AsyncProductService
+from app.conditional import (
+    NOT_MODIFIED_RESPONSE,
+    etag_matches,
+    not_modified,
+    set_validators,
+    watermark_etag,
+)
+from app.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PRODUCTS_CACHE_CONTROL
+from app.database import get_async_db
+from app.pagination import set_next_cursor
+from app.serialization import Fields, field_set, rows_response
+
+router = APIRouter(prefix="/products", tags=["Products"])
+
+
+@router.post("/", response_model=schemas.Product)
+async def create_product(product: schemas.ProductCreate, db: AsyncSession = Depends(get_async_db)):
+    """Async variant of ``products.create_product``."""
+    return await AsyncProductService(db).create_product(product)
+
+
+@router.get("/", response_model=list[schemas.Product], responses=NOT_MODIFIED_RESPONSE)
+async def list_products(
+    request: Request,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Fields = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Async variant of ``products.list_products``."""
+    selected = field_set(schemas.Product, models.Product, fields, keys=("id",))
+    service = AsyncProductService(db)
+    etag = watermark_etag(await service.get_watermark(), request.url.path, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRODUCTS_CACHE_CONTROL)
+
+    page = await service.get_products(skip=skip, limit=limit, cursor=cursor, columns=selected.columns)
+    response = rows_response(page.items, selected)
+    set_next_cursor(response, page)
+    return set_validators(response, etag, PRODUCTS_CACHE_CONTROL)
+
+
+@router.get("/{product_id}", response_model=schemas.Product)
+async def get_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Async variant of ``products.get_product``."""
+    product = await AsyncProductService(db).get_product(product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    return product
@@ -0,0 +1,73 @@
+from datetime import date
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.async_services import AsyncSaleService
+from app.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database import get_async_db
+from app.pagination import set_next_cursor
+from app.serialization import Fields, field_set, rows_response
+
+router = APIRouter(prefix="/sales", tags=["Sales"])
+
+
+@router.post("/", response_model=schemas.Sale)
+async def create_sale(sale: schemas.SaleCreate, db: AsyncSession = Depends(get_async_db)):
+    return await AsyncSaleService(db).create_sale(sale)
+
+
+@router.get("/", response_model=list[schemas.Sale])
+async def list_sales(
+    product_id: int = None,
+    category: str = None,
+    start_date: date = None,
+    end_date: date = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Fields = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    selected = field_set(schemas.Sale, models.Sale, fields, keys=("sale_date", "id"))
+    page = await AsyncSaleService(db).get_filtered_sales(
+        product_id=product_id,
+        category=category,
+        start_date=start_date,
+        end_date=end_date,
+        limit=limit,
+        cursor=cursor,
+        columns=selected.columns,
+    )
+    response = rows_response(page.items, selected)
+    set_next_cursor(response, page)
+    return response
+
+
+@router.get("/revenue")
+async def get_revenue(
+    period: str = "day",
+    start_date: date = None,
+    end_date: date = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await AsyncSaleService(db).get_revenue_by_period(period, start_date=start_date, end_date=end_date)
+
+
+@router.get("/revenue/comparison")
+async def compare_revenue(
+    period: str = "month",
+    category: str = None,
+    compare_periods: int = 2,
+    start_date: date = None,
+    end_date: date = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    return await AsyncSaleService(db).get_revenue_comparison(
+        period=period,
+        category=category,
+        compare_periods=compare_periods,
+        start_date=start_date,
+        end_date=end_date,
+    )
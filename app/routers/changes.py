@@ -0,0 +1,37 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database import get_db
+from app.serialization import FastJSONResponse
+from app.services import ChangeFeedService
+
+router = APIRouter(prefix="/changes", tags=["Changes"])
+
+
+@router.get("/", response_model=schemas.ChangeFeed)
+def get_changes(
+    since: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    """Lists products, inventory, sales and inventory log entries created or changed since a cursor.
+
+    Sync jobs store the returned ``cursor`` and pass it as ``since`` on the next run. They keep
+    requesting while ``has_more`` is true. Changes from the last few seconds (``CHANGES_SETTLE_SECONDS``)
+    are held back until a later request, so none are skipped.
+
+    Args:
+        since (str): ``cursor`` from the previous response. Omit it to start from the beginning.
+        limit (int): Maximum number of rows per entity. Defaults to DEFAULT_PAGE_SIZE.
+
+    Returns:
+        schemas.ChangeFeed: Changed rows per entity in change order, the next cursor and ``has_more``.
+
+    Raises:
+        HTTPException: 400 if the cursor is invalid
+    """
+    return FastJSONResponse(ChangeFeedService(db).get_changes(since, limit))
@@ -1,9 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app import schemas
-from app.database import get_db
+from app import models, schemas
+from app.conditional import (
+    NOT_MODIFIED_RESPONSE,
+    etag_matches,
+    not_modified,
+    set_validators,
+    watermark_etag,
+)
+from app.config import (
+    DEFAULT_PAGE_SIZE,
+    INVENTORY_CACHE_CONTROL,
+    MAX_PAGE_SIZE,
+    STOCK_EVENTS_KEEPALIVE,
+)
+from app.database import get_db, get_read_db
+from app.pagination import set_next_cursor
+from app.serialization import Fields, field_set, rows_response
 from app.services import InventoryService
+from app.stock_events import stock_events
 
 router = APIRouter(prefix="/inventory", tags=["Inventory"])
 
@@ -24,28 +43,86 @@ def add_inventory(inventory: schemas.InventoryCreate, db: Session = Depends(get_
     return InventoryService(db).create_inventory(inventory)
 
 
-@router.get("/", response_model=list[schemas.Inventory])
-def list_inventory(db: Session = Depends(get_db)):
+@router.get("/", response_model=list[schemas.Inventory], responses=NOT_MODIFIED_RESPONSE)
+def list_inventory(request: Request, fields: Fields = None, db: Session = Depends(get_read_db)):
     """Retrieves complete inventory list.
 
+    Args:
+        fields (str): Comma-separated inventory fields to return. Defaults to all of them.
+
     Returns:
-        list[schemas.Inventory]: All inventory records.
+        list[schemas.Inventory]: All inventory records, with a weak ``ETag`` for conditional requests.
     """
-    return InventoryService(db).get_all_inventory()
+    selected = field_set(schemas.Inventory, models.Inventory, fields)
+    service = InventoryService(db)
+    etag = watermark_etag(service.get_watermark(), request.url.path, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag, INVENTORY_CACHE_CONTROL)
 
+    response = rows_response(service.get_all_inventory(columns=selected.columns), selected)
+    return set_validators(response, etag, INVENTORY_CACHE_CONTROL)
 
-@router.get("/low-stock", response_model=list[schemas.Inventory])
-def get_low_stock(threshold: int = 10, db: Session = Depends(get_db)):
+
+@router.get("/low-stock", response_model=list[schemas.Inventory], responses=NOT_MODIFIED_RESPONSE)
+def get_low_stock(request: Request, threshold: int = 10, fields: Fields = None, db: Session = Depends(get_read_db)):
     """Lists inventory items below stock threshold.
 
     Args:
         threshold (int): Minimum stock level threshold. Defaults to 10.
+        fields (str): Comma-separated inventory fields to return. Defaults to all of them.
         db (Session): Database session dependency.
 
     Returns:
-        list[schemas.Inventory]: Inventory items below threshold.
+        list[schemas.Inventory]: Inventory items below threshold, with a weak ``ETag`` for conditional requests.
+    """
+    selected = field_set(schemas.Inventory, models.Inventory, fields)
+    service = InventoryService(db)
+    etag = watermark_etag(service.get_watermark(), request.url.path, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag, INVENTORY_CACHE_CONTROL)
+
+    response = rows_response(service.get_low_stock(threshold, columns=selected.columns), selected)
+    return set_validators(response, etag, INVENTORY_CACHE_CONTROL)
+
+
+@router.get(
+    "/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}, "description": "Stream of stock change events"}},
+)
+async def stream_stock_events(
+    threshold: int = 10,
+    product_id: Optional[list[int]] = Query(None),
+    crossings_only: bool = False,
+    last_event_id: Optional[str] = Header(None),
+):
+    """Streams inventory stock changes as server-sent events, instead of polling ``/low-stock``.
+
+    The stream opens with a ``ready`` event. After that, a ``low-stock`` event is sent when a change
+    takes a product below ``threshold`` and a ``restocked`` event when a change lifts it back, along
+    with a ``stock`` event for every other change. Each event's data holds product_id, stock,
+    previous_stock, reason and at.
+
+    Args:
+        threshold (int): Stock level whose crossings are reported, as in ``/low-stock``. Defaults to 10.
+        product_id (list[int]): Only report these products. Defaults to all of them.
+        crossings_only (bool): Only send ``low-stock`` and ``restocked`` events. Defaults to False.
+        last_event_id (str): ``Last-Event-ID`` header, sent by reconnecting clients to get the events they
+            missed. When those events are no longer available, a ``reset`` event is sent instead and the
+            client should reload ``/low-stock``.
+
+    Returns:
+        StreamingResponse: ``text/event-stream`` of stock events.
+
+    Raises:
+        HTTPException: 404 if stock events are disabled, 503 if too many clients are subscribed.
     """
-    return InventoryService(db).get_low_stock(threshold)
+    subscription = stock_events.subscribe(threshold, product_id, crossings_only, last_event_id)
+    return StreamingResponse(
+        subscription.stream(STOCK_EVENTS_KEEPALIVE),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.put("/{product_id}", response_model=schemas.Inventory)
@@ -69,20 +146,32 @@ def update_stock(product_id: int, data: schemas.InventoryBase, db: Session = Dep
 
 
 @router.get("/{product_id}/logs", response_model=list[schemas.InventoryLog])
-def get_inventory_logs(product_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def get_inventory_logs(
+    product_id: int,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Fields = None,
+    db: Session = Depends(get_read_db),
+):
     """Retrieves paginated inventory logs for a specific product.
 
     Args:
         product_id (int): ID of the product to get logs for.
-        skip (int): Number of logs to skip for pagination. Defaults to 0.
-        limit (int): Maximum number of logs to return. Defaults to 100.
+        skip (int): Number of logs to skip. Deprecated, use ``cursor`` instead. Defaults to 0.
+        limit (int): Maximum number of logs to return. Defaults to DEFAULT_PAGE_SIZE.
+        cursor (str): Cursor from the ``X-Next-Cursor`` header of the previous page.
+        fields (str): Comma-separated log fields to return. Defaults to all of them.
 
     Returns:
         list[schemas.InventoryLog]: List of inventory log entries
-        ordered by most recent changes first
+        ordered by most recent changes first. ``X-Next-Cursor`` is set when more pages exist.
 
     Raises:
-        HTTPException: 404 if product doesn't exist
+        HTTPException: 404 if product doesn't exist, 400 if the cursor is invalid
     """
-
-    return InventoryService(db).get_logs(product_id, skip=skip, limit=limit)
+    selected = field_set(schemas.InventoryLog, models.InventoryLog, fields, keys=("changed_at", "id"))
+    page = InventoryService(db).get_logs(product_id, skip=skip, limit=limit, cursor=cursor, columns=selected.columns)
+    response = rows_response(page.items, selected)
+    set_next_cursor(response, page)
+    return response
@@ -0,0 +1,34 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app import database
+from app.metrics import CACHE_METRICS, POOL_METRICS, render_stats, request_metrics
+from app.pool import pool_status
+from app.services import ProductService, SaleService
+
+router = APIRouter(tags=["System"])
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    """Exposes request, connection pool and cache metrics in the Prometheus text format.
+
+    Returns:
+        PlainTextResponse: Per-route latency histograms, in-flight requests, pool usage per engine
+        and cache counters per cache.
+    """
+    pools = {"sync": pool_status(database.engine)}
+    if database.async_engine is not None:
+        pools["async"] = pool_status(database.async_engine.sync_engine)
+    for index, engine in enumerate(database.replica_engines):
+        pools[f"replica-{index}"] = pool_status(engine)
+    caches = {"product": ProductService.cache.stats(), "analytics": SaleService.analytics_cache.stats()}
+
+    lines = [
+        *request_metrics.render(),
+        *render_stats(POOL_METRICS, "engine", pools),
+        *render_stats(CACHE_METRICS, "cache", caches),
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
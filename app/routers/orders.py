@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from app import schemas
+from app.config import ORDER_MAX_LINES
+from app.database import get_db
+from app.services import SaleService
+
+router = APIRouter(prefix="/orders", tags=["Orders"])
+
+
+@router.post("/", response_model=schemas.Order)
+def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)):
+    """Sells several products in one transaction, recording a sale per line.
+
+    Args:
+        order (schemas.OrderCreate): The sale date and the ordered lines; a product may appear on several lines.
+
+    Returns:
+        schemas.Order: Each line with its total, and the order total.
+
+    Raises:
+        HTTPException: 404 if a product or its inventory doesn't exist, 400 if stock is insufficient (nothing
+        is sold in either case), 413 if the order has more than ``ORDER_MAX_LINES`` lines.
+    """
+    if len(order.lines) > ORDER_MAX_LINES:
+        raise HTTPException(status_code=413, detail=f"At most {ORDER_MAX_LINES} lines can be ordered per request")
+    return SaleService(db).create_order(order)
@@ -1,8 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 
-from app import schemas
-from app.database import get_db
+from app import models, schemas
+from app.conditional import (
+    NOT_MODIFIED_RESPONSE,
+    etag_matches,
+    not_modified,
+    set_validators,
+    watermark_etag,
+)
+from app.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, PRODUCTS_CACHE_CONTROL
+from app.database import get_db, get_read_db
+from app.pagination import set_next_cursor
+from app.serialization import Fields, field_set, rows_response
 from app.services import ProductService
 
 router = APIRouter(prefix="/products", tags=["Products"])
@@ -24,18 +36,37 @@ def create_product(product: schemas.ProductCreate, db: Session = Depends(get_db)
     return ProductService(db).create_product(product)
 
 
-@router.get("/", response_model=list[schemas.Product])
-def list_products(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Retrieves a paginated list of products.
+@router.get("/", response_model=list[schemas.Product], responses=NOT_MODIFIED_RESPONSE)
+def list_products(
+    request: Request,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Fields = None,
+    db: Session = Depends(get_read_db),
+):
+    """Retrieves a page of products ordered by ID.
 
     Args:
-        skip (int): Number of records to skip (for pagination). Defaults to 0.
-        limit (int): Maximum number of records to return. Defaults to 100.
+        skip (int): Number of records to skip. Deprecated, use ``cursor`` instead. Defaults to 0.
+        limit (int): Maximum number of records to return. Defaults to DEFAULT_PAGE_SIZE.
+        cursor (str): Cursor from the ``X-Next-Cursor`` header of the previous page.
+        fields (str): Comma-separated product fields to return. Defaults to all of them.
 
     Returns:
-        list[schemas.Product]: List of product objects.
+        list[schemas.Product]: List of product objects. ``X-Next-Cursor`` is set when more pages exist.
+        A weak ``ETag`` is set too; sending it back in ``If-None-Match`` gets a 304 while products are unchanged.
     """
-    return ProductService(db).get_products(skip=skip, limit=limit)
+    selected = field_set(schemas.Product, models.Product, fields, keys=("id",))
+    service = ProductService(db)
+    etag = watermark_etag(service.get_watermark(), request.url.path, request.url.query)
+    if etag_matches(request, etag):
+        return not_modified(etag, PRODUCTS_CACHE_CONTROL)
+
+    page = service.get_products(skip=skip, limit=limit, cursor=cursor, columns=selected.columns)
+    response = rows_response(page.items, selected)
+    set_next_cursor(response, page)
+    return set_validators(response, etag, PRODUCTS_CACHE_CONTROL)
 
 
 @router.get("/{product_id}", response_model=schemas.Product)
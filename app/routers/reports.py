@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app import schemas
+from app.reports import ReportJob, ReportJobManager, get_report_jobs
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+
+def _job_response(job: ReportJob, request: Request) -> schemas.ReportJob:
+    result_url = str(request.url_for("download_report", job_id=job.id)) if job.status == "succeeded" else None
+    return schemas.ReportJob(
+        id=job.id,
+        kind=job.kind,
+        parameters=job.parameters,
+        status=job.status,
+        progress=job.progress,
+        rows=job.rows,
+        cancel_requested=job.cancel_event.is_set(),
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        expires_at=job.expires_at,
+        result_url=result_url,
+    )
+
+
+@router.post("/", response_model=schemas.ReportJob, status_code=status.HTTP_202_ACCEPTED)
+def create_report(
+    report: schemas.ReportCreate,
+    request: Request,
+    response: Response,
+    jobs: ReportJobManager = Depends(get_report_jobs),
+):
+    """Queues a report job that runs outside the request.
+
+    Poll the job at its ``Location`` until its status is ``succeeded``, then download it from ``result_url``.
+
+    Args:
+        report (schemas.ReportCreate): Report kind and the parameters of the matching ``/sales`` endpoint.
+
+    Returns:
+        schemas.ReportJob: The queued job.
+
+    Raises:
+        HTTPException: 422 if a parameter does not apply to the report kind, 429 if too many jobs are pending
+    """
+    job = jobs.submit(report)
+    response.headers["Location"] = str(request.url_for("get_report", job_id=job.id))
+    return _job_response(job, request)
+
+
+@router.get("/", response_model=list[schemas.ReportJob])
+def list_reports(request: Request, jobs: ReportJobManager = Depends(get_report_jobs)):
+    """Lists report jobs that have not expired, newest first."""
+    return [_job_response(job, request) for job in jobs.list()]
+
+
+@router.get("/{job_id}", response_model=schemas.ReportJob)
+def get_report(job_id: str, request: Request, jobs: ReportJobManager = Depends(get_report_jobs)):
+    """Retrieves a report job's status and progress.
+
+    Raises:
+        HTTPException: 404 if the job doesn't exist or has expired
+    """
+    return _job_response(jobs.get(job_id), request)
+
+
+@router.get("/{job_id}/result", response_class=FileResponse)
+def download_report(job_id: str, jobs: ReportJobManager = Depends(get_report_jobs)):
+    """Downloads a finished report: JSON for revenue reports, CSV or NDJSON for sales exports.
+
+    Raises:
+        HTTPException: 404 if the job doesn't exist or has expired, 409 if it hasn't succeeded
+    """
+    job = jobs.result(job_id)
+    return FileResponse(job.path, media_type=job.media_type, filename=job.filename)
+
+
+@router.post("/{job_id}/cancel", response_model=schemas.ReportJob)
+def cancel_report(job_id: str, request: Request, jobs: ReportJobManager = Depends(get_report_jobs)):
+    """Cancels a queued job, or stops a running one at its next checkpoint. Finished jobs are returned unchanged.
+
+    Raises:
+        HTTPException: 404 if the job doesn't exist or has expired
+    """
+    return _job_response(jobs.cancel(job_id), request)
+
+
+@router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_report(job_id: str, jobs: ReportJobManager = Depends(get_report_jobs)):
+    """Cancels a job if it is still pending and deletes it together with its result.
+
+    Raises:
+        HTTPException: 404 if the job doesn't exist or has expired
+    """
+    jobs.discard(job_id)
@@ -1,39 +1,146 @@
+import json
 from datetime import date
+from typing import Literal, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 
-from app import schemas
-from app.database import get_db
+from app import models, schemas
+from app.config import BULK_SALES_MAX_ROWS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.database import get_db, get_read_db
+from app.pagination import set_next_cursor
+from app.serialization import Fields, field_set, rows_response
 from app.services import SaleService
 
 router = APIRouter(prefix="/sales", tags=["Sales"])
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
 
 @router.post("/", response_model=schemas.Sale)
 def create_sale(sale: schemas.SaleCreate, db: Session = Depends(get_db)):
     return SaleService(db).create_sale(sale)
 
 
+@router.post(
+    "/bulk",
+    response_model=schemas.SaleBulkResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": {"type": "array", "items": schemas.SaleCreate.model_json_schema()}},
+                "application/x-ndjson": {"schema": schemas.SaleCreate.model_json_schema()},
+            },
+        }
+    },
+)
+async def create_sales_bulk(
+    request: Request,
+    mode: Literal["atomic", "best_effort"] = "atomic",
+    db: Session = Depends(get_db),
+):
+    """Records a batch of sales sent as a JSON array or as NDJSON (one sale per line).
+
+    Args:
+        mode (str): ``atomic`` writes nothing if any row fails; ``best_effort`` writes every valid row.
+
+    Returns:
+        schemas.SaleBulkResult: Number of created and failed rows with per-row errors.
+
+    Raises:
+        HTTPException: 400 with per-row errors if an atomic batch fails, 413 if the batch is too large.
+    """
+    body = await request.body()
+    media_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    try:
+        if media_type in NDJSON_MEDIA_TYPES:
+            raw_rows = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            raw_rows = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Request body is not valid JSON or NDJSON")
+    if not isinstance(raw_rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of sales")
+    if len(raw_rows) > BULK_SALES_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_SALES_MAX_ROWS} sales can be sent per request")
+
+    sales = []
+    rejected = []
+    for index, raw in enumerate(raw_rows):
+        try:
+            sales.append((index, schemas.SaleCreate.model_validate(raw)))
+        except ValidationError as exc:
+            detail = "; ".join(f"{'.'.join(map(str, e['loc']))}: {e['msg']}" for e in exc.errors())
+            rejected.append(schemas.SaleBulkError(index=index, detail=detail))
+
+    service = SaleService(db)
+    return await run_in_threadpool(service.create_sales_bulk, sales, atomic=mode == "atomic", rejected=rejected)
+
+
 @router.get("/", response_model=list[schemas.Sale])
 def list_sales(
     product_id: int = None,
     category: str = None,
     start_date: date = None,
     end_date: date = None,
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Fields = None,
+    db: Session = Depends(get_read_db)
 ):
-    return SaleService(db).get_filtered_sales(
+    selected = field_set(schemas.Sale, models.Sale, fields, keys=("sale_date", "id"))
+    page = SaleService(db).get_filtered_sales(
         product_id=product_id,
         category=category,
         start_date=start_date,
-        end_date=end_date
+        end_date=end_date,
+        limit=limit,
+        cursor=cursor,
+        columns=selected.columns,
+    )
+    response = rows_response(page.items, selected)
+    set_next_cursor(response, page)
+    return response
+
+
+@router.get("/export", response_class=StreamingResponse)
+def export_sales(
+    format: Literal["csv", "ndjson"] = "csv",
+    product_id: int = None,
+    category: str = None,
+    start_date: date = None,
+    end_date: date = None,
+    db: Session = Depends(get_read_db),
+):
+    """Streams every sale matching the ``GET /sales`` filters as CSV or NDJSON, newest first.
+
+    Args:
+        format (str): ``csv`` (with a header row) or ``ndjson``. Defaults to ``csv``.
+
+    Returns:
+        StreamingResponse: The export, sent as rows are read from the database.
+    """
+    chunks = SaleService(db).export_sales(
+        format, product_id=product_id, category=category, start_date=start_date, end_date=end_date
     )
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    headers = {"Content-Disposition": f'attachment; filename="sales.{format}"'}
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
 
 
 @router.get("/revenue")
-def get_revenue(period: str = "day", db: Session = Depends(get_db)):
-    return SaleService(db).get_revenue_by_period(period)
+def get_revenue(
+    period: str = "day",
+    start_date: date = None,
+    end_date: date = None,
+    db: Session = Depends(get_read_db)
+):
+    return SaleService(db).get_revenue_by_period(period, start_date=start_date, end_date=end_date)
 
 
 @router.get("/revenue/comparison")
@@ -41,10 +148,14 @@ def compare_revenue(
     period: str = "month",
     category: str = None,
     compare_periods: int = 2,  # Compare last 2 periods by default
-    db: Session = Depends(get_db)
+    start_date: date = None,
+    end_date: date = None,
+    db: Session = Depends(get_read_db)
 ):
     return SaleService(db).get_revenue_comparison(
         period=period,
         category=category,
-        compare_periods=compare_periods
+        compare_periods=compare_periods,
+        start_date=start_date,
+        end_date=end_date,
     )
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends
+
+from app import database
+from app.pool import pool_status
+from app.reports import ReportJobManager, get_report_jobs
+from app.services import ProductService, SaleService
+from app.stock_events import stock_events
+
+router = APIRouter(prefix="/system", tags=["System"])
+
+
+@router.get("/pool")
+def get_pool_status():
+    """Reports live connection pool usage for operators.
+
+    Returns:
+        dict: Checked-out and overflow connections plus checkout wait time and timeout counts,
+        per engine (``async`` is only present when DB_ASYNC is enabled, ``replica-N`` for each read replica).
+    """
+    status = {"sync": pool_status(database.engine)}
+    if database.async_engine is not None:
+        status["async"] = pool_status(database.async_engine.sync_engine)
+    for index, engine in enumerate(database.replica_engines):
+        status[f"replica-{index}"] = pool_status(engine)
+    return status
+
+
+@router.get("/cache")
+def get_cache_status():
+    """Reports hit/miss counters and occupancy of the service-layer caches."""
+    return {"product": ProductService.cache.stats(), "analytics": SaleService.analytics_cache.stats()}
+
+
+@router.get("/events")
+def get_stock_events_status():
+    """Reports stock event subscribers, events published and buffered, and slow subscribers disconnected."""
+    return stock_events.stats()
+
+
+@router.get("/replicas")
+def get_replica_status():
+    """Reports each read replica's health, reads and connection failures, and reads that fell back to the primary."""
+    return database.read_replicas.stats()
+
+
+@router.get("/reports")
+def get_report_jobs_status(jobs: ReportJobManager = Depends(get_report_jobs)):
+    """Reports report job workers, the pending limit and the number of jobs in each state."""
+    return jobs.stats()
@@ -1,8 +1,8 @@
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Annotated, Optional
+from typing import Annotated, Literal, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, model_validator, validator
 
 
 class ProductBase(BaseModel):
@@ -71,6 +71,38 @@ class Sale(SaleBase):
     model_config = {"from_attributes": True}
 
 
+class SaleBulkError(BaseModel):
+    index: Annotated[int, Field(..., description="Zero-based position of the row in the upload")]
+    product_id: Annotated[Optional[int], Field(None)]
+    detail: Annotated[str, Field(...)]
+
+
+class SaleBulkResult(BaseModel):
+    created: Annotated[int, Field(...)]
+    failed: Annotated[int, Field(...)]
+    errors: Annotated[list[SaleBulkError], Field(default_factory=list)]
+
+
+class OrderLine(BaseModel):
+    product_id: Annotated[int, Field(...)]
+    quantity: Annotated[int, Field(..., gt=0)]
+
+
+class OrderCreate(BaseModel):
+    sale_date: Annotated[date, Field(...)]
+    lines: Annotated[list[OrderLine], Field(..., min_length=1)]
+
+
+class OrderLineResult(OrderLine):
+    total_amount: Annotated[Decimal, Field(...)]
+
+
+class Order(BaseModel):
+    sale_date: Annotated[date, Field(...)]
+    total_amount: Annotated[Decimal, Field(...)]
+    lines: Annotated[list[OrderLineResult], Field(...)]
+
+
 class InventoryLogBase(BaseModel):
     product_id: Annotated[int, Field(...)]
     change: Annotated[int, Field(...)]
@@ -82,3 +114,64 @@ class InventoryLog(InventoryLogBase):
     id: int
 
     model_config = {"from_attributes": True}
+
+
+class ChangeFeed(BaseModel):
+    products: Annotated[list[Product], Field(..., description="Created or updated products, oldest change first")]
+    inventory: Annotated[list[Inventory], Field(..., description="Created or updated inventory, oldest change first")]
+    sales: Annotated[list[Sale], Field(..., description="New sales in the order they were recorded")]
+    inventory_logs: Annotated[list[InventoryLog], Field(..., description="New inventory log entries, in order")]
+    cursor: Annotated[str, Field(..., description="Pass as ``since`` to get the changes after these")]
+    has_more: Annotated[bool, Field(..., description="More changes are ready; request the next cursor right away")]
+
+
+# Parameters each report kind accepts, passed on to the SaleService method that builds it
+REPORT_PARAMETERS = {
+    "revenue": ("period", "start_date", "end_date"),
+    "revenue_comparison": ("period", "category", "compare_periods", "start_date", "end_date"),
+    "sales_export": ("format", "product_id", "category", "start_date", "end_date"),
+}
+
+
+class ReportCreate(BaseModel):
+    kind: Annotated[
+        Literal["revenue", "revenue_comparison", "sales_export"],
+        Field(..., description="``revenue`` and ``revenue_comparison`` give JSON, ``sales_export`` CSV or NDJSON"),
+    ]
+    period: Annotated[Optional[Literal["day", "week", "month", "year"]], Field(None)]
+    category: Annotated[Optional[str], Field(None)]
+    product_id: Annotated[Optional[int], Field(None)]
+    compare_periods: Annotated[Optional[int], Field(None, ge=1)]
+    start_date: Annotated[Optional[date], Field(None)]
+    end_date: Annotated[Optional[date], Field(None)]
+    format: Annotated[Optional[Literal["csv", "ndjson"]], Field(None)]
+
+    @model_validator(mode="after")
+    def parameters_match_kind(self):
+        unexpected = [name for name in self.parameters() if name not in REPORT_PARAMETERS[self.kind]]
+        if unexpected:
+            raise ValueError(f"{', '.join(unexpected)} not accepted by {self.kind} reports")
+        return self
+
+    def parameters(self) -> dict:
+        """The parameters that were set, as keyword arguments for the report's service method."""
+        return self.model_dump(exclude={"kind"}, exclude_none=True)
+
+
+class ReportJob(BaseModel):
+    id: str
+    kind: str
+    parameters: dict
+    status: Annotated[
+        Literal["queued", "running", "succeeded", "failed", "cancelled"],
+        Field(..., description="Jobs end as succeeded, failed or cancelled"),
+    ]
+    progress: Annotated[float, Field(..., description="Fraction done, from 0 to 1")]
+    rows: Annotated[int, Field(..., description="Rows written to the result so far")]
+    cancel_requested: bool
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Annotated[Optional[datetime], Field(None, description="When a finished job and its result are deleted")]
+    result_url: Annotated[Optional[str], Field(None, description="Download link, once the job has succeeded")]
@@ -0,0 +1,113 @@
+"""Fast serialization path for large list endpoints.
+
+The list endpoints select plain column tuples instead of ORM entities and encode them straight to
+JSON, skipping entity hydration and per-row pydantic validation. The columns are taken from the
+response schema so the body keeps the schema's fields, field order and formats: decimals as strings,
+dates and datetimes in ISO 8601 with ``Z`` for UTC, as pydantic renders them. The routes keep their
+``response_model`` so the OpenAPI schema is unchanged.
+
+A ``fields`` query parameter narrows both the SELECT and the response to the listed fields, so
+large columns such as ``Product.description`` are neither read from the database nor sent.
+
+The encoder is orjson, a declared dependency; the standard library encoder only stands in where it can't be
+installed.
+"""
+
+import json
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Annotated, Any, Optional
+
+from fastapi import HTTPException, Query, status
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import InstrumentedAttribute
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+Fields = Annotated[
+    Optional[str],
+    Query(
+        description="Comma-separated fields to return (e.g. ``id,name,price``); only these columns are read",
+        examples=["id,name,price"],
+    ),
+]
+
+
+@dataclass(frozen=True)
+class FieldSet:
+    """The fields a response returns and the columns selected for them.
+
+    ``columns`` starts with the returned fields' columns, in schema order, followed by any key columns
+    that pagination needs but the client did not ask for; ``rows_response`` drops those trailing ones.
+    """
+
+    names: tuple[str, ...]
+    columns: tuple[InstrumentedAttribute, ...]
+
+
+@lru_cache(maxsize=256)
+def field_set(
+    schema: type[BaseModel], model: type, fields: Optional[str] = None, keys: tuple[str, ...] = ()
+) -> FieldSet:
+    """Resolves a ``fields`` query parameter against ``schema``; ``None`` selects every field.
+
+    Raises:
+        HTTPException: 400 if ``fields`` is empty or names a field ``schema`` doesn't have.
+    """
+    available = list(schema.model_fields)
+    if fields is None:
+        names = available
+    else:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested.difference(available))
+        if unknown or not requested:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}. Available: {', '.join(available)}",
+            )
+        names = [name for name in available if name in requested]
+
+    selected = names + [key for key in keys if key not in names]
+    return FieldSet(names=tuple(names), columns=tuple(getattr(model, name) for name in selected))
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None and value.utcoffset().total_seconds() == 0:
+            return value.replace(tzinfo=None).isoformat() + "Z"
+        return value.isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def row_dicts(rows: Sequence[Sequence[Any]], fields: FieldSet) -> list[dict[str, Any]]:
+    """Rows selected as ``fields.columns`` as dicts with ``fields.names`` keys."""
+    names = fields.names
+    return [dict(zip(names, row)) for row in rows]
+
+
+def rows_response(rows: Sequence[Sequence[Any]], fields: FieldSet) -> FastJSONResponse:
+    """Encodes rows selected as ``fields.columns`` into a JSON array of objects with ``fields.names`` keys."""
+    return FastJSONResponse(row_dicts(rows, fields))
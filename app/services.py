@@ -1,15 +1,66 @@
-from datetime import date
-from typing import Optional
+import csv
+import io
+import json
+from collections.abc import Callable, Collection, Iterator, Sequence
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import takewhile, zip_longest
+from typing import Any, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import desc, extract, func
+from pydantic import BaseModel
+from sqlalchemy import (
+    bindparam,
+    delete,
+    desc,
+    event,
+    extract,
+    func,
+    insert,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import InstrumentedAttribute, Session
 
-from app import models, schemas
+from app import columnar, models, schemas
+from app.cache import Cache, ResultCache, ResultScope, build_cache
+from app.columnar import SalesSnapshot, columnar_snapshot
+from app.conditional import watermark_query
+from app.config import (
+    ANALYTICS_CACHE_ENABLED,
+    ANALYTICS_CACHE_SIZE,
+    ANALYTICS_CACHE_TTL,
+    CHANGES_SETTLE_SECONDS,
+    DEFAULT_PAGE_SIZE,
+    EXPORT_CHUNK_SIZE,
+    PRODUCT_CACHE_ENABLED,
+    PRODUCT_CACHE_SIZE,
+    PRODUCT_CACHE_TTL,
+)
+from app.pagination import (
+    Page,
+    after_keyset,
+    before_keyset,
+    decode_cursor,
+    encode_cursor,
+)
+from app.replicas import is_replica_session
+from app.serialization import field_set, row_dicts
+from app.stock_events import record_stock_change, stock_events
+
+product_cache: Cache = build_cache(PRODUCT_CACHE_ENABLED, PRODUCT_CACHE_SIZE, PRODUCT_CACHE_TTL)
+analytics_cache: ResultCache = ResultCache(ANALYTICS_CACHE_SIZE, ANALYTICS_CACHE_TTL, enabled=ANALYTICS_CACHE_ENABLED)
 
 
 class ProductService:
+    # Read-through cache of ``schemas.Product`` snapshots keyed by product id
+    cache: Cache = product_cache
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -18,13 +69,81 @@ class ProductService:
         self.db.add(db_product)
         self.db.commit()
         self.db.refresh(db_product)
+        self.cache.invalidate(db_product.id)
         return db_product
 
-    def get_product(self, product_id: int) -> Optional[models.Product]:
-        return self.db.query(models.Product).filter(models.Product.id == product_id).first()
+    def get_product(self, product_id: int) -> Optional[schemas.Product]:
+        product = self.cache.get(product_id)
+        if product is None:
+            db_product = self.db.query(models.Product).filter(models.Product.id == product_id).first()
+            if db_product is None:
+                return None
+            product = schemas.Product.model_validate(db_product)
+            # A replica row may be older than the primary's; caching it would outlive the invalidation.
+            if not is_replica_session(self.db):
+                self.cache.set(product_id, product)
+        return product
+
+    def get_products(
+        self,
+        skip: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[InstrumentedAttribute]] = None,
+    ) -> Page[models.Product]:
+        """Pages products by ID.
+
+        With ``columns`` (which must include ``id``), rows of just those columns are returned instead of entities.
+        """
+        query = self.db.query(*columns) if columns else self.db.query(models.Product)
+        if cursor:
+            (last_id,) = decode_cursor(cursor, int)
+            query = query.filter(models.Product.id > last_id)
+        elif skip:
+            query = query.offset(skip)
+
+        rows = query.order_by(models.Product.id).limit(limit + 1).all()
+        return Page.from_rows(rows, limit, lambda p: (p.id,))
+
+    def get_watermark(self) -> tuple:
+        """Row count, max id and latest ``updated_at`` of products, for ETags (see ``app.conditional``)."""
+        return tuple(self.db.execute(watermark_query(models.Product.id, models.Product.updated_at)).one())
 
-    def get_products(self, skip: int = 0, limit: int = 100) -> list[models.Product]:
-        return self.db.query(models.Product).offset(skip).limit(limit).all()
+
+@event.listens_for(models.Product, "after_update")
+@event.listens_for(models.Product, "after_delete")
+def _invalidate_cached_product(mapper, connection, target: models.Product) -> None:
+    # Drop the entry at flush time and again once the change is committed, so a concurrent
+    # reader cannot re-cache the old row in between.
+    ProductService.cache.invalidate(target.id)
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault("stale_products", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_products(session: Session) -> None:
+    for product_id in session.info.pop("stale_products", ()):
+        ProductService.cache.invalidate(product_id)
+    if session.info.pop("recategorized_sales", False):
+        # Any cached revenue may include the moved sales, and the snapshot codes each row's category.
+        analytics_cache.clear()
+        if columnar.sales_snapshot is not None:
+            columnar.sales_snapshot.mark_dirty()
+
+
+@event.listens_for(models.Product, "after_update")
+def _sync_sale_categories(mapper, connection, target: models.Product) -> None:
+    # Sales carry a copy of their product's category; rewrite it, and move their revenue between the
+    # category rollups, in the same transaction as the product.
+    if not inspect(target).attrs.category.history.has_changes():
+        return
+    with Session(bind=connection) as db:
+        RevenueRollupService(db).move_category(target.id, target.category)
+    connection.execute(update(models.Sale).where(models.Sale.product_id == target.id).values(category=target.category))
+    session = Session.object_session(target)
+    if session is not None:
+        session.info["recategorized_sales"] = True
 
 
 class InventoryService:
@@ -41,7 +160,7 @@ class InventoryService:
             )
 
         # Check if the referenced product exists
-        product = self.db.query(models.Product).filter(models.Product.id == inventory.product_id).first()
+        product = ProductService(self.db).get_product(inventory.product_id)
         if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -53,6 +172,7 @@ class InventoryService:
 
         log = models.InventoryLog(product_id=inventory.product_id, change=inventory.stock, reason="initial stock")
         self.db.add(log)
+        record_stock_change(self.db, inventory.product_id, inventory.stock, None, "initial stock")
 
         self.db.commit()
         self.db.refresh(db_inventory)
@@ -61,16 +181,24 @@ class InventoryService:
     def get_inventory(self, product_id: int) -> Optional[models.Inventory]:
         return self.db.query(models.Inventory).filter(models.Inventory.product_id == product_id).first()
 
-    def get_all_inventory(self) -> list[models.Inventory]:
-        return self.db.query(models.Inventory).all()
+    def get_all_inventory(self, columns: Optional[Sequence[InstrumentedAttribute]] = None) -> list[models.Inventory]:
+        return self.db.query(*columns).all() if columns else self.db.query(models.Inventory).all()
+
+    def get_watermark(self) -> tuple:
+        """Row count, max id and latest ``last_updated`` of inventory records, for ETags."""
+        return tuple(self.db.execute(watermark_query(models.Inventory.id, models.Inventory.last_updated)).one())
 
-    def get_low_stock(self, threshold: int = 10) -> list[models.Inventory]:
-        return self.db.query(models.Inventory).filter(models.Inventory.stock < threshold).all()
+    def get_low_stock(
+        self, threshold: int = 10, columns: Optional[Sequence[InstrumentedAttribute]] = None
+    ) -> list[models.Inventory]:
+        query = self.db.query(*columns) if columns else self.db.query(models.Inventory)
+        return query.filter(models.Inventory.stock < threshold).all()
 
     def update_inventory_stock(self, product_id: int, stock: int) -> Optional[models.Inventory]:
         inventory = self.get_inventory(product_id)
         if inventory:
             change = stock - inventory.stock
+            record_stock_change(self.db, product_id, stock, inventory.stock, "manual adjustment")
             inventory.stock = stock
 
             log = models.InventoryLog(product_id=product_id, change=change, reason="manual adjustment")
@@ -79,77 +207,673 @@ class InventoryService:
             self.db.refresh(inventory)
         return inventory
 
-    def get_logs(self, product_id: int, skip: int = 0, limit: int = 100) -> list[models.InventoryLog]:
+    def get_logs(
+        self,
+        product_id: int,
+        skip: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[InstrumentedAttribute]] = None,
+    ) -> Page[models.InventoryLog]:
+        """Pages a product's inventory changes, newest first.
+
+        With ``columns`` (which must include ``changed_at`` and ``id``), rows of just those columns are returned
+        instead of entities.
+        """
         product = ProductService(self.db).get_product(product_id)
         if not product:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Product with id {product_id} not found")
 
-        return (
-            self.db.query(models.InventoryLog)
-            .filter(models.InventoryLog.product_id == product_id)
-            .order_by(models.InventoryLog.changed_at.desc())
-            .offset(skip)
+        log = models.InventoryLog
+        query = (self.db.query(*columns) if columns else self.db.query(log)).filter(log.product_id == product_id)
+        if cursor:
+            changed_at, last_id = decode_cursor(cursor, datetime, int)
+            query = query.filter(before_keyset(log.changed_at, changed_at, log.id, last_id))
+        elif skip:
+            query = query.offset(skip)
+
+        rows = query.order_by(log.changed_at.desc(), log.id.desc()).limit(limit + 1).all()
+        return Page.from_rows(rows, limit, lambda r: (r.changed_at, r.id))
+
+
+class RevenueRollupService:
+    """Maintains the ``daily_revenue`` and ``daily_category_revenue`` rollup tables.
+
+    ``apply`` only stages the upserts; the caller owns the transaction so the rollups
+    commit (or roll back) together with the sales they summarise.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply(self, sale_date: date, category: str, total_amount: Decimal, sale_count: int = 1) -> None:
+        self.apply_many([(sale_date, category, total_amount, sale_count)])
+
+    def apply_many(self, rows: list[tuple[date, str, Decimal, int]]) -> None:
+        """Adds ``(sale_date, category, total_amount, sale_count)`` deltas to both rollups."""
+        if not rows:
+            return
+
+        daily: dict[date, list] = {}
+        by_category: dict[tuple[str, date], list] = {}
+        for sale_date, category, total_amount, sale_count in rows:
+            day = daily.setdefault(sale_date, [Decimal(0), 0])
+            day[0] += total_amount
+            day[1] += sale_count
+            cat = by_category.setdefault((category, sale_date), [Decimal(0), 0])
+            cat[0] += total_amount
+            cat[1] += sale_count
+
+        self._upsert(
+            models.DailyRevenue,
+            [{"sale_date": d, "total_amount": t, "sale_count": c} for d, (t, c) in daily.items()],
+        )
+        self._upsert(
+            models.DailyCategoryRevenue,
+            [
+                {"category": k, "sale_date": d, "total_amount": t, "sale_count": c}
+                for (k, d), (t, c) in by_category.items()
+            ],
+        )
+
+    def move_category(self, product_id: int, category: str) -> None:
+        """Stages moving the revenue of ``product_id``'s sales to ``category`` in the category rollup.
+
+        Call it before the sales' own ``category`` is rewritten: the rows are taken out of the categories
+        the sales still carry.
+        """
+        moved = self.db.execute(
+            select(
+                models.Sale.category,
+                models.Sale.sale_date,
+                func.sum(models.Sale.total_amount),
+                func.count(models.Sale.id),
+            )
+            .where(models.Sale.product_id == product_id, models.Sale.category != category)
+            .group_by(models.Sale.category, models.Sale.sale_date)
+        ).all()
+        if not moved:
+            return
+        rollup = models.DailyCategoryRevenue
+        added: dict[date, list] = {}
+        for _, sale_date, total_amount, sale_count in moved:
+            day = added.setdefault(sale_date, [Decimal(0), 0])
+            day[0] += total_amount
+            day[1] += sale_count
+        # Negative deltas take the revenue out of the categories it was filed under; rows left empty are dropped.
+        self._upsert(
+            rollup,
+            [{"category": k, "sale_date": d, "total_amount": -t, "sale_count": -c} for k, d, t, c in moved],
+        )
+        self._upsert(
+            rollup,
+            [{"category": category, "sale_date": d, "total_amount": t, "sale_count": c} for d, (t, c) in added.items()],
+        )
+        self.db.execute(
+            delete(rollup).where(rollup.category.in_({row[0] for row in moved}), rollup.sale_count <= 0)
+        )
+
+    def rebuild(self, start_date: Optional[date] = None, end_date: Optional[date] = None) -> int:
+        """Recomputes the rollups from ``sales`` (optionally for a date range) and commits.
+
+        Returns the number of daily rows written.
+        """
+        daily_filter = []
+        category_filter = []
+        sales_filter = []
+        if start_date:
+            daily_filter.append(models.DailyRevenue.sale_date >= start_date)
+            category_filter.append(models.DailyCategoryRevenue.sale_date >= start_date)
+            sales_filter.append(models.Sale.sale_date >= start_date)
+        if end_date:
+            daily_filter.append(models.DailyRevenue.sale_date <= end_date)
+            category_filter.append(models.DailyCategoryRevenue.sale_date <= end_date)
+            sales_filter.append(models.Sale.sale_date <= end_date)
+
+        try:
+            self.db.execute(delete(models.DailyRevenue).where(*daily_filter))
+            self.db.execute(delete(models.DailyCategoryRevenue).where(*category_filter))
+
+            daily_rows = (
+                select(models.Sale.sale_date, func.sum(models.Sale.total_amount), func.count(models.Sale.id))
+                .where(*sales_filter)
+                .group_by(models.Sale.sale_date)
+            )
+            result = self.db.execute(
+                insert(models.DailyRevenue).from_select(["sale_date", "total_amount", "sale_count"], daily_rows)
+            )
+
+            category_rows = (
+                select(
+                    models.Sale.category,
+                    models.Sale.sale_date,
+                    func.sum(models.Sale.total_amount),
+                    func.count(models.Sale.id),
+                )
+                .where(*sales_filter)
+                .group_by(models.Sale.category, models.Sale.sale_date)
+            )
+            self.db.execute(
+                insert(models.DailyCategoryRevenue).from_select(
+                    ["category", "sale_date", "total_amount", "sale_count"], category_rows
+                )
+            )
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
+        analytics_cache.clear()
+        return result.rowcount
+
+    def _upsert(self, model, rows: list[dict]) -> None:
+        table = model.__table__
+        dialect = self.db.get_bind().dialect.name
+
+        if dialect == "mysql":
+            stmt = mysql_insert(table)
+            stmt = stmt.on_duplicate_key_update(
+                total_amount=table.c.total_amount + stmt.inserted.total_amount,
+                sale_count=table.c.sale_count + stmt.inserted.sale_count,
+            )
+            self.db.execute(stmt, rows)
+        elif dialect == "sqlite":
+            stmt = sqlite_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[c.name for c in table.primary_key],
+                set_={
+                    "total_amount": table.c.total_amount + stmt.excluded.total_amount,
+                    "sale_count": table.c.sale_count + stmt.excluded.sale_count,
+                },
+            )
+            self.db.execute(stmt, rows)
+        else:
+            for row in rows:
+                keys = [table.c[c.name] == row[c.name] for c in table.primary_key]
+                updated = self.db.execute(
+                    update(table)
+                    .where(*keys)
+                    .values(
+                        total_amount=table.c.total_amount + row["total_amount"],
+                        sale_count=table.c.sale_count + row["sale_count"],
+                    )
+                )
+                if not updated.rowcount:
+                    self.db.execute(insert(table).values(**row))
+
+
+class SaleCategoryService:
+    """Finds and repairs sales whose denormalized ``category`` no longer matches their product's.
+
+    Writes keep the copy in step, so drift only comes from changes made outside the app. Repairs walk
+    ``sales`` in primary key ranges of ``batch_size`` and commit each batch, so no single statement locks
+    the whole table.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def check(self, limit: int = 20) -> tuple[int, list[dict]]:
+        """The number of drifted sales and up to ``limit`` of them, oldest first."""
+        drifted = select(models.Sale).join(models.Product).where(models.Sale.category != models.Product.category)
+        count = self.db.scalar(drifted.with_only_columns(func.count()))
+        rows = self.db.execute(
+            drifted.with_only_columns(
+                models.Sale.id, models.Sale.product_id, models.Sale.category, models.Product.category.label("expected")
+            )
+            .order_by(models.Sale.id)
             .limit(limit)
-            .all()
         )
+        return count, [dict(row._mapping) for row in rows]
+
+    def repair(self, batch_size: int = 10_000) -> int:
+        """Copies each product's category onto its drifted sales and commits; returns how many were fixed."""
+        last_id = self.db.scalar(select(func.max(models.Sale.id))) or 0
+        product_category = (
+            select(models.Product.category).where(models.Product.id == models.Sale.product_id).scalar_subquery()
+        )
+        fixed = 0
+        for start in range(0, last_id, batch_size):
+            try:
+                result = self.db.execute(
+                    update(models.Sale)
+                    .where(
+                        models.Sale.id > start,
+                        models.Sale.id <= start + batch_size,
+                        models.Sale.category != product_category,
+                    )
+                    .values(category=product_category)
+                    .execution_options(synchronize_session=False)
+                )
+                self.db.commit()
+            except SQLAlchemyError:
+                self.db.rollback()
+                raise
+            fixed += result.rowcount
+        return fixed
 
 
 class SaleService:
+    # Revenue report results keyed by their parameters; recorded sales invalidate what they touch
+    analytics_cache: ResultCache = analytics_cache
+
     def __init__(self, db: Session):
         self.db = db
 
-    def create_sale(self, sale: schemas.SaleCreate) -> models.Sale:
+    def create_sale(self, sale: schemas.SaleCreate) -> schemas.Sale:
         try:
-            product = self.db.query(models.Product).filter(models.Product.id == sale.product_id).first()
-            if not product:
-                raise HTTPException(status_code=404, detail=f"Product with id {sale.product_id} does not exist")
+            # Price and category come from the product cache when possible; otherwise RETURNING fetches them,
+            # along with the remaining stock for the stock events feed.
+            product = ProductService.cache.get(sale.product_id)
+            returning = (product is None or stock_events.enabled) and self.db.get_bind().dialect.update_returning
 
-            inventory = self.db.query(models.Inventory).filter(models.Inventory.product_id == sale.product_id).first()
-            if not inventory:
-                raise HTTPException(status_code=404, detail="Inventory not found")
+            # The guarded UPDATE is the stock check: it only matches while enough stock is left, so
+            # concurrent sales of the same product can never oversell it.
+            result = self.db.execute(
+                self._decrement_stock_statement(sale.product_id, sale.quantity, returning, with_product=product is None)
+            )
+            updated = None
+            if returning:
+                updated = result.first()
+                decremented = updated is not None
+            else:
+                decremented = result.rowcount > 0
+            if not decremented:
+                self.db.rollback()
+                raise self._sale_rejection(sale)
 
-            if inventory.stock < sale.quantity:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Not enough stock. Available: {inventory.stock}, Requested: {sale.quantity}",
-                )
+            if product is None:
+                product = updated or ProductService(self.db).get_product(sale.product_id)
+            price, category = product.price, product.category
+            if stock_events.enabled:
+                stock = updated.stock if updated else self.db.scalar(self._stock_statement(sale.product_id))
+                record_stock_change(self.db, sale.product_id, stock, stock + sale.quantity, "sale")
 
-            total_amount = product.price * sale.quantity
-            db_sale = models.Sale()
-            db_sale.product_id = sale.product_id
-            db_sale.quantity = sale.quantity
-            db_sale.sale_date = sale.sale_date
-            db_sale.total_amount = total_amount
+            total_amount = price * sale.quantity
+            db_sale = models.Sale(
+                product_id=sale.product_id,
+                quantity=sale.quantity,
+                sale_date=sale.sale_date,
+                total_amount=total_amount,
+                category=category,
+            )
             self.db.add(db_sale)
 
-            inventory.stock -= sale.quantity
-
             log = models.InventoryLog(
                 product_id=sale.product_id, change=-sale.quantity, reason="sale"  # Negative for deduction
             )
             self.db.add(log)
 
+            RevenueRollupService(self.db).apply(sale.sale_date, category, total_amount)
+
+            # Build the response before committing: every value is already known, so no refresh is needed.
+            self.db.flush()
+            created = schemas.Sale.model_validate(db_sale)
             self.db.commit()
-            self.db.refresh(db_sale)
-            return db_sale
+            self.analytics_cache.invalidate(sale.sale_date, category)
+            return created
         except SQLAlchemyError:
             self.db.rollback()
             raise HTTPException(status_code=500, detail="Internal server error during sale transaction")
 
+    @staticmethod
+    def _decrement_stock_statement(product_id: int, quantity: int, returning: bool, with_product: bool = True):
+        """``UPDATE inventory SET stock = stock - :q WHERE product_id = :p AND stock >= :q``.
+
+        Where the backend supports ``UPDATE .. RETURNING`` the remaining stock and, with ``with_product``,
+        the product's price and category are returned by the same statement, saving the round trips to
+        look them up.
+        """
+        inventory = models.Inventory.__table__
+        stmt = (
+            update(inventory)
+            .where(inventory.c.product_id == product_id, inventory.c.stock >= quantity)
+            .values(stock=inventory.c.stock - quantity)
+        )
+        if returning:
+            columns = [inventory.c.stock]
+            if with_product:
+                product = select(models.Product.price, models.Product.category).where(models.Product.id == product_id)
+                columns += [
+                    product.with_only_columns(models.Product.price).scalar_subquery().label("price"),
+                    product.with_only_columns(models.Product.category).scalar_subquery().label("category"),
+                ]
+            stmt = stmt.returning(*columns)
+        return stmt
+
+    @staticmethod
+    def _stock_statement(product_id: int):
+        """The stock left after a sale, on backends without ``UPDATE .. RETURNING``; the row is locked by then."""
+        return select(models.Inventory.stock).where(models.Inventory.product_id == product_id)
+
+    @staticmethod
+    def _sale_rejection_statement(product_id: int):
+        return (
+            select(models.Product.id, models.Inventory.stock)
+            .outerjoin(models.Inventory, models.Inventory.product_id == models.Product.id)
+            .where(models.Product.id == product_id)
+        )
+
+    @staticmethod
+    def _sale_rejection_error(row, sale: schemas.SaleCreate) -> HTTPException:
+        if row is None:
+            return HTTPException(status_code=404, detail=f"Product with id {sale.product_id} does not exist")
+        if row.stock is None:
+            return HTTPException(status_code=404, detail="Inventory not found")
+        return HTTPException(
+            status_code=400,
+            detail=f"Not enough stock. Available: {row.stock}, Requested: {sale.quantity}",
+        )
+
+    def _sale_rejection(self, sale: schemas.SaleCreate) -> HTTPException:
+        """Explains why the guarded stock decrement matched no row. Only runs on the failure path."""
+        row = self.db.execute(self._sale_rejection_statement(sale.product_id)).first()
+        return self._sale_rejection_error(row, sale)
+
+    def create_sales_bulk(
+        self,
+        sales: list[tuple[int, schemas.SaleCreate]],
+        atomic: bool = True,
+        rejected: Optional[list[schemas.SaleBulkError]] = None,
+    ) -> schemas.SaleBulkResult:
+        """Records many sales in one transaction using multi-row inserts.
+
+        ``sales`` pairs each row with its position in the upload so errors can point back at it,
+        and ``rejected`` carries rows that already failed validation. In atomic mode any error
+        aborts the whole batch with a 400; otherwise the valid rows are written and the rest reported.
+        """
+        errors = list(rejected or [])
+        product_ids = {sale.product_id for _, sale in sales}
+
+        try:
+            products = self._products(product_ids)
+            locked_stock = self._lock_stock(product_ids)
+            stock = dict(locked_stock)
+
+            accepted: list[tuple[schemas.SaleCreate, Decimal, str]] = []
+            for index, sale in sales:
+                product = products.get(sale.product_id)
+                if product is None:
+                    detail = f"Product with id {sale.product_id} does not exist"
+                elif sale.product_id not in stock:
+                    detail = "Inventory not found"
+                elif stock[sale.product_id] < sale.quantity:
+                    detail = f"Not enough stock. Available: {stock[sale.product_id]}, Requested: {sale.quantity}"
+                else:
+                    stock[sale.product_id] -= sale.quantity
+                    accepted.append((sale, product.price * sale.quantity, product.category))
+                    continue
+                errors.append(schemas.SaleBulkError(index=index, product_id=sale.product_id, detail=detail))
+
+            errors.sort(key=lambda error: error.index)
+            if errors and atomic:
+                self.db.rollback()
+                raise HTTPException(
+                    status_code=400,
+                    detail=schemas.SaleBulkResult(created=0, failed=len(errors), errors=errors).model_dump(),
+                )
+
+            if accepted:
+                self._write_bulk_sales(accepted)
+                for product_id, remaining in stock.items():
+                    if remaining != locked_stock[product_id]:
+                        record_stock_change(self.db, product_id, remaining, locked_stock[product_id], "sale")
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail="Internal server error during bulk sale transaction")
+
+        for sale_date, category in {(sale.sale_date, category) for sale, _, category in accepted}:
+            self.analytics_cache.invalidate(sale_date, category)
+
+        return schemas.SaleBulkResult(created=len(accepted), failed=len(errors), errors=errors)
+
+    def create_order(self, order: schemas.OrderCreate) -> schemas.Order:
+        """Sells every line of ``order`` in one transaction: either all lines are recorded or none are.
+
+        The statement count doesn't grow with the number of lines: one lookup of the products not in the
+        cache, one ``SELECT .. FOR UPDATE`` of their inventory and one multi-row insert each for sales and
+        logs. Inventory rows are locked and decremented in product id order, so orders that share products
+        wait for each other instead of deadlocking. Lines for the same product are checked against its
+        stock together.
+
+        Raises:
+            HTTPException: 404 if a product or its inventory doesn't exist, 400 if a product doesn't have
+                enough stock for all of its lines.
+        """
+        quantities: dict[int, int] = {}
+        for line in order.lines:
+            quantities[line.product_id] = quantities.get(line.product_id, 0) + line.quantity
+        product_ids = sorted(quantities)
+
+        try:
+            products = self._products(product_ids)
+            locked_stock = self._lock_stock(product_ids)
+            for product_id in product_ids:
+                if product_id not in products:
+                    error = HTTPException(status_code=404, detail=f"Product with id {product_id} does not exist")
+                elif product_id not in locked_stock:
+                    error = HTTPException(status_code=404, detail=f"Inventory not found for product {product_id}")
+                elif locked_stock[product_id] < quantities[product_id]:
+                    error = HTTPException(
+                        status_code=400,
+                        detail=f"Not enough stock for product {product_id}. "
+                        f"Available: {locked_stock[product_id]}, Requested: {quantities[product_id]}",
+                    )
+                else:
+                    continue
+                self.db.rollback()
+                raise error
+
+            accepted = [
+                (
+                    schemas.SaleCreate(product_id=line.product_id, quantity=line.quantity, sale_date=order.sale_date),
+                    products[line.product_id].price * line.quantity,
+                    products[line.product_id].category,
+                )
+                for line in order.lines
+            ]
+            self._write_bulk_sales(accepted)
+            for product_id in product_ids:
+                stock = locked_stock[product_id]
+                record_stock_change(self.db, product_id, stock - quantities[product_id], stock, "sale")
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise HTTPException(status_code=500, detail="Internal server error during order transaction")
+
+        for category in {category for _, _, category in accepted}:
+            self.analytics_cache.invalidate(order.sale_date, category)
+
+        return schemas.Order(
+            sale_date=order.sale_date,
+            total_amount=sum(total_amount for _, total_amount, _ in accepted),
+            lines=[
+                schemas.OrderLineResult(product_id=sale.product_id, quantity=sale.quantity, total_amount=total_amount)
+                for sale, total_amount, _ in accepted
+            ],
+        )
+
+    def _products(self, product_ids: Collection[int]) -> dict[int, schemas.Product]:
+        """The products with ``product_ids`` that exist, from the product cache where possible."""
+        products = {}
+        for product_id in product_ids:
+            cached = ProductService.cache.get(product_id)
+            if cached is not None:
+                products[product_id] = cached
+        missing = set(product_ids) - products.keys()
+        if missing:
+            for db_product in self.db.scalars(select(models.Product).where(models.Product.id.in_(missing))):
+                products[db_product.id] = schemas.Product.model_validate(db_product)
+                ProductService.cache.set(db_product.id, products[db_product.id])
+        return products
+
+    def _lock_stock(self, product_ids: Collection[int]) -> dict[int, int]:
+        """Locks the inventory rows of ``product_ids`` and returns their stock.
+
+        Rows are locked in product id order, the same order ``_write_bulk_sales`` updates them in, so two
+        transactions locking overlapping products can't each hold a row the other is waiting for.
+        """
+        rows = self.db.execute(
+            select(models.Inventory.product_id, models.Inventory.stock)
+            .where(models.Inventory.product_id.in_(product_ids))
+            .order_by(models.Inventory.product_id)
+            .with_for_update()
+        )
+        return {row.product_id: row.stock for row in rows}
+
+    def _write_bulk_sales(self, accepted: list[tuple[schemas.SaleCreate, Decimal, str]]) -> None:
+        self.db.execute(
+            insert(models.Sale),
+            [
+                {
+                    "product_id": sale.product_id,
+                    "quantity": sale.quantity,
+                    "sale_date": sale.sale_date,
+                    "total_amount": total_amount,
+                    "category": category,
+                }
+                for sale, total_amount, category in accepted
+            ],
+        )
+        self.db.execute(
+            insert(models.InventoryLog),
+            [{"product_id": sale.product_id, "change": -sale.quantity, "reason": "sale"} for sale, _, _ in accepted],
+        )
+
+        quantities: dict[int, int] = {}
+        for sale, _, _ in accepted:
+            quantities[sale.product_id] = quantities.get(sale.product_id, 0) + sale.quantity
+
+        # Decrement relative to the stored value and re-check the guard, so a concurrent writer can never
+        # push stock below zero even on backends where the FOR UPDATE read above is a no-op.
+        inventory = models.Inventory.__table__
+        result = self.db.execute(
+            update(inventory)
+            .where(inventory.c.product_id == bindparam("b_product_id"), inventory.c.stock >= bindparam("b_quantity"))
+            .values(stock=inventory.c.stock - bindparam("b_quantity")),
+            [
+                {"b_product_id": product_id, "b_quantity": quantity}
+                for product_id, quantity in sorted(quantities.items())
+            ],
+        )
+        if self.db.get_bind().dialect.supports_sane_multi_rowcount and result.rowcount != len(quantities):
+            self.db.rollback()
+            raise HTTPException(status_code=409, detail="Stock changed during the transaction, please retry")
+
+        RevenueRollupService(self.db).apply_many(
+            [(sale.sale_date, category, total_amount, 1) for sale, total_amount, category in accepted]
+        )
+
     def get_filtered_sales(
         self,
         product_id: Optional[int] = None,
         category: Optional[str] = None,
         start_date: Optional[date] = None,
-        end_date: Optional[date] = None
-    ) -> list[models.Sale]:
-        query = self.db.query(models.Sale)
+        end_date: Optional[date] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        columns: Optional[Sequence[InstrumentedAttribute]] = None,
+    ) -> Page[models.Sale]:
+        """Pages sales newest first.
+
+        With ``columns`` (which must include ``sale_date`` and ``id``), rows of just those columns are returned
+        instead of entities.
+        """
+        query = self.db.query(*columns) if columns else self.db.query(models.Sale)
+        query = self._filter_sales(query, product_id, category, start_date, end_date)
+
+        if cursor:
+            sale_date, last_id = decode_cursor(cursor, date, int)
+            query = query.filter(before_keyset(models.Sale.sale_date, sale_date, models.Sale.id, last_id))
+
+        rows = query.order_by(models.Sale.sale_date.desc(), models.Sale.id.desc()).limit(limit + 1).all()
+        return Page.from_rows(rows, limit, lambda s: (s.sale_date, s.id))
+
+    def export_sales(
+        self,
+        export_format: str = "csv",
+        product_id: Optional[int] = None,
+        category: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        on_rows: Optional[Callable[[int], None]] = None,
+    ) -> Iterator[str]:
+        """Streams the sales matching ``get_filtered_sales`` filters as CSV or NDJSON chunks.
+
+        Rows come from a server-side cursor in batches of ``EXPORT_CHUNK_SIZE`` plain tuples, so memory
+        stays flat regardless of the result size. The generator opens its own session because it keeps
+        running after the request's dependencies have been torn down. ``on_rows`` is called with the
+        number of rows in each chunk before it is yielded.
+        """
+        columns = (
+            models.Sale.id,
+            models.Sale.product_id,
+            models.Sale.quantity,
+            models.Sale.sale_date,
+            models.Sale.total_amount,
+        )
+        stmt = self._filter_sales(select(*columns), product_id, category, start_date, end_date).order_by(
+            models.Sale.sale_date.desc(), models.Sale.id.desc()
+        )
+        bind = self.db.get_bind()
+        names = [column.key for column in columns]
+
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+
+            def encode(rows) -> str:
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows(rows)
+                return buffer.getvalue()
+
+            header = encode([names])
+        else:
+
+            def encode(rows) -> str:
+                return "".join(
+                    json.dumps(dict(zip(names, row)), default=str, separators=(",", ":")) + "\n" for row in rows
+                )
+
+            header = ""
+
+        def generate() -> Iterator[str]:
+            if header:
+                yield header
+            with Session(bind=bind) as session:
+                result = session.execute(stmt.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE))
+                for rows in result.partitions():
+                    if on_rows is not None:
+                        on_rows(len(rows))
+                    yield encode(rows)
+
+        return generate()
+
+    def count_sales(
+        self,
+        product_id: Optional[int] = None,
+        category: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ) -> int:
+        stmt = select(func.count()).select_from(models.Sale)
+        return self.db.scalar(self._filter_sales(stmt, product_id, category, start_date, end_date))
 
+    @staticmethod
+    def _filter_sales(
+        query,
+        product_id: Optional[int] = None,
+        category: Optional[str] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+    ):
+        """Applies the shared sales filters to either a ``Query`` or a ``select()``."""
         if product_id:
             query = query.filter(models.Sale.product_id == product_id)
 
         if category:
-            query = query.join(models.Product).filter(models.Product.category == category)
+            query = query.filter(models.Sale.category == category)
 
         if start_date:
             query = query.filter(models.Sale.sale_date >= start_date)
@@ -157,21 +881,64 @@ class SaleService:
         if end_date:
             query = query.filter(models.Sale.sale_date <= end_date)
 
-        return query.order_by(models.Sale.sale_date.desc()).all()
+        return query
+
+    def get_revenue_by_period(
+        self, period: str = "day", start_date: Optional[date] = None, end_date: Optional[date] = None
+    ) -> list[dict]:
+        return self._cached_result(
+            self._revenue_by_period_key(period, start_date, end_date),
+            lambda: self._revenue_by_period(period, start_date, end_date),
+            lambda results: ResultScope(start_date=start_date, end_date=end_date),
+        )
+
+    def _cached_result(
+        self, key: tuple, compute: Callable[[], list[dict]], scope: Callable[[list[dict]], ResultScope]
+    ) -> list[dict]:
+        if is_replica_session(self.db):
+            # A lagging replica's result would be served to primary readers too; use the cache but don't fill it.
+            cached = self.analytics_cache.peek(key)
+            return cached if cached is not None else compute()
+        return self.analytics_cache.get_or_compute(key, compute, scope)
+
+    @staticmethod
+    def _revenue_by_period_key(period: str, start_date: Optional[date], end_date: Optional[date]) -> tuple:
+        return ("revenue_by_period", period, start_date, end_date)
 
-    def get_revenue_by_period(self, period: str = "day") -> list[dict]:
-        sale_date = models.Sale.sale_date
-        total = func.sum(models.Sale.total_amount)
+    def _revenue_by_period(self, period: str, start_date: Optional[date], end_date: Optional[date]) -> list[dict]:
+        snapshot = columnar_snapshot(self.db)
+        if snapshot is not None:
+            return snapshot.revenue_by_period(period, start_date, end_date)
+        return self._sql_revenue_by_period(period, start_date, end_date)
+
+    def _sql_revenue_by_period(
+        self, period: str, start_date: Optional[date], end_date: Optional[date]
+    ) -> list[dict]:
+        # Aggregates over the daily rollup, so the cost grows with days of history rather than sales rows.
+        sale_date = models.DailyRevenue.sale_date
+        total = func.sum(models.DailyRevenue.total_amount)
+        # Plain range predicates on the rollup's primary key, so a date range is an index range scan.
+        date_range = self._date_range(models.DailyRevenue, start_date, end_date)
 
         if period == "day":
-            results = self.db.query(sale_date, total).group_by(sale_date).all()
+            results = self.db.query(sale_date, total).filter(*date_range).group_by(sale_date).all()
             return [{"date": r[0], "total_amount": float(r[1])} for r in results]
 
+        elif period == "week":
+            results = (
+                self.db.query(extract("year", sale_date).label("year"), extract("week", sale_date).label("week"), total)
+                .filter(*date_range)
+                .group_by("year", "week")
+                .all()  # type: ignore
+            )
+            return [{"year": int(r[0]), "week": int(r[1]), "total_amount": float(r[2])} for r in results]
+
         elif period == "month":
             results = (
                 self.db.query(
                     extract("year", sale_date).label("year"), extract("month", sale_date).label("month"), total
                 )
+                .filter(*date_range)
                 .group_by("year", "month")
                 .all()  # type: ignore
             )
@@ -179,31 +946,178 @@ class SaleService:
 
         elif period == "year":
             results = (
-                self.db.query(extract("year", sale_date).label("year"), total).group_by("year").all()  # type: ignore
+                self.db.query(extract("year", sale_date).label("year"), total)
+                .filter(*date_range)
+                .group_by("year")
+                .all()  # type: ignore
             )
             return [{"year": int(r[0]), "total_amount": float(r[1])} for r in results]
 
         return []
 
+    @staticmethod
+    def _date_range(rollup, start_date: Optional[date], end_date: Optional[date]) -> list:
+        date_range = []
+        if start_date:
+            date_range.append(rollup.sale_date >= start_date)
+        if end_date:
+            date_range.append(rollup.sale_date <= end_date)
+        return date_range
+
     def get_revenue_comparison(
         self,
         period: str = "month",
         category: Optional[str] = None,
-        compare_periods: int = 2
+        compare_periods: int = 2,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
     ) -> list[dict]:
-        query = self.db.query(
-            extract("year", models.Sale.sale_date).label("year"),
-            func.sum(models.Sale.total_amount).label("total_amount")
+        return self._cached_result(
+            self._revenue_comparison_key(period, category, compare_periods, start_date, end_date),
+            lambda: self._revenue_comparison(period, category, compare_periods, start_date, end_date),
+            lambda results: self._revenue_comparison_scope(
+                period, category, compare_periods, start_date, end_date, results
+            ),
         )
 
+    @staticmethod
+    def _revenue_comparison_key(
+        period: str,
+        category: Optional[str],
+        compare_periods: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> tuple:
+        return ("revenue_comparison", period, category or None, compare_periods, start_date, end_date)
+
+    @staticmethod
+    def _revenue_comparison_scope(
+        period: str,
+        category: Optional[str],
+        compare_periods: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+        results: list[dict],
+    ) -> ResultScope:
+        """Only the newest ``compare_periods`` periods are returned, so older sales cannot change the result.
+
+        The oldest returned period bounds the scope from below. Weeks are bounded by the start of their
+        year because week numbering differs between backends. Unless ``end_date`` is set, newer sales
+        always invalidate, as they may open a new period.
+        """
+        scope = ResultScope(category=category or None, start_date=start_date, end_date=end_date)
+        if len(results) < compare_periods or not results:
+            return scope
+
+        oldest = results[-1]["period"]
+        year = int(oldest[:4])
+        if period == "day":
+            oldest_start = date.fromisoformat(oldest)
+        elif period == "month":
+            oldest_start = date(year, int(oldest[5:7]), 1)
+        else:  # week, year
+            oldest_start = date(year, 1, 1)
+        return replace(scope, start_date=max(oldest_start, start_date) if start_date else oldest_start)
+
+    def _revenue_comparison(
+        self,
+        period: str,
+        category: Optional[str],
+        compare_periods: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> list[dict]:
+        snapshot = columnar_snapshot(self.db)
+        if snapshot is not None:
+            return snapshot.revenue_comparison(period, category, compare_periods, start_date, end_date)
+        return self._sql_revenue_comparison(period, category, compare_periods, start_date, end_date)
+
+    def _sql_revenue_comparison(
+        self,
+        period: str,
+        category: Optional[str],
+        compare_periods: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> list[dict]:
+        """Returns the newest ``compare_periods`` periods that have sales, newest first.
+
+        Rather than grouping all history and applying LIMIT afterwards, the scan is bounded by the
+        start of the oldest period that can be returned, counted back from the latest sale. Periods
+        without sales are skipped in the output, so when the bounded scan finds too few periods the
+        query is repeated without the bound.
+        """
+        rollup = models.DailyCategoryRevenue if category else models.DailyRevenue
+        lower_bound = self._comparison_lower_bound(rollup, period, category, compare_periods, start_date, end_date)
+
+        if lower_bound is not None and (start_date is None or lower_bound > start_date):
+            # The week containing the bound may be cut off by it, so one extra period is fetched and
+            # only the complete ones after it are kept.
+            limit = compare_periods + 1 if period == "week" else compare_periods
+            results = self._revenue_comparison_query(rollup, period, category, lower_bound, end_date, limit)
+            if len(results) == limit:
+                return self._format_revenue_comparison(results[:compare_periods], period, category)
+
+        results = self._revenue_comparison_query(rollup, period, category, start_date, end_date, compare_periods)
+        return self._format_revenue_comparison(results, period, category)
+
+    def _comparison_lower_bound(
+        self,
+        rollup,
+        period: str,
+        category: Optional[str],
+        compare_periods: int,
+        start_date: Optional[date],
+        end_date: Optional[date],
+    ) -> Optional[date]:
+        """Start of the ``compare_periods``-th calendar period back from the latest sale in range."""
+        if compare_periods < 1:
+            return None
+
+        query = self.db.query(func.max(rollup.sale_date)).filter(*self._date_range(rollup, start_date, end_date))
+        if category:
+            query = query.filter(models.DailyCategoryRevenue.category == category)
+        latest = query.scalar()
+        if latest is None:
+            return None
+
+        back = compare_periods - 1
+        try:
+            if period == "day":
+                return latest - timedelta(days=back)
+            elif period == "week":
+                return latest - timedelta(weeks=compare_periods)
+            elif period == "month":
+                months = latest.year * 12 + latest.month - 1 - back
+                return date(months // 12, months % 12 + 1, 1)
+            else:  # year
+                return date(latest.year - back, 1, 1)
+        except (ValueError, OverflowError):
+            # The bound would fall before the first representable date; scan everything instead.
+            return None
+
+    def _revenue_comparison_query(
+        self,
+        rollup,
+        period: str,
+        category: Optional[str],
+        start_date: Optional[date],
+        end_date: Optional[date],
+        limit: int,
+    ) -> list:
+        query = self.db.query(
+            extract("year", rollup.sale_date).label("year"),
+            func.sum(rollup.total_amount).label("total_amount")
+        ).filter(*self._date_range(rollup, start_date, end_date))
+
         if category:
-            query = query.join(models.Product).filter(models.Product.category == category)
+            query = query.filter(models.DailyCategoryRevenue.category == category)
 
         # Add grouping based on period
         if period == "day":
             query = query.add_columns(
-                extract("month", models.Sale.sale_date).label("month"),
-                extract("day", models.Sale.sale_date).label("day")
+                extract("month", rollup.sale_date).label("month"),
+                extract("day", rollup.sale_date).label("day")
             ).group_by(
                 "year", "month", "day"
             ).order_by(
@@ -211,7 +1125,7 @@ class SaleService:
             )  # type: ignore
         elif period == "week":
             query = query.add_columns(
-                extract("week", models.Sale.sale_date).label("week")
+                extract("week", rollup.sale_date).label("week")
             ).group_by(
                 "year", "week"
             ).order_by(
@@ -219,7 +1133,7 @@ class SaleService:
             )  # type: ignore
         elif period == "month":
             query = query.add_columns(
-                extract("month", models.Sale.sale_date).label("month")
+                extract("month", rollup.sale_date).label("month")
             ).group_by(
                 "year", "month"
             ).order_by(
@@ -232,8 +1146,40 @@ class SaleService:
                 desc("year")
             )
 
-        results = query.limit(compare_periods).all()
+        return query.limit(limit).all()
+
+    def check_columnar_snapshot(self, snapshot: SalesSnapshot, compare_periods: int = 3) -> list[str]:
+        """Compares the snapshot's revenue answers with the SQL ones; returns one line per disagreement.
 
+        Covers revenue by every period over all history, and the comparison of the newest ``compare_periods``
+        periods overall and for each category.
+        """
+        def rounded(results: list[dict]) -> list[dict]:
+            # SQLite sums NUMERIC columns as floats, so totals are compared to the cent.
+            return [{**result, "total_amount": round(result["total_amount"], 2)} for result in results]
+
+        def key(result: dict) -> list:
+            return [value for name, value in result.items() if name != "total_amount"]
+
+        categories = self.db.scalars(select(models.DailyCategoryRevenue.category).distinct()).all()
+        mismatches = []
+        for period in ("day", "week", "month", "year"):
+            # Revenue by period comes back in no particular order.
+            expected = sorted(rounded(self._sql_revenue_by_period(period, None, None)), key=key)
+            actual = sorted(rounded(snapshot.revenue_by_period(period, None, None)), key=key)
+            if actual != expected:
+                first = next(pair for pair in zip_longest(actual, expected) if pair[0] != pair[1])
+                mismatches.append(f"revenue by {period}: {first[0]} != {first[1]}")
+
+            for category in (None, *categories):
+                expected = rounded(self._sql_revenue_comparison(period, category, compare_periods, None, None))
+                actual = rounded(snapshot.revenue_comparison(period, category, compare_periods, None, None))
+                if actual != expected:
+                    mismatches.append(f"revenue comparison by {period} for {category or 'all'}: {actual} != {expected}")
+        return mismatches
+
+    @staticmethod
+    def _format_revenue_comparison(results: list, period: str, category: Optional[str]) -> list[dict]:
         # Format results based on period type
         formatted_results = []
         for r in results:
@@ -254,3 +1200,80 @@ class SaleService:
             formatted_results.append(result)
 
         return formatted_results
+
+
+@dataclass(frozen=True)
+class ChangeSource:
+    key: str  # field of ``schemas.ChangeFeed``
+    schema: type[BaseModel]
+    model: type
+    timestamp: str  # column holding when the row last changed
+    mutable: bool  # updated in place, so walked by (timestamp, id); append-only tables are walked by id
+
+
+class ChangeFeedService:
+    """Rows created or changed since a cursor, for incremental sync jobs.
+
+    The cursor holds a position per source: ``(timestamp, id)`` for products and inventory, which are
+    updated in place, and the last id for sales and inventory log entries, which are only appended.
+    Each source is read as an index range from its position, so a page costs O(limit) however large
+    the tables are. An updated row moves to the end of its source and is returned again in its new state.
+
+    Changes newer than ``CHANGES_SETTLE_SECONDS`` by the database clock are held back. Timestamps have
+    second precision and record when a row was written, not when it was committed, so newer rows could
+    still become visible behind the cursor. A transaction that takes longer than that to commit can be
+    missed. Deleted rows are not reported.
+    """
+
+    SOURCES = (
+        ChangeSource("products", schemas.Product, models.Product, "updated_at", mutable=True),
+        ChangeSource("inventory", schemas.Inventory, models.Inventory, "last_updated", mutable=True),
+        ChangeSource("sales", schemas.Sale, models.Sale, "created_at", mutable=False),
+        ChangeSource("inventory_logs", schemas.InventoryLog, models.InventoryLog, "changed_at", mutable=False),
+    )
+    EPOCH = datetime(1970, 1, 1)
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_changes(self, since: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE) -> dict[str, Any]:
+        """The first ``limit`` changes of each source after the ``since`` cursor, in ``schemas.ChangeFeed`` shape.
+
+        Without ``since`` the feed starts from the beginning, so a first sync pages through every row.
+
+        Raises:
+            HTTPException: 400 if the cursor is invalid
+        """
+        positions = self._decode(since)
+        cutoff = self.db.scalar(select(func.now())) - timedelta(seconds=CHANGES_SETTLE_SECONDS)
+
+        feed: dict[str, Any] = {"has_more": False}
+        for index, source in enumerate(self.SOURCES):
+            fields = field_set(source.schema, source.model, keys=(source.timestamp, "id"))
+            timestamp = getattr(source.model, source.timestamp)
+            stmt = select(*fields.columns)
+            if source.mutable:
+                after = after_keyset(timestamp, positions[index][0], source.model.id, positions[index][1])
+                stmt = stmt.where(after).order_by(timestamp, source.model.id)
+            else:
+                stmt = stmt.where(source.model.id > positions[index][0]).order_by(source.model.id)
+
+            rows = self.db.execute(stmt.limit(limit + 1)).all()
+            # Stop at the first unsettled row: nothing behind it may be passed over.
+            settled = list(takewhile(lambda row: getattr(row, source.timestamp) < cutoff, rows))
+            feed["has_more"] |= len(settled) > limit
+            settled = settled[:limit]
+            if settled:
+                last = settled[-1]
+                positions[index] = (getattr(last, source.timestamp), last.id) if source.mutable else (last.id,)
+            feed[source.key] = row_dicts(settled, fields)
+
+        feed["cursor"] = encode_cursor(*(value for position in positions for value in position))
+        return feed
+
+    def _decode(self, since: Optional[str]) -> list[tuple]:
+        if not since:
+            return [(self.EPOCH, 0) if source.mutable else (0,) for source in self.SOURCES]
+        types = [t for source in self.SOURCES for t in ((datetime, int) if source.mutable else (int,))]
+        values = iter(decode_cursor(since, *types))
+        return [(next(values), next(values)) if source.mutable else (next(values),) for source in self.SOURCES]
@@ -0,0 +1,282 @@
+"""Server-sent events for inventory stock changes.
+
+Services record every stock change on their session with ``record_stock_change``. When the transaction
+commits, the changes are published to ``stock_events``: one in-process broadcaster that serves every
+subscriber of ``GET /inventory/events``. Rolled-back changes are never published.
+
+Each subscriber has its own low-stock threshold. It gets a ``low-stock`` event when a change takes a
+product's stock below that threshold, and a ``restocked`` event when a change lifts it back to the
+threshold or above. Unless it asked for crossings only, it also gets a ``stock`` event for every other
+change.
+
+Published events are numbered, and the latest ``STOCK_EVENTS_BUFFER_SIZE`` are kept. A client that
+reconnects with a ``Last-Event-ID`` header is sent the events it missed. If those events are no longer
+buffered, or the id comes from before a restart, the client gets a ``reset`` event instead and should
+reload ``/inventory/low-stock``.
+
+Subscriber queues are bounded. A subscriber that falls ``STOCK_EVENTS_QUEUE_SIZE`` events behind is
+disconnected rather than buffered without limit, and catches up from the buffer when it reconnects.
+
+Subscribers only see changes committed by their own process. Running several worker processes needs a
+shared channel in front of the broadcaster.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import (
+    STOCK_EVENTS_BUFFER_SIZE,
+    STOCK_EVENTS_ENABLED,
+    STOCK_EVENTS_MAX_SUBSCRIBERS,
+    STOCK_EVENTS_QUEUE_SIZE,
+)
+from app.serialization import dumps
+
+# Milliseconds an EventSource waits before reconnecting
+RETRY_MS = 3000
+
+
+@dataclass(frozen=True)
+class StockEvent:
+    """A committed stock change. ``previous_stock`` is None for a new inventory record."""
+
+    product_id: int
+    stock: int
+    previous_stock: Optional[int]
+    reason: str
+    seq: int = 0
+    at: Optional[datetime] = None
+    data: bytes = b""  # JSON payload, encoded once for every subscriber
+
+    def kind(self, threshold: int) -> str:
+        """``low-stock`` or ``restocked`` if the change crosses ``threshold``, else ``stock``."""
+        if self.stock < threshold:
+            if self.previous_stock is None or self.previous_stock >= threshold:
+                return "low-stock"
+        elif self.previous_stock is not None and self.previous_stock < threshold:
+            return "restocked"
+        return "stock"
+
+
+def _message(kind: str, data: bytes, event_id: Optional[str] = None, retry: Optional[int] = None) -> bytes:
+    lines = []
+    if retry is not None:
+        lines.append(f"retry: {retry}")
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {kind}")
+    return ("\n".join(lines) + "\ndata: ").encode() + data + b"\n\n"
+
+
+class Subscription:
+    """One connected client: its filter, bounded queue and the events to replay on resume."""
+
+    def __init__(
+        self,
+        broadcaster: "StockEventBroadcaster",
+        threshold: int,
+        product_ids: Optional[frozenset[int]],
+        crossings_only: bool,
+        queue_size: int,
+    ):
+        self.broadcaster = broadcaster
+        self.threshold = threshold
+        self.product_ids = product_ids
+        self.crossings_only = crossings_only
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue[StockEvent] = asyncio.Queue(maxsize=queue_size)
+        self.backlog: list[StockEvent] = []
+        self.last_event_id: Optional[str] = None
+        self.position: Optional[str] = None  # id of the last event published before subscribing
+        self.resumed = False
+        self.overflowed = False
+
+    def wants(self, stock_event: StockEvent) -> bool:
+        if self.product_ids is not None and stock_event.product_id not in self.product_ids:
+            return False
+        return not self.crossings_only or stock_event.kind(self.threshold) != "stock"
+
+    def deliver(self, stock_event: StockEvent) -> None:
+        """Queues ``stock_event``; runs on the subscriber's event loop."""
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(stock_event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            self.broadcaster.unsubscribe(self, overflowed=True)
+
+    def render(self, stock_event: StockEvent) -> bytes:
+        return _message(stock_event.kind(self.threshold), stock_event.data, self.broadcaster.event_id(stock_event.seq))
+
+    async def stream(self, keepalive: float) -> AsyncIterator[bytes]:
+        """The SSE body: a ``ready`` or ``reset`` event, any replayed events, then live ones until disconnected."""
+        try:
+            if self.resumed:
+                yield _message("ready", b"{}", retry=RETRY_MS)
+            else:
+                # Fresh subscribers and ones whose missed events are gone start from the current position.
+                kind = "ready" if self.last_event_id is None else "reset"
+                yield _message(kind, b"{}", self.position, retry=RETRY_MS)
+            for stock_event in self.backlog:
+                yield self.render(stock_event)
+            self.backlog = []
+
+            while not self.overflowed:
+                try:
+                    stock_event = await asyncio.wait_for(self.queue.get(), keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if self.overflowed:
+                    # Too far behind: end the stream so the client reconnects and catches up from the buffer.
+                    break
+                yield self.render(stock_event)
+        finally:
+            self.broadcaster.unsubscribe(self)
+
+
+class StockEventBroadcaster:
+    """Fans committed stock changes out to subscribers; safe to publish from any thread."""
+
+    def __init__(
+        self,
+        buffer_size: int = STOCK_EVENTS_BUFFER_SIZE,
+        queue_size: int = STOCK_EVENTS_QUEUE_SIZE,
+        max_subscribers: int = STOCK_EVENTS_MAX_SUBSCRIBERS,
+        enabled: bool = STOCK_EVENTS_ENABLED,
+    ):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.enabled = enabled
+        # Event ids are "<epoch>-<seq>"; the epoch tells ids issued before a restart apart from current ones.
+        self.epoch = format(time.time_ns() // 1_000_000, "x")
+        self._lock = threading.Lock()
+        self._buffer: deque[StockEvent] = deque(maxlen=buffer_size)
+        self._subscribers: set[Subscription] = set()
+        self._seq = 0
+        self._disconnected = 0
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def publish(self, changes: Iterable[StockEvent]) -> None:
+        at = datetime.now(timezone.utc)
+        with self._lock:
+            for change in changes:
+                self._seq += 1
+                payload = {
+                    "product_id": change.product_id,
+                    "stock": change.stock,
+                    "previous_stock": change.previous_stock,
+                    "reason": change.reason,
+                    "at": at,
+                }
+                stock_event = replace(change, seq=self._seq, at=at, data=dumps(payload))
+                self._buffer.append(stock_event)
+                for subscriber in list(self._subscribers):
+                    if not subscriber.wants(stock_event):
+                        continue
+                    try:
+                        subscriber.loop.call_soon_threadsafe(subscriber.deliver, stock_event)
+                    except RuntimeError:  # its event loop has been closed
+                        self._subscribers.discard(subscriber)
+
+    def subscribe(
+        self,
+        threshold: int,
+        product_ids: Optional[Iterable[int]] = None,
+        crossings_only: bool = False,
+        last_event_id: Optional[str] = None,
+    ) -> Subscription:
+        """Registers a subscriber on the running event loop.
+
+        Raises:
+            HTTPException: 404 if stock events are disabled, 503 if ``max_subscribers`` are connected.
+        """
+        if not self.enabled:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Stock events are disabled")
+        subscription = Subscription(
+            self,
+            threshold,
+            frozenset(product_ids) if product_ids else None,
+            crossings_only,
+            self.queue_size,
+        )
+        subscription.last_event_id = last_event_id
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many stock event subscribers"
+                )
+            subscription.position = self.event_id(self._seq)
+            seq = self._resume_point(last_event_id)
+            if seq is not None:
+                subscription.resumed = True
+                subscription.backlog = [e for e in self._buffer if e.seq > seq and subscription.wants(e)]
+            # Registered under the same lock as the backlog snapshot, so no event is missed or sent twice.
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription, overflowed: bool = False) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.discard(subscription)
+                if overflowed:
+                    self._disconnected += 1
+
+    def _resume_point(self, last_event_id: Optional[str]) -> Optional[int]:
+        """The sequence number to replay after, or None if the events since ``last_event_id`` are not all buffered."""
+        if not last_event_id:
+            return None
+        epoch, _, seq = last_event_id.strip().partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        oldest = self._buffer[0].seq if self._buffer else self._seq + 1
+        return int(seq) if oldest - 1 <= int(seq) <= self._seq else None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "subscribers": len(self._subscribers),
+                "published": self._seq,
+                "buffered": len(self._buffer),
+                "slow_subscribers_disconnected": self._disconnected,
+            }
+
+
+stock_events = StockEventBroadcaster()
+
+
+def record_stock_change(
+    session: Session | AsyncSession, product_id: int, stock: int, previous_stock: Optional[int], reason: str
+) -> None:
+    """Queues a stock change to be published once ``session`` commits."""
+    if not stock_events.enabled:
+        return
+    session = getattr(session, "sync_session", session)
+    session.info.setdefault("stock_events", []).append(StockEvent(product_id, stock, previous_stock, reason))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_changes(session: Session) -> None:
+    changes = session.info.pop("stock_events", None)
+    if changes:
+        stock_events.publish(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_changes(session: Session) -> None:
+    session.info.pop("stock_events", None)
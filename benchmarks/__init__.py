@@ -0,0 +1,6 @@
+"""Endpoint benchmarks run against the ASGI app in-process.
+
+``python -m benchmarks run`` seeds (or reuses) datasets of several sizes, measures latency
+percentiles and throughput for every API route and writes the results to JSON.
+``python -m benchmarks compare`` diffs two result files and exits non-zero on regressions.
+"""
@@ -0,0 +1,109 @@
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import sqlalchemy
+
+from benchmarks.datasets import SIZES, prepare_dataset, working_copy
+from benchmarks.report import compare, format_report, format_results
+from benchmarks.runner import run_dataset
+
+BENCHMARKS_DIR = Path(__file__).parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / "baseline.json"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Endpoint benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="Benchmark every route and write the results to JSON")
+    run.add_argument("--sizes", nargs="+", choices=SIZES, default=["small", "medium"])
+    run.add_argument("--requests", type=int, default=200, help="Measured requests per scenario")
+    run.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per scenario")
+    run.add_argument("--concurrency", type=int, default=4, help="Requests in flight at once")
+    run.add_argument("--seed", type=int, default=42)
+    run.add_argument("--caches", action="store_true", help="Keep the product and analytics caches on")
+    run.add_argument("--data-dir", type=Path, default=BENCHMARKS_DIR / "data", help="Where datasets are kept")
+    run.add_argument("--output", type=Path, default=BENCHMARKS_DIR / "results" / "latest.json")
+    run.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE, help="Compare against this file if it exists")
+    run.add_argument("--save-baseline", action="store_true", help="Also store the results as the new baseline")
+    run.add_argument("--threshold", type=float, default=0.2, help="Relative change reported as a regression")
+
+    diff = commands.add_parser("compare", help="Compare a result file against a baseline")
+    diff.add_argument("current", type=Path)
+    diff.add_argument("baseline", type=Path, nargs="?", default=DEFAULT_BASELINE)
+    diff.add_argument("--threshold", type=float, default=0.2)
+    return parser.parse_args()
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(args) -> dict:
+    results = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "caches": args.caches,
+        },
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"Preparing {size} dataset...", file=sys.stderr)
+        dataset = prepare_dataset(args.data_dir, size, args.seed)
+        with tempfile.TemporaryDirectory() as scratch:
+            database = working_copy(dataset, Path(scratch))
+            print(f"Benchmarking {size}...", file=sys.stderr)
+            results["results"][size] = asyncio.run(
+                run_dataset(str(database), args.requests, args.concurrency, args.warmup, caches=args.caches)
+            )
+    return results
+
+
+def report(current: dict, baseline_path: Path, threshold: float) -> int:
+    baseline = json.loads(baseline_path.read_text())
+    changes, unmatched = compare(current, baseline, threshold)
+    print(f"\nCompared with {baseline_path} (revision {baseline['meta'].get('revision', 'unknown')}):")
+    print(format_report(changes, unmatched, threshold))
+    return 1 if any(change.regressed for change in changes) else 0
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "compare":
+        return report(json.loads(args.current.read_text()), args.baseline, args.threshold)
+
+    results = run(args)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(results, indent=2))
+    print(format_results(results))
+    print(f"\nResults written to {args.output}")
+
+    status = report(results, args.baseline, args.threshold) if args.baseline.exists() else 0
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2))
+        print(f"Baseline saved to {args.baseline}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,59 @@
+"""Benchmark datasets, generated once per size with ``scripts/generate_data.py`` and reused."""
+
+import shutil
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import create_engine
+
+from app.database import Base
+from scripts.generate_data import GeneratorOptions, generate
+
+SIZES: dict[str, dict] = {
+    "tiny": {"products": 20, "categories": 4, "years": 0.1, "sales_per_day": 40},
+    "small": {"products": 200, "categories": 10, "years": 0.5, "sales_per_day": 300},
+    "medium": {"products": 1000, "categories": 20, "years": 2, "sales_per_day": 1500},
+    "large": {"products": 5000, "categories": 20, "years": 3, "sales_per_day": 9000},
+}
+
+# Fixed so every run of a size sees the same dates and rows.
+END_DATE = date(2024, 12, 31)
+
+
+def dataset_path(directory: Path, size: str, seed: int) -> Path:
+    return directory / f"{size}-seed{seed}.db"
+
+
+def prepare_dataset(directory: Path, size: str, seed: int = 42) -> Path:
+    """Returns the SQLite file for ``size``, generating it on first use."""
+    path = dataset_path(directory, size, seed)
+    if path.exists():
+        return path
+
+    directory.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    partial.unlink(missing_ok=True)
+    url = f"sqlite:///{partial}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    options = GeneratorOptions(
+        database_url=url,
+        seed=seed,
+        end_date=END_DATE,
+        popularity_skew=1.0,
+        restock_days=7,
+        chunk_size=5000,
+        **SIZES[size],
+    )
+    generate(options)
+    partial.rename(path)
+    return path
+
+
+def working_copy(dataset: Path, directory: Path) -> Path:
+    """Copies a dataset so a run's writes (sales, stock updates) never leak into the next run."""
+    copy = directory / f"{dataset.stem}-run.db"
+    shutil.copyfile(dataset, copy)
+    return copy
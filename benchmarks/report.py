@@ -0,0 +1,86 @@
+"""Compares benchmark result files and renders what changed."""
+
+from dataclasses import dataclass
+from typing import Any
+
+# Metric -> whether a higher value is worse.
+METRICS = {"p50_ms": True, "p95_ms": True, "rps": False}
+
+
+@dataclass
+class Change:
+    size: str
+    scenario: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return (self.current - self.baseline) / self.baseline if self.baseline else 0.0
+
+    @property
+    def regressed(self) -> bool:
+        return self.ratio > 0 if METRICS[self.metric] else self.ratio < 0
+
+
+def compare(
+    current: dict[str, Any], baseline: dict[str, Any], threshold: float = 0.2, min_delta_ms: float = 0.5
+) -> tuple[list[Change], list[str]]:
+    """Returns the metrics that moved by more than ``threshold`` and the scenarios only in one file.
+
+    Latency changes smaller than ``min_delta_ms`` are ignored as noise, however large in relative terms.
+    """
+    changes, unmatched = [], []
+    for size, scenarios in current["results"].items():
+        baseline_scenarios = baseline["results"].get(size, {})
+        for name, stats in scenarios.items():
+            if name not in baseline_scenarios:
+                unmatched.append(f"{size} {name}: new")
+                continue
+            for metric in METRICS:
+                change = Change(size, name, metric, baseline_scenarios[name][metric], stats[metric])
+                if metric.endswith("_ms") and abs(change.current - change.baseline) < min_delta_ms:
+                    continue
+                if abs(change.ratio) > threshold:
+                    changes.append(change)
+        unmatched.extend(f"{size} {name}: missing" for name in baseline_scenarios if name not in scenarios)
+
+    changes.sort(key=lambda c: (not c.regressed, -abs(c.ratio)))
+    return changes, unmatched
+
+
+def format_report(changes: list[Change], unmatched: list[str], threshold: float) -> str:
+    regressions = sum(change.regressed for change in changes)
+    lines = [
+        f"{regressions} regression(s), {len(changes) - regressions} improvement(s) beyond {threshold:.0%}",
+    ]
+    if changes:
+        width = max(len(change.scenario) for change in changes)
+        lines.append("")
+        lines.append(f"{'size':<7} {'scenario':<{width}} {'metric':<7} {'baseline':>10} {'current':>10} {'change':>8}")
+        for change in changes:
+            verdict = "REGRESSED" if change.regressed else "improved"
+            lines.append(
+                f"{change.size:<7} {change.scenario:<{width}} {change.metric:<7} "
+                f"{change.baseline:>10.2f} {change.current:>10.2f} {change.ratio:>+8.1%}  {verdict}"
+            )
+    if unmatched:
+        lines.append("")
+        lines.append("Not compared:")
+        lines.extend(f"  {line}" for line in unmatched)
+    return "\n".join(lines)
+
+
+def format_results(results: dict[str, Any]) -> str:
+    lines = []
+    for size, scenarios in results["results"].items():
+        width = max(len(name) for name in scenarios)
+        lines.append(f"{size}")
+        lines.append(f"  {'scenario':<{width}} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'rps':>8} {'errors':>6}")
+        for name, stats in scenarios.items():
+            lines.append(
+                f"  {name:<{width}} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+                f"{stats['rps']:>8.1f} {stats['errors']:>6}"
+            )
+    return "\n".join(lines)
@@ -0,0 +1,122 @@
+"""Drives the scenarios through the ASGI app in-process and summarizes the timings."""
+
+import asyncio
+import logging
+import statistics
+import tempfile
+import time
+from typing import Any
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import schemas
+from app.cache import NullCache
+from app.database import get_db
+from app.main import get_application
+from app.reports import ReportJobManager, get_report_jobs
+from app.services import ProductService, SaleService
+from benchmarks.scenarios import SCENARIOS, Context, Scenario, missing_routes
+
+
+def summarize(latencies: list[float], errors: int, wall_time: float) -> dict[str, Any]:
+    """Latency percentiles in milliseconds and throughput in requests per second."""
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    if len(latencies_ms) > 1:
+        cuts = statistics.quantiles(latencies_ms, n=100, method="inclusive")
+        p50, p90, p95, p99 = cuts[49], cuts[89], cuts[94], cuts[98]
+    else:
+        p50 = p90 = p95 = p99 = latencies_ms[0] if latencies_ms else 0.0
+    return {
+        "requests": len(latencies_ms),
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(latencies_ms), 3) if latencies_ms else 0.0,
+        "p50_ms": round(p50, 3),
+        "p90_ms": round(p90, 3),
+        "p95_ms": round(p95, 3),
+        "p99_ms": round(p99, 3),
+        "max_ms": round(latencies_ms[-1], 3) if latencies_ms else 0.0,
+        "rps": round(len(latencies_ms) / wall_time, 1) if wall_time else 0.0,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, ctx: Context, requests: int, concurrency: int, warmup: int
+) -> dict[str, Any]:
+    for _ in range(warmup):
+        await client.request(**scenario.request(ctx))
+
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            response = await client.request(**scenario.request(ctx))
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+async def run_dataset(
+    database: str, requests: int, concurrency: int, warmup: int, caches: bool = False
+) -> dict[str, dict[str, Any]]:
+    """Benchmarks every scenario against the SQLite database file ``database``.
+
+    Unless ``caches`` is set, the product and analytics caches are switched off so the timings
+    reflect the queries rather than cache hits.
+    """
+    # httpx logs every request at INFO, which would drown the results.
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    app = get_application(async_mode=False)
+    missing = missing_routes(app, SCENARIOS)
+    if missing:
+        raise RuntimeError(f"Routes without a benchmark scenario: {', '.join(missing)}")
+
+    engine = create_engine(f"sqlite:///{database}", connect_args={"check_same_thread": False, "timeout": 30})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    report_dir = tempfile.TemporaryDirectory()
+    # Every request of the report scenarios queues a job, so the pending limit is lifted.
+    jobs = ReportJobManager(directory=report_dir.name, max_pending=10**9, session_factory=SessionLocal)
+    app.dependency_overrides[get_report_jobs] = lambda: jobs
+
+    product_cache, analytics_enabled = ProductService.cache, SaleService.analytics_cache.enabled
+    if not caches:
+        ProductService.cache = NullCache()
+        SaleService.analytics_cache.enabled = False
+
+    try:
+        with SessionLocal() as db:
+            ctx = Context.load(db, spare_products=(requests + warmup) * 2)
+        report = schemas.ReportCreate(kind="revenue", period="month")
+        ctx.report_id = jobs.submit(report).id
+        jobs.get(ctx.report_id).future.result()
+        ctx.new_report_id = lambda: jobs.submit(report).id
+
+        results = {}
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for scenario in SCENARIOS:
+                results[scenario.name] = await run_scenario(client, scenario, ctx, requests, concurrency, warmup)
+        return results
+    finally:
+        ProductService.cache, SaleService.analytics_cache.enabled = product_cache, analytics_enabled
+        jobs.shutdown(wait=True)
+        report_dir.cleanup()
+        engine.dispose()
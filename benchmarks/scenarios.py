@@ -0,0 +1,206 @@
+"""Requests issued per API route.
+
+Every route of the app needs at least one scenario; ``missing_routes`` lists the ones that don't,
+and the runner refuses to start while any are missing so new endpoints get benchmarked too.
+Streaming routes that never end (``STREAMING_ROUTES``) have no request latency to measure and are exempt.
+"""
+
+import itertools
+import json
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any
+
+from fastapi import FastAPI
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from app.config import API_PREFIX
+from app.models import DailyRevenue, Inventory, Product, Sale
+
+# Lines in the largest order scenario; orders of 1 and ORDER_LINES lines show how latency scales with lines
+ORDER_LINES = 10
+
+
+@dataclass
+class Context:
+    """Ids and dates from the dataset that the scenarios' requests refer to."""
+
+    product_id: int
+    category: str
+    latest_date: date
+    hot_product_id: int
+    spare_product_ids: Iterator[int]
+    order_product_ids: list[int]
+    # Set by the runner: a finished report job, and a function that queues a new one and returns its id
+    report_id: str = ""
+    new_report_id: Callable[[], str] = lambda: ""
+
+    @classmethod
+    def load(cls, db: Session, spare_products: int) -> "Context":
+        """Reads the dataset and adds the rows write scenarios need.
+
+        ``hot_product_id`` and the ``order_product_ids`` have practically unlimited stock so sale and order
+        scenarios never run out, and ``spare_products`` products without inventory are added for the
+        inventory creation scenario.
+        """
+        product_id = db.scalar(select(Sale.product_id).order_by(Sale.id.desc()).limit(1))
+        category = db.scalar(select(Product.category).where(Product.id == product_id))
+        latest_date = db.scalar(select(func.max(DailyRevenue.sale_date)))
+
+        first_id = db.scalar(select(func.max(Product.id))) + 1
+        products = [
+            {"id": first_id + i, "name": f"Benchmark {i}", "category": category, "price": 9.99, "description": ""}
+            for i in range(spare_products + 1 + ORDER_LINES)
+        ]
+        order_product_ids = [first_id + 1 + spare_products + i for i in range(ORDER_LINES)]
+        db.execute(insert(Product), products)
+        db.execute(
+            insert(Inventory),
+            [{"product_id": product_id, "stock": 10**9} for product_id in (first_id, *order_product_ids)],
+        )
+        db.commit()
+
+        return cls(
+            product_id=product_id,
+            category=category,
+            latest_date=latest_date,
+            hot_product_id=first_id,
+            spare_product_ids=iter(range(first_id + 1, first_id + 1 + spare_products)),
+            order_product_ids=order_product_ids,
+        )
+
+
+@dataclass
+class Scenario:
+    method: str
+    path: str
+    label: str = ""
+    params: Callable[[Context], dict[str, Any]] = lambda ctx: {}
+    body: Callable[[Context], Any] = lambda ctx: None
+    headers: dict[str, str] = field(default_factory=dict)
+    path_params: Callable[[Context], dict[str, Any]] = lambda ctx: {}
+
+    @property
+    def name(self) -> str:
+        route = f"{self.method} {API_PREFIX}{self.path}"
+        return f"{route} [{self.label}]" if self.label else route
+
+    def request(self, ctx: Context) -> dict[str, Any]:
+        request = {
+            "method": self.method,
+            "url": API_PREFIX + self.path.format(**self.path_params(ctx)),
+            "params": self.params(ctx),
+            "headers": self.headers,
+        }
+        body = self.body(ctx)
+        if isinstance(body, str):
+            request["content"] = body
+        elif body is not None:
+            request["json"] = body
+        return request
+
+
+def _month_ago(ctx: Context) -> str:
+    return str(ctx.latest_date - timedelta(days=30))
+
+
+_sale_counter = itertools.count()
+
+
+def _sale(ctx: Context) -> dict[str, Any]:
+    # Spread writes over recent days so they touch different rollup rows.
+    day = ctx.latest_date - timedelta(days=next(_sale_counter) % 28)
+    return {"product_id": ctx.hot_product_id, "quantity": 1, "sale_date": str(day)}
+
+
+def _order(ctx: Context, lines: int) -> dict[str, Any]:
+    sale_date = _sale(ctx)["sale_date"]
+    return {"sale_date": sale_date, "lines": [{"product_id": p, "quantity": 1} for p in ctx.order_product_ids[:lines]]}
+
+
+SCENARIOS: list[Scenario] = [
+    Scenario(
+        "POST",
+        "/products/",
+        body=lambda ctx: {"name": "Benchmark product", "category": ctx.category, "price": "19.99"},
+    ),
+    Scenario("GET", "/products/", params=lambda ctx: {"limit": 100}),
+    Scenario("GET", "/products/", label="id,name,price", params=lambda ctx: {"limit": 100, "fields": "id,name,price"}),
+    Scenario("GET", "/products/{product_id}", path_params=lambda ctx: {"product_id": ctx.product_id}),
+    Scenario("GET", "/inventory/"),
+    Scenario(
+        "POST",
+        "/inventory/",
+        body=lambda ctx: {"product_id": next(ctx.spare_product_ids), "stock": 100},
+    ),
+    Scenario("GET", "/inventory/low-stock", params=lambda ctx: {"threshold": 10}),
+    Scenario(
+        "PUT",
+        "/inventory/{product_id}",
+        path_params=lambda ctx: {"product_id": ctx.hot_product_id},
+        body=lambda ctx: {"stock": 10**9},
+    ),
+    Scenario(
+        "GET",
+        "/inventory/{product_id}/logs",
+        path_params=lambda ctx: {"product_id": ctx.product_id},
+        params=lambda ctx: {"limit": 100},
+    ),
+    Scenario("POST", "/sales/", body=_sale),
+    Scenario("GET", "/sales/", label="latest", params=lambda ctx: {"limit": 100}),
+    Scenario("GET", "/sales/", label="product", params=lambda ctx: {"product_id": ctx.product_id, "limit": 100}),
+    Scenario("GET", "/sales/", label="category", params=lambda ctx: {"category": ctx.category, "limit": 100}),
+    Scenario(
+        "GET",
+        "/sales/",
+        label="last 30 days",
+        params=lambda ctx: {"start_date": _month_ago(ctx), "end_date": str(ctx.latest_date), "limit": 100},
+    ),
+    Scenario(
+        "POST",
+        "/sales/bulk",
+        body=lambda ctx: json.dumps([_sale(ctx) for _ in range(50)]),
+        headers={"Content-Type": "application/json"},
+    ),
+    Scenario("POST", "/orders/", label="1 line", body=lambda ctx: _order(ctx, 1)),
+    Scenario("POST", "/orders/", label=f"{ORDER_LINES} lines", body=lambda ctx: _order(ctx, ORDER_LINES)),
+    Scenario("GET", "/sales/export", params=lambda ctx: {"format": "csv", "product_id": ctx.product_id}),
+    Scenario("GET", "/sales/revenue", label="day", params=lambda ctx: {"period": "day"}),
+    Scenario("GET", "/sales/revenue", label="month", params=lambda ctx: {"period": "month"}),
+    Scenario("GET", "/sales/revenue/comparison", label="month", params=lambda ctx: {"period": "month"}),
+    Scenario(
+        "GET",
+        "/sales/revenue/comparison",
+        label="category week",
+        params=lambda ctx: {"period": "week", "category": ctx.category, "compare_periods": 4},
+    ),
+    Scenario("GET", "/changes/", params=lambda ctx: {"limit": 100}),
+    Scenario("GET", "/system/pool"),
+    Scenario("GET", "/system/cache"),
+    Scenario("GET", "/system/events"),
+    Scenario("GET", "/system/replicas"),
+    Scenario("GET", "/system/reports"),
+    # Report jobs last, so the jobs they queue don't run alongside the other scenarios.
+    Scenario("POST", "/reports/", body=lambda ctx: {"kind": "revenue", "period": "month"}),
+    Scenario("GET", "/reports/"),
+    Scenario("GET", "/reports/{job_id}", path_params=lambda ctx: {"job_id": ctx.report_id}),
+    Scenario("GET", "/reports/{job_id}/result", path_params=lambda ctx: {"job_id": ctx.report_id}),
+    Scenario("POST", "/reports/{job_id}/cancel", path_params=lambda ctx: {"job_id": ctx.new_report_id()}),
+    Scenario("DELETE", "/reports/{job_id}", path_params=lambda ctx: {"job_id": ctx.new_report_id()}),
+]
+
+
+STREAMING_ROUTES = [Scenario("GET", "/inventory/events")]
+
+
+def missing_routes(app: FastAPI, scenarios: list[Scenario]) -> list[str]:
+    """Routes in the app's OpenAPI schema that no scenario exercises."""
+    covered = {(s.method, API_PREFIX + s.path) for s in [*scenarios, *STREAMING_ROUTES]}
+    return [
+        f"{method.upper()} {path}"
+        for path, operations in app.openapi()["paths"].items()
+        for method in operations
+        if (method.upper(), path) not in covered
+    ]
@@ -0,0 +1,69 @@
+"""Measures what the request metrics middleware adds to each request.
+
+Times ``RequestMetrics.observe`` on its own, then calls a bare ASGI endpoint directly (no framework,
+HTTP client or server in the way) with and without ``MetricsMiddleware`` in front of it and reports
+the difference per request in microseconds.
+"""
+
+import argparse
+import asyncio
+import time
+
+from app.metrics import MetricsMiddleware, RequestMetrics
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the per-request cost of the metrics middleware.")
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--routes", type=int, default=20, help="Distinct route labels to spread requests over")
+    return parser.parse_args()
+
+
+def measure_observe(requests: int, routes: int) -> float:
+    metrics = RequestMetrics()
+    labels = [f"/api/route/{i}" for i in range(routes)]
+    start = time.perf_counter()
+    for i in range(requests):
+        metrics.start("GET", labels[i % routes])
+        metrics.observe("GET", labels[i % routes], "200", 0.003, in_flight=True)
+    return (time.perf_counter() - start) / requests
+
+
+async def endpoint(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def measure_requests(app, requests: int) -> float:
+    scope = {"type": "http", "method": "GET", "path": "/ping"}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+def main():
+    args = parse_args()
+    print(f"RequestMetrics.observe: {measure_observe(args.requests, args.routes) * 1e6:.2f} us per request")
+
+    wrapped = MetricsMiddleware(endpoint, metrics=RequestMetrics())
+    # Interleave the runs and keep the fastest so CPU frequency drift and GC pauses affect both sides alike.
+    baseline, with_metrics = [], []
+    for _ in range(5):
+        baseline.append(asyncio.run(measure_requests(endpoint, args.requests)))
+        with_metrics.append(asyncio.run(measure_requests(wrapped, args.requests)))
+    baseline_us, with_metrics_us = min(baseline) * 1e6, min(with_metrics) * 1e6
+    print(f"Bare ASGI endpoint:         {baseline_us:.2f} us per request")
+    print(f"Behind MetricsMiddleware:   {with_metrics_us:.2f} us per request")
+    print(f"Overhead:                   {with_metrics_us - baseline_us:.2f} us per request")
+
+
+if __name__ == "__main__":
+    main()
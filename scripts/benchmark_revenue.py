@@ -0,0 +1,82 @@
+"""Shows that the revenue comparison scan no longer grows with the length of sales history.
+
+Fills an in-memory SQLite rollup with increasingly long daily histories and reports, for the
+bounded ``/sales/revenue/comparison`` query and the previous full-history query, the number of
+SQLite VM steps (a proxy for rows scanned) and the wall time.
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import DailyRevenue
+from app.services import SaleService
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark bounded vs. full-history revenue comparison queries.")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 4, 16], help="History lengths to test")
+    parser.add_argument("--period", default="month", choices=["day", "week", "month", "year"])
+    parser.add_argument("--compare-periods", type=int, default=2)
+    return parser.parse_args()
+
+
+def measure(db: Session, run) -> tuple[int, float]:
+    steps = 0
+
+    def count():
+        nonlocal steps
+        steps += 1
+        return 0
+
+    dbapi_connection = db.connection().connection.dbapi_connection
+    dbapi_connection.set_progress_handler(count, 1)
+    start = time.perf_counter()
+    try:
+        run()
+    finally:
+        elapsed = time.perf_counter() - start
+        dbapi_connection.set_progress_handler(None, 1)
+    return steps, elapsed * 1000
+
+
+def benchmark(years: int, period: str, compare_periods: int) -> tuple[int, int, float, int, float]:
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    end = date(2024, 12, 31)
+    days = years * 365
+    with Session(engine) as db:
+        db.execute(
+            insert(DailyRevenue),
+            [{"sale_date": end - timedelta(days=i), "total_amount": 100, "sale_count": 1} for i in range(days)],
+        )
+        db.commit()
+
+        service = SaleService(db)
+
+        def run_bounded():
+            service._revenue_comparison(period, None, compare_periods, None, None)
+
+        def run_full():
+            service._revenue_comparison_query(DailyRevenue, period, None, None, None, compare_periods)
+
+        # Warm up SQLAlchemy's statement cache so compilation is not timed.
+        run_bounded()
+        run_full()
+        bounded = measure(db, run_bounded)
+        full = measure(db, run_full)
+    engine.dispose()
+    return days, *bounded, *full
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(f"{'history days':>12} {'bounded steps':>14} {'bounded ms':>11} {'full steps':>11} {'full ms':>9}")
+    for years in args.years:
+        days, bounded_steps, bounded_ms, full_steps, full_ms = benchmark(years, args.period, args.compare_periods)
+        print(f"{days:>12} {bounded_steps:>14} {bounded_ms:>11.2f} {full_steps:>11} {full_ms:>9.2f}")
@@ -0,0 +1,112 @@
+"""Compares CPU time per row of the list endpoints' fast path against ORM entities + pydantic.
+
+Fills an in-memory SQLite database, then for each listing runs the previous path (ORM entities,
+``from_attributes`` validation against the response model, pydantic JSON encoding) and the column
+tuple + ``rows_response`` path, reporting process CPU time per row for a page of ``--limit`` rows.
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app import models, schemas
+from app.database import Base
+from app.serialization import field_set, rows_response
+from app.services import InventoryService, ProductService, SaleService
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark list endpoint serialization.")
+    parser.add_argument("--rows", type=int, default=5000, help="Products (and sales) in the database")
+    parser.add_argument("--limit", type=int, default=1000, help="Page size of the paginated listings")
+    parser.add_argument("--repeat", type=int, default=20)
+    return parser.parse_args()
+
+
+def seed(db: Session, rows: int) -> None:
+    db.execute(
+        insert(models.Product),
+        [
+            {"id": i, "name": f"Product {i}", "category": f"Category {i % 10}", "price": Decimal("9.99") + i}
+            for i in range(1, rows + 1)
+        ],
+    )
+    db.execute(insert(models.Inventory), [{"product_id": i, "stock": i % 500} for i in range(1, rows + 1)])
+    start = date(2024, 1, 1)
+    db.execute(
+        insert(models.Sale),
+        [
+            {
+                "product_id": i,
+                "quantity": 1 + i % 5,
+                "sale_date": start + timedelta(days=i % 365),
+                "total_amount": Decimal("9.99") * (1 + i % 5),
+            }
+            for i in range(1, rows + 1)
+        ],
+    )
+    db.commit()
+
+
+def cpu_per_row(run, repeat: int) -> tuple[float, int]:
+    run()  # warm up statement and validator caches
+    start = time.process_time()
+    for _ in range(repeat):
+        rows = run()
+    return (time.process_time() - start) / repeat / rows * 1e6, rows
+
+
+def main():
+    args = parse_args()
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        seed(db, args.rows)
+
+        listings = {
+            "GET /products": (
+                schemas.Product,
+                lambda **kw: ProductService(db).get_products(limit=args.limit, **kw).items,
+                field_set(schemas.Product, models.Product),
+            ),
+            "GET /inventory": (
+                schemas.Inventory,
+                lambda **kw: InventoryService(db).get_all_inventory(**kw),
+                field_set(schemas.Inventory, models.Inventory),
+            ),
+            "GET /sales": (
+                schemas.Sale,
+                lambda **kw: SaleService(db).get_filtered_sales(limit=args.limit, **kw).items,
+                field_set(schemas.Sale, models.Sale),
+            ),
+        }
+
+        print(f"{'listing':<15} {'rows':>6} {'orm+pydantic us/row':>20} {'fast path us/row':>17} {'speedup':>8}")
+        for name, (schema, fetch, fields) in listings.items():
+            adapter = TypeAdapter(list[schema])
+
+            def run_orm():
+                db.expunge_all()  # hydrate fresh entities each time, as a new request would
+                items = fetch()
+                adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+                return len(items)
+
+            def run_fast():
+                items = fetch(columns=fields.columns)
+                rows_response(items, fields)
+                return len(items)
+
+            orm_us, rows = cpu_per_row(run_orm, args.repeat)
+            fast_us, _ = cpu_per_row(run_fast, args.repeat)
+            print(f"{name:<15} {rows:>6} {orm_us:>20.2f} {fast_us:>17.2f} {orm_us / fast_us:>7.1f}x")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
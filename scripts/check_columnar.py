@@ -0,0 +1,40 @@
+import argparse
+import sys
+
+from app.columnar import SalesSnapshot
+from app.config import COLUMNAR_DIR
+from app.database import SessionLocal
+from app.services import SaleService
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check the columnar sales snapshot against the SQL revenue answers.")
+    parser.add_argument("--directory", default=COLUMNAR_DIR, help="Snapshot directory (default: COLUMNAR_DIR)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the snapshot from the sales table first")
+    parser.add_argument("--compare-periods", type=int, default=3, help="Periods checked per revenue comparison")
+    return parser.parse_args()
+
+
+def check_columnar(directory, rebuild=False, compare_periods=3) -> int:
+    snapshot = SalesSnapshot(directory)
+    db = SessionLocal()
+    try:
+        if rebuild:
+            print(f"Rebuilt the columnar snapshot with {snapshot.rebuild()} sale(s).")
+        mismatches = SaleService(db).check_columnar_snapshot(snapshot, compare_periods)
+        stats = snapshot.stats()
+    finally:
+        db.close()
+
+    for mismatch in mismatches:
+        print(mismatch)
+    if mismatches:
+        print(f"{len(mismatches)} revenue answer(s) differ from SQL; rerun with --rebuild.")
+        return 1
+    print(f"The columnar snapshot matches SQL ({stats['rows']} settled sale(s), {stats['categories']} categories).")
+    return 0
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(check_columnar(args.directory, args.rebuild, args.compare_periods))
@@ -0,0 +1,41 @@
+import argparse
+import sys
+
+from app.database import SessionLocal
+from app.services import RevenueRollupService, SaleCategoryService
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Check sales.category against the category of each sale's product.")
+    parser.add_argument("--repair", action="store_true", help="Copy product categories onto drifted sales")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Sales updated per committed batch")
+    parser.add_argument("--show", type=int, default=20, help="Drifted sales to list")
+    return parser.parse_args()
+
+
+def check_sale_categories(repair=False, batch_size=10_000, show=20) -> int:
+    db = SessionLocal()
+    try:
+        service = SaleCategoryService(db)
+        count, sample = service.check(limit=show)
+        for row in sample:
+            print(f"sale {row['id']} (product {row['product_id']}): {row['category']!r} != {row['expected']!r}")
+        if count and repair:
+            fixed = service.repair(batch_size)
+            # The category rollups are grouped on sales.category, so they drifted along with it.
+            days = RevenueRollupService(db).rebuild()
+            print(f"Repaired {fixed} sale(s) and rebuilt revenue rollups for {days} day(s).")
+            return 0
+    finally:
+        db.close()
+
+    if count:
+        print(f"{count} sale(s) have a category that differs from their product's; rerun with --repair.")
+        return 1
+    print("Every sale's category matches its product.")
+    return 0
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    sys.exit(check_sale_categories(args.repair, args.batch_size, args.show))
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 
 from app import models
 from app.database import SessionLocal, engine  # noqa: F401
+from app.services import RevenueRollupService
 
 # Optional: Only if you haven't run migrations yet
 # models.Base.metadata.create_all(bind=engine)
@@ -91,6 +92,9 @@ def create_demo_data():
             db.add(log)
     db.commit()
 
+    print("Rebuilding revenue rollups...")
+    RevenueRollupService(db).rebuild()
+
     db.close()
     print("Demo data created with complete inventory history.")
 
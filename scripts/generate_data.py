@@ -0,0 +1,344 @@
+"""Generates large, reproducible datasets for load tests and benchmarks.
+
+Every product's history (initial stock, daily sales, periodic restocks) is simulated from its own
+random stream derived from ``--seed``, so the same arguments always produce the same rows whatever
+the number of workers. Stock never goes negative: a sale that would exceed the stock on hand is
+skipped, and ``inventory.stock`` always equals the sum of the product's ``inventory_log`` changes.
+
+Rows are written with chunked multi-row inserts. With ``--workers`` products are split into
+batches simulated and written by separate processes.
+
+Example (about 10M sales):
+
+    python scripts/generate_data.py --products 5000 --years 3 --sales-per-day 9000 --workers 8 --truncate
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+from datetime import time as dt_time
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any, Optional
+
+from sqlalchemy import Table, create_engine, delete, event, func, insert, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services import RevenueRollupService
+
+# Relative demand by weekday, Monday first.
+WEEKDAY_DEMAND = (0.9, 0.9, 0.95, 1.0, 1.1, 1.35, 1.2)
+MAX_QUANTITY = 5
+PRODUCTS_PER_TASK = 50
+# A fixed default rather than today, so the same arguments give the same dataset on any day.
+DEFAULT_END_DATE = date(2025, 12, 31)
+
+
+@dataclass(frozen=True)
+class GeneratorOptions:
+    database_url: str
+    seed: int
+    products: int
+    categories: int
+    years: float
+    end_date: date
+    sales_per_day: float
+    popularity_skew: float
+    restock_days: int
+    chunk_size: int
+
+    @property
+    def start_date(self) -> date:
+        return self.end_date - timedelta(days=max(int(self.years * 365), 1) - 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic dataset.")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="Defaults to $DATABASE_URL")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--products", type=int, default=1000)
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--years", type=float, default=1.0, help="Length of the sales history")
+    parser.add_argument(
+        "--end-date",
+        type=date.fromisoformat,
+        default=DEFAULT_END_DATE,
+        help="Last day with sales (default: %(default)s)",
+    )
+    parser.add_argument("--sales-per-day", type=float, default=1000, help="Mean sales per day across all products")
+    parser.add_argument(
+        "--popularity-skew", type=float, default=1.0, help="Zipf exponent of product demand (0 = uniform)"
+    )
+    parser.add_argument("--restock-days", type=int, default=7, help="Days between restocks of each product")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows per multi-row insert")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes simulating and writing products (SQLite serializes writers, so this mainly helps MySQL)",
+    )
+    parser.add_argument("--truncate", action="store_true", help="Delete existing products, stock and sales first")
+    return parser.parse_args()
+
+
+def get_engine(database_url: str) -> Engine:
+    if not database_url.startswith("sqlite"):
+        return create_engine(database_url)
+
+    # Workers writing to one SQLite file take turns; give them time to wait for the write lock.
+    engine = create_engine(database_url, connect_args={"timeout": 300})
+
+    @event.listens_for(engine, "connect")
+    def skip_fsync(dbapi_connection, connection_record):
+        # A half-written generated dataset is simply generated again, so don't wait for fsync.
+        dbapi_connection.execute("PRAGMA synchronous = OFF")
+
+    return engine
+
+
+def truncate(engine: Engine) -> None:
+    with engine.begin() as connection:
+        for model in (
+            models.DailyCategoryRevenue,
+            models.DailyRevenue,
+            models.Sale,
+            models.InventoryLog,
+            models.Inventory,
+            models.Product,
+        ):
+            connection.execute(delete(model))
+
+
+def build_products(options: GeneratorOptions, first_id: int) -> list[dict]:
+    """Product rows with a ``demand`` key: the product's mean sales per day."""
+    rng = random.Random(f"{options.seed}:products")
+    ranks = list(range(1, options.products + 1))
+    rng.shuffle(ranks)
+    weights = [1 / rank**options.popularity_skew for rank in ranks]
+    total_weight = sum(weights)
+
+    products = []
+    for offset, weight in enumerate(weights):
+        product_id = first_id + offset
+        price = Decimal(str(round(math.exp(rng.gauss(3.5, 1.0)), 2))).max(Decimal("0.99"))
+        products.append(
+            {
+                "id": product_id,
+                "name": f"Product {product_id:07d}",
+                "category": f"Category {rng.randrange(options.categories) + 1:03d}",
+                "price": price,
+                "description": "",
+                "demand": options.sales_per_day * weight / total_weight,
+            }
+        )
+    return products
+
+
+def insert_products(engine: Engine, products: list[dict], chunk_size: int) -> None:
+    columns = ("id", "name", "category", "price", "description")
+    with engine.begin() as connection:
+        for start in range(0, len(products), chunk_size):
+            chunk = products[start : start + chunk_size]
+            connection.execute(insert(models.Product.__table__), [{c: p[c] for c in columns} for p in chunk])
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    if mean <= 0:
+        return 0
+    if mean > 30:
+        return max(0, round(rng.gauss(mean, math.sqrt(mean))))
+    # Knuth's method; exact and fast enough for the small per-product daily means.
+    limit, count, product = math.exp(-mean), 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+class BulkInsert:
+    """``INSERT`` compiled once and run through the driver's ``executemany`` with plain tuples.
+
+    This skips SQLAlchemy's per-row parameter handling, which otherwise dominates load time, so rows
+    must already hold driver values: pass them through ``bind(column)``, the column type's own bind
+    processor, to store them exactly as the app does. Drivers such as PyMySQL rewrite the
+    ``executemany`` into multi-row ``INSERT .. VALUES`` batches.
+    """
+
+    def __init__(self, engine: Engine, table: Table, columns: tuple[str, ...]):
+        dialect = engine.dialect
+        if dialect.paramstyle == "qmark":
+            placeholder = "?"
+        elif dialect.paramstyle in ("format", "pyformat"):
+            placeholder = "%s"
+        else:
+            raise ValueError(f"Unsupported DB-API paramstyle: {dialect.paramstyle}")
+
+        quote = dialect.identifier_preparer.quote
+        self.sql = (
+            f"INSERT INTO {quote(table.name)} ({', '.join(quote(c) for c in columns)}) "
+            f"VALUES ({', '.join([placeholder] * len(columns))})"
+        )
+        self.dialect = dialect
+        self.table = table
+
+    def bind(self, column: str) -> Callable[[Any], Any]:
+        processor = self.table.c[column].type.dialect_impl(self.dialect).bind_processor(self.dialect)
+        return processor or (lambda value: value)
+
+    def __call__(self, connection: Connection, rows: list[tuple]) -> None:
+        connection.exec_driver_sql(self.sql, rows)
+
+
+class ChunkWriter:
+    """Buffers sale and log rows and writes them in multi-row inserts of ``chunk_size``."""
+
+    def __init__(self, engine: Engine, chunk_size: int):
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.insert_sales = BulkInsert(
+            engine, models.Sale.__table__, ("product_id", "quantity", "sale_date", "total_amount", "category")
+        )
+        self.insert_logs = BulkInsert(
+            engine, models.InventoryLog.__table__, ("product_id", "change", "reason", "changed_at")
+        )
+        self.insert_inventory = BulkInsert(engine, models.Inventory.__table__, ("product_id", "stock", "last_updated"))
+        self.sales: list[tuple] = []
+        self.logs: list[tuple] = []
+        self.sales_written = 0
+        self.logs_written = 0
+
+    def add(self, sale: Optional[tuple], log: tuple) -> None:
+        if sale is not None:
+            self.sales.append(sale)
+        self.logs.append(log)
+        if len(self.logs) >= self.chunk_size:
+            self.flush()
+
+    def flush(self, inventory: Optional[list[tuple]] = None) -> None:
+        with self.engine.begin() as connection:
+            if self.sales:
+                self.insert_sales(connection, self.sales)
+            if self.logs:
+                self.insert_logs(connection, self.logs)
+            if inventory:
+                self.insert_inventory(connection, inventory)
+        self.sales_written += len(self.sales)
+        self.logs_written += len(self.logs)
+        self.sales, self.logs = [], []
+
+
+def simulate_products(options: GeneratorOptions, products: list[dict]) -> tuple[int, int]:
+    """Simulates and writes the history of ``products``; returns (sales, logs) written."""
+    engine = get_engine(options.database_url)
+    writer = ChunkWriter(engine, options.chunk_size)
+    days = (options.end_date - options.start_date).days + 1
+    opened_at = datetime.combine(options.start_date - timedelta(days=1), dt_time(9))
+    inventory = []
+
+    bind_date = writer.insert_sales.bind("sale_date")
+    bind_amount = writer.insert_sales.bind("total_amount")
+    bind_changed_at = writer.insert_logs.bind("changed_at")
+    sale_dates = [options.start_date + timedelta(days=day_offset) for day_offset in range(days)]
+    bound_sale_dates = [bind_date(sale_date) for sale_date in sale_dates]
+    last_updated = writer.insert_inventory.bind("last_updated")(datetime.combine(options.end_date, dt_time(23, 59)))
+
+    for product in products:
+        rng = random.Random(f"{options.seed}:product:{product['id']}")
+        product_id, price, demand, category = product["id"], product["price"], product["demand"], product["category"]
+        # Stock for a restock period of average demand, with headroom for busy weeks.
+        capacity = max(10, math.ceil(demand * options.restock_days * (MAX_QUANTITY + 1) / 2 * 1.5))
+        totals = [bind_amount(price * quantity) for quantity in range(MAX_QUANTITY + 1)]
+
+        stock = capacity
+        writer.add(None, (product_id, stock, "initial stock", bind_changed_at(opened_at)))
+
+        for day_offset, sale_date in enumerate(sale_dates):
+            day_start = datetime.combine(sale_date, dt_time())
+
+            if day_offset and day_offset % options.restock_days == 0 and stock < capacity:
+                restocked_at = bind_changed_at(day_start + timedelta(hours=6))
+                writer.add(None, (product_id, capacity - stock, "restock", restocked_at))
+                stock = capacity
+
+            count = poisson(rng, demand * WEEKDAY_DEMAND[sale_date.weekday()])
+            # Opening hours 08:00-22:00; random() is used directly as it is much cheaper than randrange().
+            seconds = sorted(int(rng.random() * 14 * 3600) + 8 * 3600 for _ in range(count))
+            for second in seconds:
+                quantity = 1 + int(rng.random() * MAX_QUANTITY)
+                if quantity > stock:
+                    continue  # out of stock until the next restock
+                stock -= quantity
+                writer.add(
+                    (product_id, quantity, bound_sale_dates[day_offset], totals[quantity], category),
+                    (product_id, -quantity, "sale", bind_changed_at(day_start + timedelta(seconds=second))),
+                )
+
+        inventory.append((product_id, stock, last_updated))
+
+    writer.flush(inventory)
+    engine.dispose()
+    return writer.sales_written, writer.logs_written
+
+
+def generate(options: GeneratorOptions, workers: int = 1, clear: bool = False) -> dict:
+    """Generates the dataset described by ``options`` and rebuilds the revenue rollups."""
+    started = time.perf_counter()
+    engine = get_engine(options.database_url)
+    if clear:
+        truncate(engine)
+
+    with engine.connect() as connection:
+        first_id = (connection.scalar(select(func.max(models.Product.id))) or 0) + 1
+    products = build_products(options, first_id)
+    insert_products(engine, products, options.chunk_size)
+
+    batches = [products[i : i + PRODUCTS_PER_TASK] for i in range(0, len(products), PRODUCTS_PER_TASK)]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(simulate_products, [options] * len(batches), batches))
+    else:
+        results = [simulate_products(options, batch) for batch in batches]
+
+    with Session(bind=engine) as db:
+        RevenueRollupService(db).rebuild(start_date=options.start_date, end_date=options.end_date)
+    engine.dispose()
+
+    return {
+        "products": len(products),
+        "sales": sum(sales for sales, _ in results),
+        "inventory_logs": sum(logs for _, logs in results),
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.database_url:
+        raise SystemExit("Set DATABASE_URL or pass --database-url")
+
+    options = GeneratorOptions(
+        database_url=args.database_url,
+        seed=args.seed,
+        products=args.products,
+        categories=args.categories,
+        years=args.years,
+        end_date=args.end_date,
+        sales_per_day=args.sales_per_day,
+        popularity_skew=args.popularity_skew,
+        restock_days=args.restock_days,
+        chunk_size=args.chunk_size,
+    )
+    print(f"Generating {options.start_date} .. {options.end_date} with {asdict(options)}")
+    summary = generate(options, workers=args.workers, clear=args.truncate)
+    print(
+        f"Wrote {summary['products']} products, {summary['sales']} sales and "
+        f"{summary['inventory_logs']} inventory log rows in {summary['seconds']}s."
+    )
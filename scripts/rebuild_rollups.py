@@ -0,0 +1,26 @@
+import argparse
+from datetime import date
+
+from app.database import SessionLocal
+from app.services import RevenueRollupService
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Rebuild the daily revenue rollup tables from the sales table.")
+    parser.add_argument("--start-date", type=date.fromisoformat, help="First day to rebuild (inclusive)")
+    parser.add_argument("--end-date", type=date.fromisoformat, help="Last day to rebuild (inclusive)")
+    return parser.parse_args()
+
+
+def rebuild_rollups(start_date=None, end_date=None):
+    db = SessionLocal()
+    try:
+        days = RevenueRollupService(db).rebuild(start_date=start_date, end_date=end_date)
+    finally:
+        db.close()
+    print(f"Rebuilt revenue rollups for {days} day(s).")
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    rebuild_rollups(args.start_date, args.end_date)
@@ -9,6 +9,7 @@ from sqlalchemy.pool import StaticPool
 import app.models  # noqa: F401 # Ensures models are registered
 from app.database import Base, get_db  # Adjust import paths to your app
 from app.main import app as fastapi_app
+from app.services import ProductService, SaleService
 
 # Use in-memory SQLite for tests
 TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -29,6 +30,14 @@ def create_test_db():
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keeps cached rows from leaking between tests that use different databases."""
+    ProductService.cache.clear()
+    SaleService.analytics_cache.clear()
+    yield
+
+
 @pytest.fixture
 def test_db(create_test_db):
     """Returns a new database session for a test."""
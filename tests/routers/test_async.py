@@ -0,0 +1,107 @@
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import columnar
+from app.database import Base, get_async_db, get_async_url, get_db
+from app.main import get_application
+from app.services import SaleService
+
+
+class TestAsyncMode:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'async.db'}"
+        self.sync_engine = sync_engine = create_engine(url)
+        Base.metadata.create_all(bind=sync_engine)
+        async_engine = create_async_engine(get_async_url(url))
+        AsyncTestingSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+        TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=sync_engine)
+
+        async def override_get_async_db():
+            async with AsyncTestingSessionLocal() as db:
+                yield db
+
+        def override_get_db():
+            db = TestingSessionLocal()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        application = get_application(async_mode=True)
+        application.dependency_overrides[get_async_db] = override_get_async_db
+        application.dependency_overrides[get_db] = override_get_db
+        with TestClient(application) as client:
+            self.client = client
+            yield
+        sync_engine.dispose()
+
+    def test_async_url(self):
+        assert get_async_url("mysql+pymysql://u:p@db:3306/mart").drivername == "mysql+aiomysql"
+        assert get_async_url("sqlite:///:memory:").drivername == "sqlite+aiosqlite"
+
+    def test_sale_flow(self):
+        product = self.client.post("/api/products/", json={"name": "Async", "category": "Async", "price": 4.00}).json()
+        assert self.client.get(f"/api/products/{product['id']}").json()["name"] == "Async"
+
+        response = self.client.post("/api/inventory/", json={"product_id": product["id"], "stock": 5})
+        assert response.status_code == 200
+
+        sale = {"product_id": product["id"], "quantity": 3, "sale_date": "2020-01-15"}
+        response = self.client.post("/api/sales/", json=sale)
+        assert response.status_code == 200
+        assert float(response.json()["total_amount"]) == 12.00
+
+        response = self.client.post("/api/sales/", json=sale)
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Not enough stock. Available: 2, Requested: 3"
+
+        assert self.client.get("/api/inventory/low-stock", params={"threshold": 3}).json()[0]["stock"] == 2
+        assert self.client.get("/api/sales/revenue", params={"period": "month"}).json() == [
+            {"year": 2020, "month": 1, "total_amount": 12.0}
+        ]
+        logs = self.client.get(f"/api/inventory/{product['id']}/logs").json()
+        assert [log["change"] for log in logs] == [-3, 5]
+
+    def test_sync_only_routes_fall_through(self):
+        response = self.client.get("/api/sales/export")
+        assert response.status_code == 200
+        assert response.text.startswith("id,product_id")
+
+    def test_revenue_invalidated_while_computing_is_not_cached(self, monkeypatch):
+        compute = SaleService._sql_revenue_by_period
+
+        def compute_during_sale(service, *args):
+            results = compute(service, *args)
+            # A sale committed while the query ran, after it had read the rollups.
+            SaleService.analytics_cache.invalidate(date(2020, 1, 15), "Async")
+            return results
+
+        monkeypatch.setattr(SaleService, "_sql_revenue_by_period", compute_during_sale)
+
+        assert self.client.get("/api/sales/revenue", params={"period": "month"}).status_code == 200
+        assert SaleService.analytics_cache.stats()["size"] == 0
+
+    def test_columnar_revenue_runs_off_the_event_loop(self, tmp_path, monkeypatch):
+        pytest.importorskip("numpy")
+        snapshot = columnar.SalesSnapshot(str(tmp_path / "columnar"), engine=self.sync_engine)
+        monkeypatch.setattr(columnar, "sales_snapshot", snapshot)
+        on_loop = []
+
+        def revenue_by_period(*args):
+            try:
+                on_loop.append(asyncio.get_running_loop() is not None)
+            except RuntimeError:
+                on_loop.append(False)
+            return columnar.SalesSnapshot.revenue_by_period(snapshot, *args)
+
+        monkeypatch.setattr(snapshot, "revenue_by_period", revenue_by_period)
+
+        assert self.client.get("/api/sales/revenue", params={"period": "month"}).json() == []
+        assert on_loop == [False]
@@ -0,0 +1,86 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.models import Inventory, InventoryLog, Product, Sale
+
+
+class TestChanges:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+        self.product = Product(name="Synced", category="Sync", price=6.00)
+        self.db.add(self.product)
+        self.db.commit()
+        self.client.post("/api/inventory/", json={"product_id": self.product.id, "stock": 10})
+        self.client.post("/api/sales/", json={"product_id": self.product.id, "quantity": 2, "sale_date": "2024-08-01"})
+        self._settle()
+
+    def _settle(self, ago=timedelta(minutes=1)):
+        # Changes younger than CHANGES_SETTLE_SECONDS are held back; age every row past it.
+        past = datetime.now() - ago
+        for column in (Product.updated_at, Inventory.last_updated, Sale.created_at, InventoryLog.changed_at):
+            self.db.execute(update(column.class_).where(column > past).values({column.key: past}))
+        self.db.commit()
+
+    def _sync(self, since=None, limit=1000):
+        """Follows the feed until ``has_more`` is false; returns the rows for this test's product and the cursor."""
+        rows = {"products": [], "inventory": [], "sales": [], "inventory_logs": []}
+        while True:
+            response = self.client.get(
+                "/api/changes/", params={"since": since, "limit": limit} if since else {"limit": limit}
+            )
+            assert response.status_code == 200
+            body = response.json()
+            for key in rows:
+                rows[key] += [row for row in body[key] if row.get("product_id", row.get("id")) == self.product.id]
+            since = body["cursor"]
+            if not body["has_more"]:
+                return rows, since
+
+    def test_initial_sync_returns_every_entity(self):
+        rows, _ = self._sync()
+
+        assert [p["name"] for p in rows["products"]] == ["Synced"]
+        assert [i["stock"] for i in rows["inventory"]] == [8]
+        assert [s["quantity"] for s in rows["sales"]] == [2]
+        assert [log["reason"] for log in rows["inventory_logs"]] == ["initial stock", "sale"]
+
+    def test_incremental_sync_returns_only_new_changes(self):
+        _, cursor = self._sync()
+
+        self.client.put(f"/api/inventory/{self.product.id}", json={"stock": 30})
+        self._settle(ago=timedelta(seconds=30))
+        rows, cursor = self._sync(cursor)
+
+        assert rows["products"] == [] and rows["sales"] == []
+        assert [i["stock"] for i in rows["inventory"]] == [30]
+        assert [log["change"] for log in rows["inventory_logs"]] == [22]
+        assert self._sync(cursor)[0] == {"products": [], "inventory": [], "sales": [], "inventory_logs": []}
+
+    def test_small_pages_walk_every_change_once(self):
+        for day in range(2, 6):
+            sale = {"product_id": self.product.id, "quantity": 1, "sale_date": f"2024-08-0{day}"}
+            self.client.post("/api/sales/", json=sale)
+        self._settle()
+
+        rows, _ = self._sync(limit=2)
+
+        assert [s["sale_date"] for s in rows["sales"]] == [str(date(2024, 8, day)) for day in range(1, 6)]
+        assert len(rows["inventory_logs"]) == 6
+
+    def test_recent_changes_are_held_back(self):
+        _, cursor = self._sync()
+
+        self.client.put(f"/api/inventory/{self.product.id}", json={"stock": 5})
+        held, cursor = self._sync(cursor)
+        self._settle(ago=timedelta(seconds=30))
+        released, _ = self._sync(cursor)
+
+        assert held["inventory"] == [] and held["inventory_logs"] == []
+        assert [i["stock"] for i in released["inventory"]] == [5]
+
+    def test_invalid_cursor(self):
+        assert self.client.get("/api/changes/", params={"since": "bogus"}).status_code == 400
@@ -25,3 +25,21 @@ class TestInventory:
         response = self.client.post("/api/inventory/", json=inventory_data)
 
         assert response.status_code in [400, 409]
+
+    def test_logs_cursor_pagination(self):
+        self.client.post("/api/inventory/", json={"product_id": self.product.id, "stock": 50})
+        for stock in (40, 30, 20):
+            self.client.put(f"/api/inventory/{self.product.id}", json={"stock": stock})
+
+        response = self.client.get(f"/api/inventory/{self.product.id}/logs", params={"limit": 3})
+        assert response.status_code == 200
+        first_page = response.json()
+        assert len(first_page) == 3
+
+        cursor = response.headers["X-Next-Cursor"]
+        response = self.client.get(f"/api/inventory/{self.product.id}/logs", params={"limit": 3, "cursor": cursor})
+        second_page = response.json()
+        assert "X-Next-Cursor" not in response.headers
+
+        logs = first_page + second_page
+        assert [log["change"] for log in logs] == [-10, -10, -10, 50]
@@ -0,0 +1,101 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import event, func, select
+
+from app.models import DailyCategoryRevenue, Inventory, InventoryLog, Product, Sale
+from app.routers import orders
+
+
+class TestOrders:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+
+        self.products = [Product(name=f"Order Product {n}", category="Orders", price=2.50 + n) for n in range(5)]
+        self.db.add_all(self.products)
+        self.db.commit()
+        self.product_ids = [product.id for product in self.products]
+        self.inventory = [Inventory(product_id=product_id, stock=10) for product_id in self.product_ids]
+        self.db.add_all(self.inventory)
+        self.db.commit()
+
+    def _order(self, *lines):
+        lines = [{"product_id": self.product_ids[index], "quantity": quantity} for index, quantity in lines]
+        return {"sale_date": "2003-04-05", "lines": lines}
+
+    def _stock(self):
+        for inventory in self.inventory:
+            self.db.refresh(inventory)
+        return [inventory.stock for inventory in self.inventory]
+
+    def _sales(self):
+        return self.db.scalar(select(func.count(Sale.id)).where(Sale.product_id.in_(self.product_ids)))
+
+    def test_create_order(self):
+        response = self.client.post("/api/orders/", json=self._order((1, 2), (0, 1), (1, 3)))
+
+        assert response.status_code == 200
+        order = response.json()
+        assert float(order["total_amount"]) == 2 * 3.5 + 2.5 + 3 * 3.5
+        assert [(line["product_id"], line["quantity"]) for line in order["lines"]] == [
+            (self.product_ids[1], 2),
+            (self.product_ids[0], 1),
+            (self.product_ids[1], 3),
+        ]
+        assert self._stock() == [9, 5, 10, 10, 10]
+        assert self._sales() == 3
+        logged = self.db.scalar(
+            select(func.sum(InventoryLog.change)).where(InventoryLog.product_id.in_(self.product_ids))
+        )
+        assert logged == -6
+        rollup = self.db.get(DailyCategoryRevenue, ("Orders", date(2003, 4, 5)))
+        assert (float(rollup.total_amount), rollup.sale_count) == (20.0, 3)
+
+    def test_lines_share_their_product_stock(self):
+        response = self.client.post("/api/orders/", json=self._order((0, 1), (2, 6), (2, 5)))
+
+        assert response.status_code == 400
+        assert (
+            response.json()["detail"]
+            == f"Not enough stock for product {self.product_ids[2]}. Available: 10, Requested: 11"
+        )
+        assert self._stock() == [10] * 5
+        assert self._sales() == 0
+
+    def test_unknown_product_sells_nothing(self):
+        order = self._order((0, 1))
+        order["lines"].append({"product_id": 999999, "quantity": 1})
+
+        response = self.client.post("/api/orders/", json=order)
+
+        assert response.status_code == 404
+        assert self._stock() == [10] * 5
+
+    @pytest.mark.parametrize("lines", [[], [{"product_id": 1, "quantity": 0}]])
+    def test_invalid_lines(self, lines):
+        response = self.client.post("/api/orders/", json={"sale_date": "2003-04-05", "lines": lines})
+
+        assert response.status_code == 422
+
+    def test_line_limit(self, monkeypatch):
+        monkeypatch.setattr(orders, "ORDER_MAX_LINES", 2)
+
+        response = self.client.post("/api/orders/", json=self._order((0, 1), (1, 1), (2, 1)))
+
+        assert response.status_code == 413
+
+    def test_statements_do_not_grow_with_lines(self):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+        event.listen(self.db.get_bind(), "before_cursor_execute", listener)
+        try:
+            self.client.post("/api/orders/", json=self._order((0, 1)))
+            single = len(statements)
+            statements.clear()
+            self.client.post("/api/orders/", json=self._order((1, 1), (2, 1), (3, 1), (4, 1)))
+        finally:
+            event.remove(self.db.get_bind(), "before_cursor_execute", listener)
+
+        assert len(statements) == single
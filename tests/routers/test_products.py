@@ -1,7 +1,10 @@
 import pytest
 from fastapi.testclient import TestClient
 
+from app.config import MAX_PAGE_SIZE
 from app.main import app
+from app.models import Product
+from app.pagination import encode_cursor
 
 
 class TestProduct:
@@ -22,3 +25,34 @@ class TestProduct:
         invalid_data["price"] = -10  # Invalid price
         response = self.client.post("/api/products/", json=invalid_data)
         assert response.status_code == 422  # Unprocessable Entity
+
+
+class TestProductPagination:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.ids = []
+        for i in range(5):
+            product = Product(name=f"Paged {i}", category="Paging", price=1.00)
+            test_db.add(product)
+            test_db.commit()
+            self.ids.append(product.id)
+
+    def test_cursor_walks_all_pages(self):
+        cursor = encode_cursor(self.ids[0] - 1)
+        seen = []
+        while cursor:
+            response = self.client.get("/api/products/", params={"limit": 2, "cursor": cursor})
+            assert response.status_code == 200
+            seen.extend(p["id"] for p in response.json())
+            cursor = response.headers.get("X-Next-Cursor")
+
+        assert seen[:5] == self.ids
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/products/", params={"cursor": "not-a-cursor"})
+        assert response.status_code == 400
+
+    def test_page_size_is_capped(self):
+        response = self.client.get("/api/products/", params={"limit": MAX_PAGE_SIZE + 1})
+        assert response.status_code == 422
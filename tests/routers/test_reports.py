@@ -0,0 +1,168 @@
+import csv
+import io
+import threading
+import time
+
+import pytest
+
+from app import services
+from app.main import app as fastapi_app
+from app.models import Product
+from app.reports import ReportJobManager, get_report_jobs
+from tests.conftest import TestingSessionLocal
+
+
+class TestReports:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db, tmp_path):
+        self.client = client
+        self.db = test_db
+        self.tmp_path = tmp_path
+        self.gate = threading.Event()
+        self.gate.set()
+        self.jobs = self._manager()
+
+        self.product = Product(name="Reported", category="Reports", price=4.00)
+        self.db.add(self.product)
+        self.db.commit()
+        self.client.post("/api/inventory/", json={"product_id": self.product.id, "stock": 100})
+        for day in (1, 2, 3):
+            sale = {"product_id": self.product.id, "quantity": day, "sale_date": f"2024-10-0{day}"}
+            self.client.post("/api/sales/", json=sale)
+        yield
+        self.gate.set()
+        self.jobs.shutdown(wait=True)
+        fastapi_app.dependency_overrides.pop(get_report_jobs, None)
+
+    def _manager(self, **options):
+        def session_factory():
+            # Closed gates hold jobs in the running state until the test opens them.
+            self.gate.wait(5)
+            return TestingSessionLocal()
+
+        options = {"directory": str(self.tmp_path / "reports"), "workers": 1, **options}
+        jobs = ReportJobManager(session_factory=session_factory, **options)
+        fastapi_app.dependency_overrides[get_report_jobs] = lambda: jobs
+        self.jobs = jobs
+        return jobs
+
+    def _submit(self, **report):
+        response = self.client.post("/api/reports/", json=report)
+        assert response.status_code == 202
+        return response
+
+    def _wait(self, job_id):
+        self.jobs.get(job_id).future.result(timeout=5)
+        return self.client.get(f"/api/reports/{job_id}").json()
+
+    def _wait_until_running(self, job_id):
+        deadline = time.monotonic() + 5
+        while self.jobs.get(job_id).status != "running":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    def test_revenue_report(self):
+        response = self._submit(kind="revenue", period="month", start_date="2024-10-01", end_date="2024-10-31")
+        job = response.json()
+
+        assert job["status"] in ("queued", "running")
+        assert response.headers["Location"].endswith(f"/api/reports/{job['id']}")
+
+        job = self._wait(job["id"])
+        assert job["status"] == "succeeded"
+        assert job["progress"] == 1.0
+        assert job["expires_at"] is not None
+
+        result = self.client.get(job["result_url"])
+        assert result.headers["content-type"] == "application/json"
+        revenue = self.client.get(
+            "/api/sales/revenue", params={"period": "month", "start_date": "2024-10-01", "end_date": "2024-10-31"}
+        )
+        assert result.json() == revenue.json()
+
+    def test_sales_export_report(self, monkeypatch):
+        monkeypatch.setattr(services, "EXPORT_CHUNK_SIZE", 2)
+        job_id = self._submit(kind="sales_export", format="csv", product_id=self.product.id).json()["id"]
+
+        job = self._wait(job_id)
+        result = self.client.get(job["result_url"])
+
+        assert (job["status"], job["rows"], job["progress"]) == ("succeeded", 3, 1.0)
+        assert result.headers["content-type"].startswith("text/csv")
+        assert "attachment" in result.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(result.text)))
+        assert [row["quantity"] for row in rows] == ["3", "2", "1"]
+
+    def test_parameters_must_fit_the_kind(self):
+        response = self.client.post("/api/reports/", json={"kind": "revenue", "format": "csv"})
+
+        assert response.status_code == 422
+
+    def test_pending_limit(self):
+        self._manager(max_pending=1)
+        self.gate.clear()
+        self._submit(kind="revenue")
+
+        response = self.client.post("/api/reports/", json={"kind": "revenue"})
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "30"
+
+    def test_cancel_queued_job(self):
+        self.gate.clear()
+        running = self._submit(kind="revenue").json()["id"]
+        queued = self._submit(kind="revenue").json()["id"]
+
+        job = self.client.post(f"/api/reports/{queued}/cancel").json()
+        assert (job["status"], job["cancel_requested"]) == ("cancelled", True)
+        assert self.client.get(f"/api/reports/{queued}/result").status_code == 409
+
+        self.gate.set()
+        assert self._wait(running)["status"] == "succeeded"
+
+    def test_cancel_running_export(self):
+        self.gate.clear()
+        job_id = self._submit(kind="sales_export", product_id=self.product.id).json()["id"]
+        self._wait_until_running(job_id)
+
+        self.client.post(f"/api/reports/{job_id}/cancel")
+        self.gate.set()
+        job = self._wait(job_id)
+
+        assert (job["status"], job["rows"], job["result_url"]) == ("cancelled", 0, None)
+        assert list((self.tmp_path / "reports").iterdir()) == []  # the partial file is gone
+
+    def test_cancelling_finished_job_keeps_it(self):
+        job_id = self._submit(kind="revenue").json()["id"]
+        self._wait(job_id)
+
+        job = self.client.post(f"/api/reports/{job_id}/cancel").json()
+
+        assert (job["status"], job["cancel_requested"]) == ("succeeded", False)
+
+    def test_finished_jobs_expire_with_their_results(self):
+        self._manager(ttl=0)
+        self.gate.clear()
+        job_id = self._submit(kind="revenue").json()["id"]
+        future = self.jobs.get(job_id).future  # taken before the job finishes and expires
+        self.gate.set()
+        future.result(timeout=5)
+
+        assert self.client.get(f"/api/reports/{job_id}").status_code == 404
+        assert list((self.tmp_path / "reports").iterdir()) == []
+
+    def test_delete(self):
+        job_id = self._submit(kind="revenue").json()["id"]
+        self._wait(job_id)
+
+        assert self.client.delete(f"/api/reports/{job_id}").status_code == 204
+        assert self.client.get(f"/api/reports/{job_id}").status_code == 404
+        assert self.client.get("/api/reports/").json() == []
+        assert list((self.tmp_path / "reports").iterdir()) == []
+
+    def test_status_counts(self):
+        self._wait(self._submit(kind="revenue").json()["id"])
+
+        stats = self.client.get("/api/system/reports").json()
+
+        assert (stats["workers"], stats["succeeded"], stats["queued"]) == (1, 1, 0)
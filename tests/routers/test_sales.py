@@ -1,8 +1,10 @@
+import json
 from datetime import date
 
 import pytest
 
-from app.models import Inventory, Product
+from app.models import DailyCategoryRevenue, Inventory, Product
+from app.services import RevenueRollupService, SaleService
 
 
 class TestSales:
@@ -38,3 +40,229 @@ class TestSales:
         response = self.client.post("/api/sales/", json=invalid_data)
         assert response.status_code == 404
         assert response.json()["detail"] == "Product with id 999 does not exist"
+
+
+class TestRevenueRollups:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+
+        self.category = "Rollup Test"
+        self.product = Product(name="Rollup Product", category=self.category, price=10.00)
+        self.db.add(self.product)
+        self.db.commit()
+        self.db.add(Inventory(product_id=self.product.id, stock=100))
+        self.db.commit()
+
+    def _sell(self, quantity, sale_date):
+        data = {"product_id": self.product.id, "quantity": quantity, "sale_date": str(sale_date)}
+        response = self.client.post("/api/sales/", json=data)
+        assert response.status_code == 200
+
+    def test_create_sale_updates_rollups(self):
+        self._sell(2, date(1999, 3, 1))
+        self._sell(3, date(1999, 3, 1))
+        self._sell(1, date(1999, 4, 2))
+
+        day = self.db.get(DailyCategoryRevenue, (self.category, date(1999, 3, 1)))
+        assert float(day.total_amount) == 50.00
+        assert day.sale_count == 2
+
+        response = self.client.get(
+            "/api/sales/revenue/comparison",
+            params={"period": "month", "category": self.category, "compare_periods": 5},
+        )
+        assert response.status_code == 200
+        assert response.json() == [
+            {"total_amount": 10.0, "category": self.category, "period": "1999-04"},
+            {"total_amount": 50.0, "category": self.category, "period": "1999-03"},
+        ]
+
+    def test_rebuild_matches_incremental_rollups(self):
+        self._sell(4, date(1998, 6, 15))
+        self._sell(1, date(1998, 6, 16))
+        before = self.client.get("/api/sales/revenue", params={"period": "day"}).json()
+
+        RevenueRollupService(self.db).rebuild(start_date=date(1998, 1, 1), end_date=date(1998, 12, 31))
+
+        after = self.client.get("/api/sales/revenue", params={"period": "day"}).json()
+        assert after == before
+        assert {"date": "1998-06-15", "total_amount": 40.0} in after
+
+
+class TestAnalyticsCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+
+        self.products = {}
+        for category in ("Analytics A", "Analytics B"):
+            product = Product(name=f"{category} Product", category=category, price=10.00)
+            self.db.add(product)
+            self.db.commit()
+            self.db.add(Inventory(product_id=product.id, stock=100))
+            self.db.commit()
+            self.products[category] = product.id
+
+    def _sell(self, category, sale_date):
+        data = {"product_id": self.products[category], "quantity": 1, "sale_date": str(sale_date)}
+        assert self.client.post("/api/sales/", json=data).status_code == 200
+
+    def _latest_month(self):
+        params = {"period": "month", "category": "Analytics A", "compare_periods": 1}
+        return self.client.get("/api/sales/revenue/comparison", params=params).json()
+
+    def test_sale_invalidates_only_the_periods_it_touches(self):
+        self._sell("Analytics A", date(1997, 5, 10))
+        assert self._latest_month() == [{"total_amount": 10.0, "category": "Analytics A", "period": "1997-05"}]
+        invalidations = SaleService.analytics_cache.stats()["invalidations"]
+
+        # Another category and a month older than the cached one leave the result in place.
+        self._sell("Analytics B", date(1997, 5, 10))
+        self._sell("Analytics A", date(1997, 4, 10))
+        assert SaleService.analytics_cache.stats()["invalidations"] == invalidations
+        assert self._latest_month()[0]["total_amount"] == 10.0
+
+        self._sell("Analytics A", date(1997, 5, 11))
+        assert self._latest_month()[0]["total_amount"] == 20.0
+
+    def test_category_rename_moves_revenue(self):
+        self._sell("Analytics A", date(1996, 1, 10))
+        params = {"period": "month", "start_date": "1996-01-01", "end_date": "1996-01-31"}
+
+        def comparison(category):
+            return self.client.get("/api/sales/revenue/comparison", params={**params, "category": category}).json()
+
+        assert comparison("Analytics A")[0]["total_amount"] == 10.0
+        product = self.db.get(Product, self.products["Analytics A"])
+        product.category = "Analytics Renamed"
+        self.db.commit()
+
+        assert comparison("Analytics Renamed") == [
+            {"total_amount": 10.0, "category": "Analytics Renamed", "period": "1996-01"}
+        ]
+        assert comparison("Analytics A") == []
+        revenue = self.client.get("/api/sales/revenue", params={"period": "month", **params}).json()
+        assert revenue == [{"year": 1996, "month": 1, "total_amount": 10.0}]
+
+    def test_revenue_is_served_from_cache(self):
+        first = self.client.get("/api/sales/revenue", params={"period": "year"}).json()
+        hits = SaleService.analytics_cache.stats()["hits"]
+        assert self.client.get("/api/sales/revenue", params={"period": "year"}).json() == first
+        assert SaleService.analytics_cache.stats()["hits"] == hits + 1
+
+
+class TestBulkSales:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+
+        self.product = Product(name="Bulk Product", category="Bulk", price=5.00)
+        self.db.add(self.product)
+        self.db.commit()
+        self.inventory = Inventory(product_id=self.product.id, stock=10)
+        self.db.add(self.inventory)
+        self.db.commit()
+
+    def _row(self, quantity, product_id=None):
+        return {"product_id": product_id or self.product.id, "quantity": quantity, "sale_date": "2001-02-03"}
+
+    def test_bulk_json_array(self):
+        response = self.client.post("/api/sales/bulk", json=[self._row(3), self._row(4)])
+
+        assert response.status_code == 200
+        assert response.json() == {"created": 2, "failed": 0, "errors": []}
+        self.db.refresh(self.inventory)
+        assert self.inventory.stock == 3
+
+    def test_bulk_ndjson(self):
+        body = "\n".join(json.dumps(row) for row in [self._row(1), self._row(2)])
+        response = self.client.post("/api/sales/bulk", content=body, headers={"content-type": "application/x-ndjson"})
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 2
+
+    def test_bulk_atomic_rejects_whole_batch(self):
+        rows = [self._row(6), self._row(6), self._row(1, product_id=999), {"quantity": 1}]
+        response = self.client.post("/api/sales/bulk", json=rows)
+
+        assert response.status_code == 400
+        detail = response.json()["detail"]
+        assert detail["created"] == 0
+        assert [error["index"] for error in detail["errors"]] == [1, 2, 3]
+        self.db.refresh(self.inventory)
+        assert self.inventory.stock == 10
+
+    def test_bulk_best_effort_writes_valid_rows(self):
+        rows = [self._row(6), self._row(6), self._row(4)]
+        response = self.client.post("/api/sales/bulk", params={"mode": "best_effort"}, json=rows)
+
+        assert response.status_code == 200
+        assert response.json()["created"] == 2
+        assert response.json()["errors"][0]["index"] == 1
+        self.db.refresh(self.inventory)
+        assert self.inventory.stock == 0
+
+
+class TestSalePagination:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.product = Product(name="Paged Sale Product", category="Paged Sales", price=1.00)
+        test_db.add(self.product)
+        test_db.commit()
+        test_db.add(Inventory(product_id=self.product.id, stock=100))
+        test_db.commit()
+
+        for day in (1, 2, 2, 3):
+            sale = {"product_id": self.product.id, "quantity": 1, "sale_date": str(date(1997, 1, day))}
+            assert self.client.post("/api/sales/", json=sale).status_code == 200
+
+    def test_sales_cursor_pagination(self):
+        params = {"product_id": self.product.id, "limit": 3}
+        response = self.client.get("/api/sales/", params=params)
+        first_page = response.json()
+        cursor = response.headers["X-Next-Cursor"]
+
+        response = self.client.get("/api/sales/", params={**params, "cursor": cursor})
+        second_page = response.json()
+        assert "X-Next-Cursor" not in response.headers
+
+        sales = first_page + second_page
+        assert [s["sale_date"] for s in sales] == ["1997-01-03", "1997-01-02", "1997-01-02", "1997-01-01"]
+        assert len({s["id"] for s in sales}) == 4
+
+
+class TestSalesExport:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.product = Product(name="Export Product", category="Export", price=2.50)
+        test_db.add(self.product)
+        test_db.commit()
+        test_db.add(Inventory(product_id=self.product.id, stock=100))
+        test_db.commit()
+
+        for day, quantity in ((1, 2), (2, 4)):
+            sale = {"product_id": self.product.id, "quantity": quantity, "sale_date": str(date(1996, 5, day))}
+            assert self.client.post("/api/sales/", json=sale).status_code == 200
+
+    def test_export_csv(self):
+        response = self.client.get("/api/sales/export", params={"category": "Export"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        lines = response.text.splitlines()
+        assert lines[0] == "id,product_id,quantity,sale_date,total_amount"
+        assert [line.split(",")[3:] for line in lines[1:]] == [["1996-05-02", "10.00"], ["1996-05-01", "5.00"]]
+
+    def test_export_ndjson_matches_list_endpoint(self):
+        params = {"product_id": self.product.id}
+        response = self.client.get("/api/sales/export", params={**params, "format": "ndjson"})
+
+        assert response.status_code == 200
+        exported = [json.loads(line) for line in response.text.splitlines()]
+        assert exported == self.client.get("/api/sales/", params=params).json()
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.main import get_application
+from app.services import ProductService, SaleService
+from benchmarks.datasets import prepare_dataset, working_copy
+from benchmarks.report import compare
+from benchmarks.runner import run_dataset
+from benchmarks.scenarios import SCENARIOS, missing_routes
+
+
+def _results(**scenarios):
+    return {"meta": {}, "results": {"small": scenarios}}
+
+
+def _stats(p50, p95, rps):
+    return {"p50_ms": p50, "p95_ms": p95, "rps": rps}
+
+
+class TestBenchmarks:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_path = tmp_path
+
+    def test_every_route_has_a_scenario(self):
+        assert missing_routes(get_application(async_mode=False), SCENARIOS) == []
+
+    def test_compare_reports_regressions_first(self):
+        baseline = _results(a=_stats(10, 20, 100), b=_stats(10, 20, 100), gone=_stats(1, 1, 1))
+        current = _results(a=_stats(10, 30, 100), b=_stats(5, 20, 100), new=_stats(1, 1, 1))
+
+        changes, unmatched = compare(current, baseline, threshold=0.2)
+
+        assert [(c.scenario, c.metric, c.regressed) for c in changes] == [("a", "p95_ms", True), ("b", "p50_ms", False)]
+        assert unmatched == ["small new: new", "small gone: missing"]
+
+    def test_compare_flags_throughput_drop(self):
+        changes, _ = compare(_results(a=_stats(10, 20, 70)), _results(a=_stats(10, 20, 100)), threshold=0.2)
+
+        assert [(c.metric, c.regressed) for c in changes] == [("rps", True)]
+
+    def test_compare_ignores_small_absolute_latency_changes(self):
+        # Doubling from 0.2ms to 0.4ms is within timer noise.
+        changes, _ = compare(_results(a=_stats(0.4, 0.4, 100)), _results(a=_stats(0.2, 0.2, 100)), min_delta_ms=0.5)
+
+        assert changes == []
+
+    def test_run_on_tiny_dataset(self):
+        product_cache, analytics_enabled = ProductService.cache, SaleService.analytics_cache.enabled
+        dataset = prepare_dataset(self.tmp_path / "data", "tiny", seed=1)
+        database = working_copy(dataset, self.tmp_path)
+
+        results = asyncio.run(run_dataset(str(database), requests=3, concurrency=2, warmup=1))
+
+        assert set(results) == {scenario.name for scenario in SCENARIOS}
+        assert all(stats["errors"] == 0 and stats["requests"] == 3 for stats in results.values())
+        assert ProductService.cache is product_cache
+        assert SaleService.analytics_cache.enabled == analytics_enabled
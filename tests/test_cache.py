@@ -0,0 +1,167 @@
+import threading
+from datetime import date
+
+import pytest
+
+from app.cache import Cache, LRUCache, NullCache, ResultCache, ResultScope, build_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestLRUCache:
+    def test_hits_and_misses(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+
+        stats = cache.stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+        assert stats["hit_ratio"] == 0.5
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats()["evictions"] == 1
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = LRUCache(maxsize=2, ttl=10, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 9.9
+        assert cache.get("a") == 1
+        clock.now = 10.0
+        assert cache.get("a") is None
+        assert cache.stats()["expirations"] == 1
+
+    def test_invalidate(self):
+        cache = LRUCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.invalidate("a")
+        assert cache.get("a") is None
+
+
+def test_disabled_cache():
+    cache = build_cache(enabled=False, maxsize=10, ttl=60)
+    assert isinstance(cache, NullCache)
+    cache.set("a", 1)
+    assert cache.get("a") is None
+    assert cache.stats() == {"enabled": False}
+
+
+def test_incomplete_cache_cannot_be_created():
+    class GetOnlyCache(Cache):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyCache()
+
+
+class TestResultCache:
+    def test_invalidates_matching_scopes_only(self):
+        cache = ResultCache(maxsize=10, ttl=60)
+        cache.put("all", 1, ResultScope())
+        cache.put("books", 2, ResultScope(category="Books"))
+        cache.put("recent", 3, ResultScope(start_date=date(2024, 6, 1)))
+
+        cache.invalidate(date(2024, 1, 1), "Toys")
+
+        assert cache.peek("all") is None
+        assert cache.peek("books") == 2
+        assert cache.peek("recent") == 3
+        assert cache.stats()["invalidations"] == 1
+
+    def test_put_drops_results_invalidated_while_computing(self):
+        cache = ResultCache(maxsize=10, ttl=60)
+        generation = cache.generation()
+        cache.invalidate(date(2024, 1, 1), "Toys")
+
+        cache.put("stale", 1, ResultScope(), generation)
+        cache.put("fresh", 2, ResultScope(), cache.generation())
+
+        assert cache.peek("stale") is None
+        assert cache.peek("fresh") == 2
+
+    def test_evicted_results_take_their_scopes_with_them(self):
+        cache = ResultCache(maxsize=2, ttl=60)
+        for day in range(1, 29):
+            cache.put(day, day, ResultScope(start_date=date(2024, 2, day)))
+
+        cache.invalidate(date(2024, 3, 1), "Toys")
+
+        # Only the two results still cached were scanned and dropped.
+        assert cache.stats()["invalidations"] == 2
+        assert cache.stats()["size"] == 0
+
+    def test_coalesces_concurrent_computations(self):
+        cache = ResultCache(maxsize=10, ttl=60)
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        results = []
+
+        def worker():
+            results.append(cache.get_or_compute("key", compute, lambda _: ResultScope()))
+
+        leader = threading.Thread(target=worker)
+        leader.start()
+        started.wait(5)
+        followers = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in followers:
+            thread.start()
+        while cache.stats()["coalesced"] < 4:
+            pass
+        release.set()
+        for thread in [leader, *followers]:
+            thread.join(5)
+
+        assert results == ["result"] * 5
+        assert len(calls) == 1
+        assert cache.peek("key") == "result"
+
+    def test_result_overlapping_invalidation_is_not_stored(self):
+        cache = ResultCache(maxsize=10, ttl=60)
+
+        def compute():
+            cache.invalidate(date(2024, 1, 1), "Toys")
+            return "stale"
+
+        assert cache.get_or_compute("key", compute, lambda _: ResultScope()) == "stale"
+        assert cache.peek("key") is None
+
+    def test_errors_reach_the_caller_and_are_not_cached(self):
+        cache = ResultCache(maxsize=10, ttl=60)
+
+        def compute():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute("key", compute, lambda _: ResultScope())
+        assert cache.get_or_compute("key", lambda: "ok", lambda _: ResultScope()) == "ok"
+
+    def test_disabled(self):
+        cache = ResultCache(maxsize=10, ttl=60, enabled=False)
+        assert cache.get_or_compute("key", lambda: 1, lambda _: ResultScope()) == 1
+        assert cache.peek("key") is None
+        assert cache.stats() == {"enabled": False}
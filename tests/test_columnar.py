@@ -0,0 +1,153 @@
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, delete, func, select
+from sqlalchemy.orm import Session
+
+from app import columnar, models
+from app.columnar import EPOCH_ORDINAL, SalesSnapshot, period_keys
+from app.database import Base
+from app.services import RevenueRollupService, SaleService
+
+np = pytest.importorskip("numpy")
+
+
+class TestPeriodKeys:
+    DAYS = [date(2019, 12, 25) + timedelta(days=n) for n in range(800)]
+
+    def _weeks(self, week_offset):
+        days = np.array([d.toordinal() - EPOCH_ORDINAL for d in self.DAYS], dtype=np.int32)
+        return [divmod(key, columnar.WEEKS_PER_KEY) for key in period_keys(days, "week", week_offset).tolist()]
+
+    def test_sqlite_weeks_start_on_monday(self):
+        assert self._weeks(columnar.WEEK_OFFSETS["sqlite"]) == [(d.year, int(d.strftime("%W"))) for d in self.DAYS]
+
+    def test_mysql_weeks_start_on_sunday(self):
+        # WEEK(date, 0), which EXTRACT(WEEK) uses, numbers weeks like %U.
+        assert self._weeks(columnar.WEEK_OFFSETS["mysql"]) == [(d.year, int(d.strftime("%U"))) for d in self.DAYS]
+
+    def test_months_and_years(self):
+        days = np.array([date(1969, 12, 31).toordinal() - EPOCH_ORDINAL, date(2024, 2, 29).toordinal() - EPOCH_ORDINAL])
+
+        assert period_keys(days, "year", 3).tolist() == [1969, 2024]
+        assert [divmod(key, 12) for key in period_keys(days, "month", 3).tolist()] == [(-1, 11), (54, 1)]
+
+
+class TestSalesSnapshot:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.engine = create_engine(f"sqlite:///{tmp_path / 'sales.db'}")
+        Base.metadata.create_all(bind=self.engine)
+        self.db = Session(self.engine)
+        self.directory = str(tmp_path / "columnar")
+        self.snapshot = SalesSnapshot(self.directory, settle_seconds=60, chunk_size=50, engine=self.engine)
+        self.products = [models.Product(name=f"P{n}", category=f"C{n % 3}", price=Decimal("1.00")) for n in range(6)]
+        self.db.add_all(self.products)
+        self.db.commit()
+        self.random = random.Random(7)
+        yield
+        self.db.close()
+
+    def _add_sales(self, count, ago=timedelta(minutes=10)):
+        created_at = datetime.now() - ago
+        first = date(2022, 12, 20)
+        self.db.add_all(
+            models.Sale(
+                product_id=self.random.choice(self.products).id,
+                quantity=1,
+                total_amount=Decimal(self.random.randint(1, 99999)) / 100,
+                sale_date=first + timedelta(days=self.random.randint(0, 800)),
+                created_at=created_at,
+            )
+            for _ in range(count)
+        )
+        self.db.commit()
+        RevenueRollupService(self.db).rebuild()
+
+    def test_matches_sql(self):
+        self._add_sales(400)
+
+        assert SaleService(self.db).check_columnar_snapshot(self.snapshot) == []
+        assert self.snapshot.stats()["rows"] == 400
+
+    def test_date_range_and_unknown_category(self):
+        self._add_sales(200)
+        service = SaleService(self.db)
+
+        args = ("month", date(2023, 3, 15), date(2023, 9, 1))
+        assert self.snapshot.revenue_by_period(*args) == sorted(
+            service._sql_revenue_by_period(*args), key=lambda r: (r["year"], r["month"])
+        )
+        assert self.snapshot.revenue_comparison("week", "Nope", 3, None, None) == []
+
+    def test_appends_new_sales_and_holds_back_recent_ones(self):
+        self._add_sales(100)
+        self.snapshot.columns()
+
+        self._add_sales(30)
+        self._add_sales(5, ago=timedelta(0))
+        (columns, tail), _ = self.snapshot.columns()
+
+        assert (len(columns["sale_date"]), len(tail["sale_date"])) == (130, 5)
+        assert self.snapshot.stats() == {"rows": 130, "last_id": 130, "unsettled_rows": 5, "categories": 3}
+        assert SaleService(self.db).check_columnar_snapshot(self.snapshot) == []
+
+    def test_reopened_snapshot_maps_written_rows(self):
+        self._add_sales(120)
+        self.snapshot.columns()
+
+        reopened = SalesSnapshot(self.directory, settle_seconds=60, engine=self.engine)
+        (columns, _), codes = reopened.columns()
+
+        expected = self.db.scalar(select(func.sum(models.Sale.total_amount)))
+        assert int(columns["total_cents"].sum()) == round(expected * 100)
+        assert isinstance(columns["sale_date"], np.memmap)
+        assert sorted(codes) == ["C0", "C1", "C2"]
+
+    def test_rebuilds_after_sales_are_deleted(self):
+        self._add_sales(50)
+        self.snapshot.columns()
+
+        self.db.execute(delete(models.Sale))
+        self.db.commit()
+        self._add_sales(10)
+
+        assert len(self.snapshot.columns()[0][0]["sale_date"]) == 10
+
+    def test_category_rename_rebuilds(self, monkeypatch):
+        self._add_sales(60)
+        monkeypatch.setattr(columnar, "sales_snapshot", self.snapshot)
+        self.snapshot.columns()
+
+        self.products[0].category = "Renamed"
+        self.db.commit()
+
+        assert SaleService(self.db).check_columnar_snapshot(self.snapshot) == []
+        assert self.snapshot.stats()["categories"] == 4
+
+    def test_revenue_endpoints_use_snapshot(self, monkeypatch):
+        self._add_sales(100)
+        monkeypatch.setattr(columnar, "sales_snapshot", self.snapshot)
+        service = SaleService(self.db)
+
+        results = service.get_revenue_comparison("month", "C1", 4)
+
+        assert self.snapshot.stats()["rows"] == 100
+        assert results == service._sql_revenue_comparison("month", "C1", 4, None, None)
+
+    def test_reads_sales_from_its_engine_whatever_the_session(self, tmp_path, monkeypatch):
+        self._add_sales(100)
+        self.snapshot.columns()
+        lagging = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+        Base.metadata.create_all(bind=lagging)
+        monkeypatch.setattr(columnar, "sales_snapshot", self.snapshot)
+
+        with Session(lagging) as replica:
+            results = SaleService(replica).get_revenue_by_period("year")
+
+        assert results == sorted(
+            SaleService(self.db)._sql_revenue_by_period("year", None, None), key=lambda r: r["year"]
+        )
+        assert self.snapshot.stats()["rows"] == 100
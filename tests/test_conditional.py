@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import count
+
+import pytest
+from sqlalchemy import event, update
+
+from app import models
+from app.conditional import watermark_etag
+from tests.conftest import engine
+
+
+class TestConditionalLists:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+        self.product = models.Product(name="Conditional", category="Conditional", price=Decimal("3.00"))
+        self.db.add(self.product)
+        self.db.flush()
+        self.db.add(models.Inventory(product_id=self.product.id, stock=4))
+        self.db.commit()
+        self.settled = count()
+        self._settle()
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._capture)
+        yield
+        event.remove(engine, "before_cursor_execute", self._capture)
+
+    def _settle(self):
+        # Rows written in the current second get no ETag, so move every timestamp into the past,
+        # a second later each time so an update still moves the watermark.
+        past = datetime.now() - timedelta(minutes=10) + timedelta(seconds=next(self.settled))
+        self.db.execute(update(models.Product).values(updated_at=past))
+        self.db.execute(update(models.Inventory).values(last_updated=past))
+        self.db.commit()
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @pytest.mark.parametrize("path", ["/api/products/", "/api/inventory/", "/api/inventory/low-stock"])
+    def test_matching_etag_gets_304_without_loading_rows(self, path):
+        response = self.client.get(path)
+        etag = response.headers["ETag"]
+        assert etag.startswith('W/"')
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+        self.statements.clear()
+        response = self.client.get(path, headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        # Only the watermark aggregate ran.
+        assert len(self.statements) == 1
+        assert "max(" in self.statements[0]
+
+    @pytest.mark.parametrize("header", ["*", 'W/"other", {etag}', "{strong}"])
+    def test_if_none_match_forms(self, header):
+        etag = self.client.get("/api/products/").headers["ETag"]
+        header = header.format(etag=etag, strong=etag.removeprefix("W/"))
+
+        assert self.client.get("/api/products/", headers={"If-None-Match": header}).status_code == 304
+
+    def test_stale_etag_gets_full_response(self):
+        response = self.client.get("/api/products/", headers={"If-None-Match": 'W/"stale"'})
+
+        assert response.status_code == 200
+        assert response.json()
+
+    def test_query_string_is_part_of_the_etag(self):
+        first = self.client.get("/api/products/", params={"limit": 1}).headers["ETag"]
+        second = self.client.get("/api/products/", params={"limit": 2}).headers["ETag"]
+
+        assert first != second
+
+    @pytest.mark.parametrize("change", ["update", "insert", "delete"])
+    def test_changes_invalidate_the_etag(self, change):
+        etag = self.client.get("/api/products/").headers["ETag"]
+
+        if change == "update":
+            self.product.price = Decimal("3.50")
+            self.db.commit()
+            response = self.client.get("/api/products/", headers={"If-None-Match": etag})
+            # Changed within the current second: served in full, without a tag that could go stale.
+            assert response.status_code == 200
+            assert "ETag" not in response.headers
+        elif change == "insert":
+            self.client.post("/api/products/", json={"name": "New", "category": "Conditional", "price": "1.00"})
+        else:
+            self.db.delete(self.db.get(models.Inventory, self.product.inventory.id))
+            self.db.delete(self.product)
+            self.db.commit()
+        self._settle()
+
+        response = self.client.get("/api/products/", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_inventory_update_invalidates_inventory_etag(self):
+        etag = self.client.get("/api/inventory/").headers["ETag"]
+
+        self.client.put(f"/api/inventory/{self.product.id}", json={"stock": 9})
+        self._settle()
+
+        assert self.client.get("/api/inventory/", headers={"If-None-Match": etag}).status_code == 200
+
+
+class TestWatermarkEtag:
+    def test_unsettled_watermark_has_no_etag(self):
+        assert watermark_etag((3, 7, datetime(2024, 1, 1), True)) is None
+
+    def test_tag_depends_on_every_component(self):
+        base = (3, 7, datetime(2024, 1, 1), False)
+        tags = {
+            watermark_etag(base),
+            watermark_etag((4, 7, datetime(2024, 1, 1), False)),
+            watermark_etag((3, 8, datetime(2024, 1, 1), False)),
+            watermark_etag((3, 7, datetime(2024, 1, 2), False)),
+            watermark_etag(base, "limit=5"),
+        }
+
+        assert len(tags) == 5
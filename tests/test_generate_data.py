@@ -0,0 +1,70 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, func, select
+
+from app.database import Base
+from app.models import DailyRevenue, Inventory, InventoryLog, Sale
+from scripts.generate_data import GeneratorOptions, generate
+
+
+class TestGenerateData:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.tmp_path = tmp_path
+
+    def _generate(self, name, workers=1):
+        url = f"sqlite:///{self.tmp_path / name}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        options = GeneratorOptions(
+            database_url=url,
+            seed=3,
+            products=8,
+            categories=3,
+            years=0.1,
+            end_date=date(2024, 6, 30),
+            sales_per_day=60,
+            popularity_skew=1.0,
+            restock_days=5,
+            chunk_size=100,
+        )
+        summary = generate(options, workers=workers)
+        return engine, summary
+
+    def _rows(self, engine):
+        with engine.connect() as connection:
+            sales = connection.execute(
+                select(Sale.product_id, Sale.quantity, Sale.sale_date, Sale.total_amount).order_by(
+                    Sale.product_id, Sale.sale_date, Sale.quantity
+                )
+            ).all()
+            logs = connection.execute(
+                select(
+                    InventoryLog.product_id, InventoryLog.change, InventoryLog.reason, InventoryLog.changed_at
+                ).order_by(InventoryLog.product_id, InventoryLog.changed_at, InventoryLog.change)
+            ).all()
+        return sales, logs
+
+    def test_inventory_matches_logs(self):
+        engine, summary = self._generate("data.db")
+
+        with engine.connect() as connection:
+            stock = dict(connection.execute(select(Inventory.product_id, Inventory.stock)).all())
+            logged = dict(
+                connection.execute(
+                    select(InventoryLog.product_id, func.sum(InventoryLog.change)).group_by(InventoryLog.product_id)
+                ).all()
+            )
+            sold = connection.scalar(select(func.count(Sale.id)))
+            rolled_up = connection.scalar(select(func.sum(DailyRevenue.sale_count)))
+
+        assert summary["sales"] == sold == rolled_up > 0
+        assert stock == logged
+        assert min(stock.values()) >= 0
+
+    def test_deterministic_across_workers(self, monkeypatch):
+        single, _ = self._generate("single.db")
+        monkeypatch.setattr("scripts.generate_data.PRODUCTS_PER_TASK", 3)
+        parallel, _ = self._generate("parallel.db", workers=2)
+        assert self._rows(single) == self._rows(parallel)
@@ -0,0 +1,98 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from loguru import logger
+from sqlalchemy import select, text
+
+from app import instrumentation
+from app.instrumentation import (
+    QueryInstrumentationMiddleware,
+    fingerprint,
+    instrument_engines,
+)
+from app.models import Product
+from tests.conftest import engine
+
+
+class TestFingerprint:
+    def test_normalizes_values(self):
+        assert fingerprint("SELECT * FROM products WHERE id = 5 AND name = 'it''s'\n  LIMIT 10") == (
+            "SELECT * FROM products WHERE id = ? AND name = ? LIMIT ?"
+        )
+
+    def test_placeholders_and_in_lists(self):
+        assert fingerprint("SELECT a FROM t WHERE b IN (?, ?, ?) AND c = %(c_1)s") == fingerprint(
+            "SELECT a FROM t WHERE b IN (%s) AND c = :c"
+        )
+
+    def test_keeps_identifiers(self):
+        assert fingerprint("SELECT t1.col_2 FROM table_3 AS t1") == "SELECT t1.col_2 FROM table_3 AS t1"
+
+
+class TestQueryInstrumentation:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+        self.messages = []
+        sink = logger.add(lambda message: self.messages.append(message.record), level="DEBUG")
+        yield
+        logger.remove(sink)
+
+    def _app(self, queries):
+        instrument_engines()
+        application = FastAPI()
+        application.add_middleware(QueryInstrumentationMiddleware, repeated_threshold=3)
+
+        @application.get("/run")
+        def run():
+            with engine.connect() as connection:
+                for i in range(queries):
+                    connection.execute(text("SELECT :value"), {"value": i})
+            return {}
+
+        return TestClient(application)
+
+    def _warnings(self):
+        return [record for record in self.messages if record["level"].name == "WARNING"]
+
+    def test_server_timing_header(self):
+        product = Product(name="Timed", category="Test", price=1)
+        self.db.add(product)
+        self.db.commit()
+
+        response = self.client.get(f"/api/products/{product.id}")
+
+        assert response.status_code == 200
+        assert response.headers["Server-Timing"].startswith("db;dur=")
+        assert 'desc="1 queries"' in response.headers["Server-Timing"]
+
+    def test_request_summary_is_logged(self):
+        self._app(2).get("/run")
+
+        (summary,) = [record for record in self.messages if record["extra"].get("request") == "GET /run"]
+        assert summary["extra"]["queries"] == 2
+        assert summary["extra"]["status_code"] == 200
+        assert summary["extra"]["slowest_sql"] == "SELECT ?"
+
+    def test_repeated_queries_warn(self):
+        self._app(2).get("/run")
+        assert self._warnings() == []
+
+        self._app(3).get("/run")
+        (warning,) = self._warnings()
+        assert warning["extra"]["repeated_sql"] == "SELECT ?"
+        assert warning["extra"]["repeated_count"] == 3
+
+    def test_slow_queries_warn(self, monkeypatch):
+        monkeypatch.setattr(instrumentation, "SQL_SLOW_QUERY_MS", 0)
+
+        self.db.execute(select(Product.id)).all()
+
+        assert any(record["extra"].get("sql", "").startswith("SELECT products.id") for record in self._warnings())
+
+    def test_statements_outside_requests_are_not_recorded(self):
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+        assert instrumentation.current_request_queries() is None
@@ -0,0 +1,125 @@
+import time
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.metrics import (
+    POOL_METRICS,
+    UNMATCHED_ROUTE,
+    MetricsMiddleware,
+    RequestMetrics,
+    render_stats,
+    request_metrics,
+    track_in_flight,
+)
+from app.models import Product
+
+
+class TestRequestMetrics:
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = RequestMetrics(buckets=(0.1, 1.0))
+        for duration in (0.05, 0.1, 0.5, 3.0):
+            metrics.start("GET", "/items")
+            metrics.observe("GET", "/items", "200", duration, in_flight=True)
+
+        lines = list(metrics.render())
+
+        labels = 'method="GET",route="/items",status="200"'
+        assert f'http_request_duration_seconds_bucket{{{labels},le="0.1"}} 2' in lines
+        assert f'http_request_duration_seconds_bucket{{{labels},le="1.0"}} 3' in lines
+        assert f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4' in lines
+        assert f"http_request_duration_seconds_count{{{labels}}} 4" in lines
+        assert 'http_requests_in_flight{method="GET",route="/items"} 0' in lines
+
+    def test_errors_are_recorded_as_500(self):
+        metrics = RequestMetrics()
+        application = FastAPI(dependencies=[Depends(track_in_flight)])
+        application.add_middleware(MetricsMiddleware, metrics=metrics)
+
+        @application.get("/boom")
+        def boom():
+            raise RuntimeError("boom")
+
+        TestClient(application, raise_server_exceptions=False).get("/boom")
+
+        assert any('route="/boom",status="500"' in line for line in metrics.render())
+        assert metrics.in_flight() == {("GET", "/boom"): 0}
+
+    def test_in_flight_per_route(self):
+        metrics = RequestMetrics()
+        application = FastAPI(dependencies=[Depends(track_in_flight)])
+        application.add_middleware(MetricsMiddleware, metrics=metrics)
+
+        @application.get("/items/{item_id}")
+        def item(item_id: int):
+            return [[method, route, count] for (method, route), count in metrics.in_flight().items()]
+
+        @application.post("/items")
+        def create_item():
+            return item(0)
+
+        client = TestClient(application)
+        assert client.get("/items/1").json() == [["GET", "/items/{item_id}", 1]]
+        assert client.post("/items").json() == [["GET", "/items/{item_id}", 0], ["POST", "/items", 1]]
+        client.get("/missing")
+
+        assert metrics.in_flight() == {("GET", "/items/{item_id}"): 0, ("POST", "/items"): 0}
+
+    def test_observe_overhead_is_microseconds(self):
+        metrics = RequestMetrics()
+        requests = 20000
+        start = time.perf_counter()
+        for i in range(requests):
+            metrics.start("GET", f"/route/{i % 20}")
+            metrics.observe("GET", f"/route/{i % 20}", "200", 0.003, in_flight=True)
+        # About 2us here; the bound only guards against accidental O(n) work per request.
+        assert (time.perf_counter() - start) / requests < 50e-6
+
+
+class TestMetricsEndpoint:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+        request_metrics.clear()
+
+    def test_route_histograms(self):
+        product = Product(name="Measured", category="Test", price=1)
+        self.db.add(product)
+        self.db.commit()
+        self.client.get(f"/api/products/{product.id}")
+        self.client.get("/api/products/999999")
+        self.client.get("/no-such-path")
+
+        response = self.client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        route = 'method="GET",route="/api/products/{product_id}"'
+        assert f'http_request_duration_seconds_count{{{route},status="200"}} 1' in body
+        assert f'http_request_duration_seconds_count{{{route},status="404"}} 1' in body
+        assert f'route="{UNMATCHED_ROUTE}",status="404"' in body
+        # The scrape itself is still in flight while it renders.
+        assert 'http_requests_in_flight{method="GET",route="/metrics"} 1' in body
+        assert f"http_requests_in_flight{{{route}}} 0" in body
+        assert f'http_requests_in_flight{{method="GET",route="{UNMATCHED_ROUTE}"}}' not in body
+
+    def test_pool_and_cache_metrics(self):
+        body = self.client.get("/metrics").text
+
+        assert "# TYPE cache_hits_total counter" in body
+        assert 'cache_hits_total{cache="product"}' in body
+
+    def test_render_stats(self):
+        stats = {"sync": {"pool_class": "InstrumentedQueuePool", "checked_out": 2, "wait_time_total_ms": 1500.0}}
+
+        lines = list(render_stats(POOL_METRICS, "engine", stats))
+
+        assert 'db_pool_checked_out{engine="sync"} 2' in lines
+        assert 'db_pool_checkout_wait_seconds_total{engine="sync"} 1.5' in lines
+        assert not any(line.startswith("db_pool_size") for line in lines)
+
+    def test_hidden_from_openapi(self):
+        assert "/metrics" not in self.client.get("/openapi.json").json()["paths"]
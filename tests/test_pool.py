@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.pool import InstrumentedQueuePool, pool_status, warm_up_pool
+
+
+class TestInstrumentedPool:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=InstrumentedQueuePool,
+            pool_size=2,
+            max_overflow=1,
+            pool_timeout=0.05,
+        )
+        yield
+        self.engine.dispose()
+
+    def test_warm_up_opens_min_connections(self):
+        assert warm_up_pool(self.engine, 2) == 2
+
+        status = pool_status(self.engine)
+        assert status["checked_in"] == 2
+        assert status["checked_out"] == 0
+
+    def test_checkout_stats_and_timeouts(self):
+        connections = [self.engine.connect() for _ in range(3)]
+        status = pool_status(self.engine)
+        assert status["checked_out"] == 3
+        assert status["overflow"] == 1
+
+        with pytest.raises(exc.TimeoutError):
+            self.engine.connect()
+
+        for connection in connections:
+            connection.close()
+
+        status = pool_status(self.engine)
+        assert status["checkouts"] == 3
+        assert status["checkout_timeouts"] == 1
+        assert status["wait_time_max_ms"] >= 50
+
+    def test_stats_survive_dispose(self):
+        self.engine.connect().close()
+        self.engine.dispose()
+        assert pool_status(self.engine)["checkouts"] == 1
+
+
+def test_pool_endpoint(client):
+    response = client.get("/api/system/pool")
+    assert response.status_code == 200
+    assert "pool_class" in response.json()["sync"]
@@ -0,0 +1,163 @@
+"""Runs every service query under EXPLAIN and fails when one falls back to a full table scan.
+
+Plans are checked on in-memory SQLite by default. Set ``QUERY_PLAN_DATABASE_URL`` to a scratch
+MySQL database (its tables are created and dropped) to check MySQL's plans the same way.
+"""
+
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import schemas
+from app.database import Base
+from app.models import Inventory, InventoryLog, Product, Sale
+from app.pagination import encode_cursor
+from app.services import (
+    ChangeFeedService,
+    InventoryService,
+    ProductService,
+    RevenueRollupService,
+    SaleService,
+)
+
+QUERY_PLAN_DATABASE_URL = os.getenv("QUERY_PLAN_DATABASE_URL", "sqlite://")
+
+SALE_DATE = date(2024, 3, 15)
+
+# Queries that read a whole table or index on purpose, with the reason.
+ALLOWED_FULL_SCANS = {
+    "get_products": "first page walks the primary key in order and stops at LIMIT",
+    "get_all_inventory": "returns every row",
+    "get_filtered_sales": "unfiltered first page walks ix_sales_sale_date in order and stops at LIMIT",
+    "get_revenue_by_period": "reports over the whole daily rollup, which has one row per day",
+    "rebuild": "recomputes the rollups from every sale",
+}
+
+CASES = {
+    "get_product": lambda db, p: ProductService(db).get_product(p),
+    "get_products": lambda db, p: ProductService(db).get_products(limit=10),
+    "get_products_cursor": lambda db, p: ProductService(db).get_products(limit=10, cursor=encode_cursor(p)),
+    "get_inventory": lambda db, p: InventoryService(db).get_inventory(p),
+    "get_all_inventory": lambda db, p: InventoryService(db).get_all_inventory(),
+    "get_low_stock": lambda db, p: InventoryService(db).get_low_stock(5),
+    "update_inventory_stock": lambda db, p: InventoryService(db).update_inventory_stock(p, 500),
+    "get_logs": lambda db, p: InventoryService(db).get_logs(p, limit=10),
+    "get_logs_cursor": lambda db, p: InventoryService(db).get_logs(
+        p, limit=10, cursor=encode_cursor(datetime(2030, 1, 1), 10**6)
+    ),
+    "create_sale": lambda db, p: SaleService(db).create_sale(
+        schemas.SaleCreate(product_id=p, quantity=1, sale_date=SALE_DATE)
+    ),
+    "create_sale_rejected": lambda db, p: _rejected(
+        lambda: SaleService(db).create_sale(schemas.SaleCreate(product_id=p, quantity=10**6, sale_date=SALE_DATE))
+    ),
+    "create_sales_bulk": lambda db, p: SaleService(db).create_sales_bulk(
+        [(0, schemas.SaleCreate(product_id=p, quantity=1, sale_date=SALE_DATE))]
+    ),
+    "get_filtered_sales": lambda db, p: SaleService(db).get_filtered_sales(limit=10),
+    "get_filtered_sales_product": lambda db, p: SaleService(db).get_filtered_sales(product_id=p, limit=10),
+    "get_filtered_sales_category": lambda db, p: SaleService(db).get_filtered_sales(category="Plans", limit=10),
+    "get_filtered_sales_dates": lambda db, p: SaleService(db).get_filtered_sales(
+        start_date=SALE_DATE, end_date=SALE_DATE, limit=10
+    ),
+    "get_filtered_sales_cursor": lambda db, p: SaleService(db).get_filtered_sales(
+        limit=10, cursor=encode_cursor(SALE_DATE, 10**6)
+    ),
+    "export_sales_product": lambda db, p: list(SaleService(db).export_sales("csv", product_id=p)),
+    "get_revenue_by_period": lambda db, p: SaleService(db).get_revenue_by_period("month"),
+    "get_revenue_by_period_dates": lambda db, p: SaleService(db).get_revenue_by_period(
+        "month", start_date=SALE_DATE, end_date=SALE_DATE
+    ),
+    "get_revenue_comparison": lambda db, p: SaleService(db).get_revenue_comparison("month"),
+    "get_revenue_comparison_category": lambda db, p: SaleService(db).get_revenue_comparison("week", "Plans"),
+    "get_changes": lambda db, p: ChangeFeedService(db).get_changes(limit=10),
+    "get_changes_cursor": lambda db, p: ChangeFeedService(db).get_changes(
+        encode_cursor(datetime(2024, 1, 1), p, datetime(2024, 1, 1), 1, 10, 10), limit=10
+    ),
+    "rebuild": lambda db, p: RevenueRollupService(db).rebuild(),
+    "rebuild_dates": lambda db, p: RevenueRollupService(db).rebuild(start_date=SALE_DATE, end_date=SALE_DATE),
+}
+
+
+def _rejected(call):
+    with pytest.raises(HTTPException):
+        call()
+
+
+def _explainable(statement: str) -> bool:
+    statement = statement.lstrip().upper()
+    if statement.startswith("INSERT"):
+        return " SELECT " in statement
+    return statement.startswith(("SELECT", "UPDATE", "DELETE"))
+
+
+def _full_scans(connection, statement: str, parameters) -> list[str]:
+    """Returns the plan steps that read a whole table or index."""
+    if connection.dialect.name == "sqlite":
+        details = [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        return [d for d in details if d.startswith("SCAN ") and not d.startswith("SCAN CONSTANT ROW")]
+
+    rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings()
+    return [f"{row['table']}: type={row['type']}" for row in rows if row["type"] in ("ALL", "index")]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    engine = create_engine(QUERY_PLAN_DATABASE_URL)
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+class TestQueryPlans:
+    @pytest.fixture(autouse=True)
+    def setup(self, engine):
+        self.engine = engine
+        self.db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+        product = Product(name="Plan Product", category="Plans", price=2.00)
+        self.db.add(product)
+        self.db.commit()
+        self.db.add_all(
+            [
+                Inventory(product_id=product.id, stock=100),
+                InventoryLog(product_id=product.id, change=100, reason="initial stock"),
+                # Enough history for the revenue comparison to take its bounded path.
+                *(
+                    Sale(product_id=product.id, quantity=1, sale_date=SALE_DATE - timedelta(days=days), total_amount=2)
+                    for days in range(0, 120, 3)
+                ),
+            ]
+        )
+        self.db.commit()
+        self.product_id = product.id
+        RevenueRollupService(self.db).rebuild()
+        yield
+        self.db.close()
+
+    @pytest.mark.parametrize("name", CASES)
+    def test_no_full_scans(self, name):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if not executemany and _explainable(statement):
+                statements.append((statement, parameters))
+
+        event.listen(self.engine, "before_cursor_execute", capture)
+        try:
+            CASES[name](self.db, self.product_id)
+        finally:
+            event.remove(self.engine, "before_cursor_execute", capture)
+
+        assert statements, f"{name} ran no queries"
+        with self.engine.connect() as connection:
+            scans = {statement: _full_scans(connection, statement, parameters) for statement, parameters in statements}
+        scans = {statement: steps for statement, steps in scans.items() if steps}
+
+        if name not in ALLOWED_FULL_SCANS:
+            assert not scans, f"{name} has full scans: {scans}"
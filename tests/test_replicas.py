@@ -0,0 +1,153 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import database, main, models
+from app.database import Base, get_db
+from app.replicas import READ_YOUR_WRITES_COOKIE, ReplicaSet
+from app.services import ProductService, SaleService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestReplicaSet:
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.clock = FakeClock()
+        self.live = [create_engine(f"sqlite:///{tmp_path / f'replica{n}.db'}") for n in range(2)]
+        self.dead = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+
+    def _bind(self, replicas):
+        session = replicas.open_session()
+        try:
+            return session and session.get_bind()
+        finally:
+            if session is not None:
+                session.close()
+
+    def test_round_robin(self):
+        replicas = ReplicaSet(self.live, retry_interval=30, clock=self.clock)
+
+        assert [self._bind(replicas) for _ in range(4)] == self.live * 2
+        assert [r["reads"] for r in replicas.stats()["replicas"]] == [2, 2]
+
+    def test_unreachable_replica_is_skipped_until_retry(self):
+        replicas = ReplicaSet([self.dead, self.live[0]], retry_interval=30, clock=self.clock)
+
+        assert [self._bind(replicas) for _ in range(3)] == [self.live[0]] * 3
+        assert replicas.stats()["replicas"][0] == {
+            "url": str(self.dead.url),
+            "healthy": False,
+            "reads": 0,
+            "failures": 1,
+        }
+
+        self.clock.now += 31
+        assert [self._bind(replicas) for _ in range(2)] == [self.live[0]] * 2  # retried once, still down
+        assert replicas.stats()["replicas"][0]["failures"] == 2
+
+    def test_no_reachable_replica(self):
+        replicas = ReplicaSet([self.dead], retry_interval=30, clock=self.clock)
+
+        assert replicas.open_session() is None
+        assert replicas.open_session() is None
+        assert replicas.stats()["replicas"][0]["failures"] == 1  # not retried while marked down
+        assert replicas.stats()["primary_fallbacks"] == 2
+
+
+class TestReadRouting:
+    """A primary and a replica as two SQLite files, deliberately out of sync so each read shows its source."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path, monkeypatch):
+        engines = {}
+        for name in ("primary", "replica"):
+            engines[name] = create_engine(
+                f"sqlite:///{tmp_path / f'{name}.db'}", connect_args={"check_same_thread": False}
+            )
+            Base.metadata.create_all(bind=engines[name])
+            with sessionmaker(bind=engines[name])() as db:
+                db.add(models.Product(name=f"On {name}", category="Replicated", price=Decimal("1.00")))
+                db.commit()
+        self.replica = engines["replica"]
+        self.dead = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        self.monkeypatch = monkeypatch
+        self._use_replicas([self.replica])
+
+        def primary_db():
+            db = sessionmaker(autocommit=False, autoflush=False, bind=engines["primary"])()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        application = main.get_application(async_mode=False)
+        application.dependency_overrides[get_db] = primary_db
+        with TestClient(application) as client:
+            self.client = client
+            yield
+
+    def _use_replicas(self, engines):
+        self.monkeypatch.setattr(database, "read_replicas", ReplicaSet(engines, retry_interval=30))
+
+    def _product_names(self):
+        response = self.client.get("/api/products/", params={"category": "Replicated"})
+        assert response.status_code == 200
+        return [product["name"] for product in response.json()]
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        assert self._product_names() == ["On replica"]
+
+        response = self.client.post("/api/products/", json={"name": "New", "category": "Replicated", "price": 2})
+        assert response.status_code == 200
+
+        self.client.cookies.clear()
+        assert self._product_names() == ["On replica"]
+        assert database.read_replicas.stats()["replicas"][0]["reads"] == 2
+
+    def test_client_reads_its_own_writes_from_primary(self):
+        response = self.client.post("/api/products/", json={"name": "New", "category": "Replicated", "price": 2})
+
+        assert READ_YOUR_WRITES_COOKIE in response.cookies
+        assert self._product_names() == ["On primary", "New"]
+
+    def test_failed_write_sets_no_cookie(self):
+        response = self.client.post("/api/inventory/", json={"product_id": 999, "stock": 1})
+
+        assert response.status_code == 404
+        assert READ_YOUR_WRITES_COOKIE not in response.cookies
+        assert self._product_names() == ["On replica"]
+
+    def test_falls_back_to_primary_when_replica_is_down(self):
+        self._use_replicas([self.dead])
+
+        assert self._product_names() == ["On primary"]
+        assert self.client.get("/api/system/replicas").json()["primary_fallbacks"] == 1
+
+    def test_analytics_read_from_replica(self):
+        with sessionmaker(bind=self.replica)() as db:
+            db.add(models.Sale(product_id=1, quantity=3, total_amount=Decimal("3.00"), sale_date=date(2024, 9, 1)))
+            db.commit()
+
+        response = self.client.get("/api/sales/", params={"product_id": 1})
+
+        assert [sale["quantity"] for sale in response.json()] == [3]
+
+    def test_replica_results_are_not_cached(self):
+        response = self.client.get("/api/sales/revenue", params={"period": "day"})
+        with database.read_replicas.open_session() as db:
+            ProductService(db).get_product(1)
+
+        assert response.status_code == 200
+        assert SaleService.analytics_cache.stats()["size"] == 0
+        assert ProductService.cache.get(1) is None
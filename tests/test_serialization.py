@@ -0,0 +1,147 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from pydantic import TypeAdapter
+from sqlalchemy import event
+
+from app import models, schemas, serialization
+from app.serialization import dumps
+from tests.conftest import engine
+
+
+class TestDumps:
+    @pytest.mark.parametrize("fast", [True, False], ids=["orjson", "stdlib"])
+    def test_matches_pydantic_formats(self, fast, monkeypatch):
+        if not fast:
+            monkeypatch.setattr(serialization, "orjson", None)
+        elif serialization.orjson is None:
+            pytest.skip("orjson is not installed")
+        values = [
+            Decimal("19.90"),
+            date(2024, 2, 29),
+            datetime(2024, 2, 29, 13, 5, 1, 250),
+            datetime(2024, 2, 29, 13, 5, 1, tzinfo=timezone.utc),
+            "naïve",
+        ]
+        adapter = TypeAdapter(tuple[Decimal, date, datetime, datetime, str])
+
+        assert json.loads(dumps(values)) == json.loads(adapter.dump_json(tuple(values)))
+
+
+class TestListEndpoints:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+        self.products = [
+            models.Product(name=f"Product {i}", category="Fast", price=Decimal("10.50") + i, description=None)
+            for i in range(3)
+        ]
+        self.db.add_all(self.products)
+        self.db.flush()
+        self.db.add_all(models.Inventory(product_id=p.id, stock=10 * i) for i, p in enumerate(self.products))
+        self.db.add_all(
+            models.Sale(product_id=p.id, quantity=2, sale_date=date(2024, 5, i + 1), total_amount=p.price * 2)
+            for i, p in enumerate(self.products)
+        )
+        self.db.commit()
+
+    def _expected(self, schema, rows):
+        return [schema.model_validate(row).model_dump(mode="json") for row in rows]
+
+    def _assert_same(self, response, expected):
+        assert response.status_code == 200
+        body = response.json()
+        # Same keys in the same order as the pydantic output, not just equal dicts.
+        assert [list(item.items()) for item in body] == [list(item.items()) for item in expected]
+
+    def test_products(self):
+        products = self.db.query(models.Product).order_by(models.Product.id).limit(2).all()
+
+        response = self.client.get("/api/products/", params={"limit": 2})
+
+        self._assert_same(response, self._expected(schemas.Product, products))
+        assert "X-Next-Cursor" in response.headers
+
+    def test_inventory(self):
+        expected = self._expected(schemas.Inventory, self.db.query(models.Inventory).all())
+
+        self._assert_same(self.client.get("/api/inventory/"), expected)
+
+    def test_sales(self):
+        sales = (
+            self.db.query(models.Sale)
+            .join(models.Product)
+            .filter(models.Product.category == "Fast")
+            .order_by(models.Sale.sale_date.desc(), models.Sale.id.desc())
+            .all()
+        )
+
+        response = self.client.get("/api/sales/", params={"category": "Fast"})
+
+        self._assert_same(response, self._expected(schemas.Sale, sales))
+
+    def test_openapi_schema_unchanged(self):
+        paths = self.client.get("/openapi.json").json()["paths"]
+
+        for path, schema in (("/api/products/", "Product"), ("/api/inventory/", "Inventory"), ("/api/sales/", "Sale")):
+            response_schema = paths[path]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+            assert response_schema["items"]["$ref"] == f"#/components/schemas/{schema}"
+
+
+class TestSparseFields:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, test_db):
+        self.client = client
+        self.db = test_db
+        self.product = models.Product(name="Sparse", category="Sparse", price=Decimal("5.00"), description="x" * 2000)
+        self.db.add(self.product)
+        self.db.flush()
+        self.db.add(models.Inventory(product_id=self.product.id, stock=3))
+        self.db.add_all(
+            models.Sale(product_id=self.product.id, quantity=1, sale_date=date(2024, 6, day), total_amount=5)
+            for day in (1, 2, 3)
+        )
+        self.db.commit()
+        self.statements = []
+        event.listen(engine, "before_cursor_execute", self._capture)
+        yield
+        event.remove(engine, "before_cursor_execute", self._capture)
+
+    def _capture(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def test_products_select_only_requested_columns(self):
+        response = self.client.get("/api/products/", params={"fields": "price,name", "limit": 1000})
+
+        assert response.status_code == 200
+        # Schema order, whatever the order asked for.
+        assert all(list(item) == ["name", "price"] for item in response.json())
+        assert "description" not in self.statements[-1]
+
+    def test_pagination_keys_are_selected_but_not_returned(self):
+        params = {"product_id": self.product.id, "fields": "quantity", "limit": 2}
+        response = self.client.get("/api/sales/", params=params)
+
+        assert response.json() == [{"quantity": 1}, {"quantity": 1}]
+        cursor = response.headers["X-Next-Cursor"]
+        response = self.client.get("/api/sales/", params={**params, "cursor": cursor})
+        assert response.json() == [{"quantity": 1}]
+
+    def test_inventory_and_logs(self):
+        self.client.put(f"/api/inventory/{self.product.id}", json={"stock": 1})
+
+        inventory = self.client.get("/api/inventory/low-stock", params={"threshold": 2, "fields": "product_id,stock"})
+        logs = self.client.get(f"/api/inventory/{self.product.id}/logs", params={"fields": "change"})
+
+        assert {"product_id": self.product.id, "stock": 1} in inventory.json()
+        assert logs.json() == [{"change": -2}]
+
+    @pytest.mark.parametrize("fields", ["name,stock", "", " , "])
+    def test_unknown_fields_are_rejected(self, fields):
+        response = self.client.get("/api/products/", params={"fields": fields})
+
+        assert response.status_code == 400
+        assert "Available: name, category, price" in response.json()["detail"]
@@ -0,0 +1,241 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event, func, select, update
+from sqlalchemy.orm import sessionmaker
+
+from app import schemas
+from app.database import Base
+from app.models import DailyCategoryRevenue, DailyRevenue, Inventory, Product, Sale
+from app.services import ProductService, SaleCategoryService, SaleService
+
+
+class TestConcurrentSales:
+    STOCK = 40
+    WORKERS = 16
+    ATTEMPTS_PER_WORKER = 8
+
+    @pytest.fixture(autouse=True)
+    def setup(self, tmp_path):
+        self.engine = create_engine(f"sqlite:///{tmp_path / 'concurrency.db'}", connect_args={"timeout": 30})
+        Base.metadata.create_all(bind=self.engine)
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+
+        with self.SessionLocal() as db:
+            product = Product(name="Hot SKU", category="Contended", price=3.00)
+            db.add(product)
+            db.commit()
+            db.add(Inventory(product_id=product.id, stock=self.STOCK))
+            db.commit()
+            self.product_id = product.id
+        yield
+        self.engine.dispose()
+
+    def _sell_repeatedly(self, _):
+        outcomes = []
+        for _ in range(self.ATTEMPTS_PER_WORKER):
+            with self.SessionLocal() as db:
+                try:
+                    SaleService(db).create_sale(
+                        schemas.SaleCreate(product_id=self.product_id, quantity=1, sale_date=date(2024, 1, 1))
+                    )
+                    outcomes.append(200)
+                except HTTPException as error:
+                    outcomes.append(error.status_code)
+        return outcomes
+
+    def test_no_oversell_under_contention(self):
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as pool:
+            outcomes = [status for result in pool.map(self._sell_repeatedly, range(self.WORKERS)) for status in result]
+
+        with self.SessionLocal() as db:
+            stock = db.scalar(select(Inventory.stock).where(Inventory.product_id == self.product_id))
+            sold = db.scalar(select(func.sum(Sale.quantity)).where(Sale.product_id == self.product_id))
+
+        assert outcomes.count(200) == self.STOCK
+        assert set(outcomes) <= {200, 400}
+        assert sold == self.STOCK
+        assert stock == 0
+
+
+class TestProductCache:
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        self.db = test_db
+        self.product = Product(name="Cached", category="Cache", price=7.00)
+        self.db.add(self.product)
+        self.db.commit()
+        self.db.add(Inventory(product_id=self.product.id, stock=10))
+        self.db.commit()
+        self.product_id = self.product.id
+
+        self.statements = []
+        engine = self.db.get_bind()
+        listener = lambda conn, cursor, statement, *args: self.statements.append(statement)  # noqa: E731
+        event.listen(engine, "before_cursor_execute", listener)
+        yield
+        event.remove(engine, "before_cursor_execute", listener)
+
+    def _product_queries(self):
+        return [s for s in self.statements if "FROM products" in s]
+
+    def test_get_product_reads_through(self):
+        service = ProductService(self.db)
+        assert service.get_product(self.product_id).name == "Cached"
+        assert service.get_product(self.product_id).name == "Cached"
+        assert len(self._product_queries()) == 1
+
+    def test_sale_skips_product_lookup_on_hit(self):
+        ProductService(self.db).get_product(self.product_id)
+        self.statements.clear()
+
+        sale = SaleService(self.db).create_sale(
+            schemas.SaleCreate(product_id=self.product_id, quantity=2, sale_date=date(2024, 2, 2))
+        )
+
+        assert float(sale.total_amount) == 14.00
+        assert self._product_queries() == []
+
+    def test_update_invalidates(self):
+        service = ProductService(self.db)
+        service.get_product(self.product_id)
+
+        self.product.price = 8.00
+        self.db.commit()
+
+        assert float(service.get_product(self.product_id).price) == 8.00
+
+
+class TestBoundedRevenueComparison:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+
+        # Sparse, irregular history over several years, including gaps longer than a period.
+        rng = random.Random(7)
+        day = date(2019, 12, 20)
+        while day < date(2024, 3, 1):
+            category = rng.choice(["Books", "Toys"])
+            self.db.add(DailyRevenue(sale_date=day, total_amount=rng.randint(1, 500), sale_count=1))
+            self.db.add(DailyCategoryRevenue(category=category, sale_date=day, total_amount=rng.randint(1, 500)))
+            day += timedelta(days=rng.choice([1, 1, 2, 3, 9, 40]))
+        self.db.commit()
+        yield
+        self.db.close()
+        engine.dispose()
+
+    def _unbounded(self, period, category, compare_periods, start_date=None, end_date=None):
+        service = SaleService(self.db)
+        rollup = DailyCategoryRevenue if category else DailyRevenue
+        rows = service._revenue_comparison_query(rollup, period, category, start_date, end_date, compare_periods)
+        return service._format_revenue_comparison(rows, period, category)
+
+    @pytest.mark.parametrize("period", ["day", "week", "month", "year"])
+    @pytest.mark.parametrize("category", [None, "Books"])
+    def test_matches_unbounded_query(self, period, category):
+        service = SaleService(self.db)
+        for compare_periods in (1, 2, 3, 7, 60):
+            for start_date, end_date in ((None, None), (date(2021, 1, 1), date(2022, 6, 30))):
+                expected = self._unbounded(period, category, compare_periods, start_date, end_date)
+                actual = service._revenue_comparison(period, category, compare_periods, start_date, end_date)
+                assert actual == expected
+
+    def test_bounded_query_uses_index_range(self):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if "GROUP BY" in statement:
+                statements.append((statement, parameters))
+
+        connection = self.db.connection()
+        event.listen(connection.engine, "before_cursor_execute", capture)
+        try:
+            SaleService(self.db)._revenue_comparison("month", None, 2, None, None)
+        finally:
+            event.remove(connection.engine, "before_cursor_execute", capture)
+
+        # The latest-month comparison runs once, bounded by a range search on the rollup's key.
+        assert len(statements) == 1
+        statement, parameters = statements[0]
+        plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+        assert "SEARCH daily_revenue USING" in plan
+        assert "sale_date>?" in plan
+
+
+class TestSaleCategory:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        self.db = sessionmaker(bind=engine)()
+        self.products = [Product(name=f"P{n}", category=f"C{n}", price=2.00) for n in range(2)]
+        self.db.add_all(self.products)
+        self.db.commit()
+        self.db.add_all(Inventory(product_id=product.id, stock=100) for product in self.products)
+        self.db.commit()
+        yield
+        self.db.close()
+        engine.dispose()
+
+    def _sell(self, product, count=1):
+        service = SaleService(self.db)
+        for day in range(1, count + 1):
+            service.create_sale(schemas.SaleCreate(product_id=product.id, quantity=1, sale_date=date(2024, 3, day)))
+
+    def _categories(self):
+        return self.db.execute(select(Sale.product_id, Sale.category).order_by(Sale.id)).all()
+
+    def test_writes_copy_the_product_category(self):
+        self._sell(self.products[0])
+        sales = [(0, schemas.SaleCreate(product_id=self.products[1].id, quantity=1, sale_date=date(2024, 3, 2)))]
+        SaleService(self.db).create_sales_bulk(sales)
+        self.db.add(Sale(product_id=self.products[1].id, quantity=1, sale_date=date(2024, 3, 3), total_amount=2))
+        self.db.commit()
+
+        assert self._categories() == [
+            (self.products[0].id, "C0"),
+            (self.products[1].id, "C1"),
+            (self.products[1].id, "C1"),
+        ]
+
+    def test_category_filter_skips_the_join(self):
+        self._sell(self.products[0], 2)
+        self._sell(self.products[1])
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)  # noqa: E731
+        event.listen(self.db.get_bind(), "before_cursor_execute", listener)
+        try:
+            page = SaleService(self.db).get_filtered_sales(category="C0")
+        finally:
+            event.remove(self.db.get_bind(), "before_cursor_execute", listener)
+
+        assert [sale.product_id for sale in page.items] == [self.products[0].id] * 2
+        assert "JOIN" not in statements[0]
+
+    def test_product_category_change_rewrites_sales(self):
+        self._sell(self.products[0], 2)
+
+        self.products[0].category = "Renamed"
+        self.db.commit()
+
+        assert {category for _, category in self._categories()} == {"Renamed"}
+
+    def test_check_and_repair_drift(self):
+        self._sell(self.products[0], 3)
+        self._sell(self.products[1], 2)
+        # Changed behind the app's back, so no listener keeps the sales in step.
+        self.db.execute(update(Product).where(Product.id == self.products[1].id).values(category="Moved"))
+        self.db.commit()
+        service = SaleCategoryService(self.db)
+
+        count, sample = service.check(limit=1)
+        assert count == 2
+        assert sample == [{"id": 4, "product_id": self.products[1].id, "category": "C1", "expected": "Moved"}]
+
+        assert service.repair(batch_size=2) == 2
+        assert service.check() == (0, [])
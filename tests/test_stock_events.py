@@ -0,0 +1,262 @@
+import asyncio
+import json
+import threading
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app import models, schemas
+from app.async_services import AsyncInventoryService, AsyncSaleService
+from app.database import Base, get_async_url
+from app.routers.inventory import stream_stock_events
+from app.services import InventoryService, SaleService
+from app.stock_events import StockEvent, StockEventBroadcaster, stock_events
+
+
+def _change(product_id=1, stock=5, previous_stock=20, reason="sale"):
+    return StockEvent(product_id, stock, previous_stock, reason)
+
+
+def _parse(message: bytes) -> dict:
+    fields = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+    if "data" in fields:
+        fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+async def _read(stream, count: int) -> list[dict]:
+    return [_parse(await anext(stream)) for _ in range(count)]
+
+
+def _drain(subscription) -> list[StockEvent]:
+    events = []
+    while not subscription.queue.empty():
+        events.append(subscription.queue.get_nowait())
+    return events
+
+
+class TestStockEvent:
+    @pytest.mark.parametrize(
+        "previous, stock, kind",
+        [(20, 5, "low-stock"), (None, 5, "low-stock"), (5, 20, "restocked"), (5, 10, "restocked"), (8, 5, "stock")],
+    )
+    def test_kind_relative_to_threshold(self, previous, stock, kind):
+        assert _change(stock=stock, previous_stock=previous).kind(threshold=10) == kind
+
+    def test_new_inventory_above_threshold_is_a_plain_change(self):
+        assert _change(stock=50, previous_stock=None).kind(threshold=10) == "stock"
+
+
+class TestBroadcaster:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.broadcaster = StockEventBroadcaster(buffer_size=3, queue_size=2, max_subscribers=2, enabled=True)
+
+    def test_publishing_from_another_thread_reaches_each_subscriber_by_its_filter(self):
+        async def run():
+            everything = self.broadcaster.subscribe(threshold=10)
+            crossings = self.broadcaster.subscribe(threshold=10, product_ids=[1], crossings_only=True)
+            changes = [_change(1, 5, 20), _change(1, 4, 5), _change(2, 1, 30)]
+            thread = threading.Thread(target=self.broadcaster.publish, args=(changes,))
+            thread.start()
+            await asyncio.to_thread(thread.join)
+            return _drain(everything), _drain(crossings)
+
+        everything, crossings = asyncio.run(run())
+
+        assert [e.seq for e in everything] == [1, 2]  # the third overflowed the queue of two
+        assert [(e.product_id, e.stock) for e in crossings] == [(1, 5)]
+
+    def test_stream_sends_ready_then_events_with_ids(self):
+        async def run():
+            subscription = self.broadcaster.subscribe(threshold=10)
+            stream = subscription.stream(keepalive=5)
+            ready = await _read(stream, 1)
+            self.broadcaster.publish([_change(7, 3, 12, "manual adjustment")])
+            events = await _read(stream, 1)
+            await stream.aclose()
+            return ready + events
+
+        ready, event = asyncio.run(run())
+
+        assert ready["event"] == "ready"
+        assert ready["id"] == f"{self.broadcaster.epoch}-0"
+        assert event["event"] == "low-stock"
+        assert event["id"] == f"{self.broadcaster.epoch}-1"
+        assert event["data"]["product_id"] == 7
+        assert event["data"]["previous_stock"] == 12
+        assert event["data"]["reason"] == "manual adjustment"
+        assert self.broadcaster.stats()["subscribers"] == 0
+
+    def test_resume_replays_missed_events(self):
+        self.broadcaster.publish([_change(1, 9, 10), _change(1, 8, 9), _change(1, 12, 8)])
+
+        async def run():
+            subscription = self.broadcaster.subscribe(threshold=10, last_event_id=self.broadcaster.event_id(1))
+            stream = subscription.stream(keepalive=5)
+            messages = await _read(stream, 3)
+            await stream.aclose()
+            return messages
+
+        ready, *replayed = asyncio.run(run())
+
+        assert ready["event"] == "ready"
+        assert "id" not in ready  # the client keeps its own last id
+        assert [(m["id"], m["event"]) for m in replayed] == [
+            (self.broadcaster.event_id(2), "stock"),
+            (self.broadcaster.event_id(3), "restocked"),
+        ]
+
+    @pytest.mark.parametrize("last_event_id", ["0-1", "garbage", "evicted"])
+    def test_unresumable_id_gets_reset(self, last_event_id):
+        self.broadcaster.publish([_change() for _ in range(5)])
+        if last_event_id == "evicted":
+            last_event_id = self.broadcaster.event_id(1)  # only 3..5 are still buffered
+
+        async def run():
+            stream = self.broadcaster.subscribe(threshold=10, last_event_id=last_event_id).stream(keepalive=5)
+            message = await _read(stream, 1)
+            await stream.aclose()
+            return message
+
+        [reset] = asyncio.run(run())
+
+        assert reset["event"] == "reset"
+        assert reset["id"] == self.broadcaster.event_id(5)
+
+    def test_slow_subscriber_is_disconnected(self):
+        async def run():
+            subscription = self.broadcaster.subscribe(threshold=10)
+            stream = subscription.stream(keepalive=5)
+            await _read(stream, 1)
+            self.broadcaster.publish([_change() for _ in range(3)])
+            await asyncio.sleep(0)
+            return [message async for message in stream]
+
+        assert asyncio.run(run()) == []
+        assert self.broadcaster.stats()["slow_subscribers_disconnected"] == 1
+        assert self.broadcaster.stats()["subscribers"] == 0
+
+    def test_keepalive_comment_while_idle(self):
+        async def run():
+            stream = self.broadcaster.subscribe(threshold=10).stream(keepalive=0.01)
+            messages = [await anext(stream) for _ in range(2)]
+            await stream.aclose()
+            return messages
+
+        assert asyncio.run(run())[1] == b": keepalive\n\n"
+
+    def test_subscriber_limit(self):
+        async def run():
+            self.broadcaster.subscribe(threshold=10)
+            self.broadcaster.subscribe(threshold=10)
+            self.broadcaster.subscribe(threshold=10)
+
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(run())
+        assert error.value.status_code == 503
+
+
+class TestRecordedChanges:
+    @pytest.fixture(autouse=True)
+    def setup(self, test_db):
+        self.db = test_db
+        self.product = models.Product(name="Evented", category="Evented", price=Decimal("2.00"))
+        self.db.add(self.product)
+        self.db.commit()
+
+    def _collect(self, action, **subscribe):
+        async def run():
+            subscription = stock_events.subscribe(threshold=10, product_ids=[self.product.id], **subscribe)
+            try:
+                await asyncio.to_thread(action)
+                return _drain(subscription)
+            finally:
+                stock_events.unsubscribe(subscription)
+
+        return [(e.stock, e.previous_stock, e.reason) for e in asyncio.run(run())]
+
+    def test_service_writes_publish_on_commit(self):
+        def writes():
+            InventoryService(self.db).create_inventory(schemas.InventoryCreate(product_id=self.product.id, stock=12))
+            SaleService(self.db).create_sale(
+                schemas.SaleCreate(product_id=self.product.id, quantity=3, sale_date=date(2024, 7, 1))
+            )
+            InventoryService(self.db).update_inventory_stock(self.product.id, 15)
+            sale = schemas.SaleCreate(product_id=self.product.id, quantity=2, sale_date=date(2024, 7, 2))
+            SaleService(self.db).create_sales_bulk([(0, sale), (1, sale)])
+
+        assert self._collect(writes) == [
+            (12, None, "initial stock"),
+            (9, 12, "sale"),
+            (15, 9, "manual adjustment"),
+            (11, 15, "sale"),
+        ]
+
+    def test_rejected_sale_publishes_nothing(self):
+        self.db.add(models.Inventory(product_id=self.product.id, stock=1))
+        self.db.commit()
+
+        def oversell():
+            with pytest.raises(HTTPException):
+                SaleService(self.db).create_sale(
+                    schemas.SaleCreate(product_id=self.product.id, quantity=5, sale_date=date(2024, 7, 1))
+                )
+
+        assert self._collect(oversell) == []
+
+    def test_endpoint_streams_subscription(self):
+        async def run():
+            response = await stream_stock_events(threshold=3, product_id=[self.product.id], last_event_id=None)
+            ready = _parse(await anext(response.body_iterator))
+            InventoryService(self.db).create_inventory(schemas.InventoryCreate(product_id=self.product.id, stock=2))
+            event = _parse(await anext(response.body_iterator))
+            await response.body_iterator.aclose()
+            return response, ready, event
+
+        response, ready, event = asyncio.run(run())
+
+        assert response.media_type == "text/event-stream"
+        assert response.headers["Cache-Control"] == "no-cache"
+        assert ready["event"] == "ready"
+        assert event["event"] == "low-stock"
+        assert event["data"]["stock"] == 2
+
+    def test_endpoint_errors(self, client, monkeypatch):
+        monkeypatch.setattr(stock_events, "max_subscribers", 0)
+        assert client.get("/api/inventory/events").status_code == 503
+
+        monkeypatch.setattr(stock_events, "enabled", False)
+        assert client.get("/api/inventory/events").status_code == 404
+
+
+class TestAsyncRecordedChanges:
+    def test_async_services_publish_on_commit(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'events.db'}"
+        Base.metadata.create_all(bind=create_engine(url))
+
+        async def run():
+            engine = create_async_engine(get_async_url(url))
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                product = models.Product(name="Async", category="Async", price=Decimal("1.00"))
+                db.add(product)
+                await db.commit()
+                subscription = stock_events.subscribe(threshold=10, product_ids=[product.id])
+                try:
+                    inventory = AsyncInventoryService(db)
+                    await inventory.create_inventory(schemas.InventoryCreate(product_id=product.id, stock=20))
+                    await inventory.update_inventory_stock(product.id, 11)
+                    await AsyncSaleService(db).create_sale(
+                        schemas.SaleCreate(product_id=product.id, quantity=4, sale_date=date(2024, 7, 1))
+                    )
+                    await asyncio.sleep(0)
+                    return [(e.kind(10), e.stock, e.previous_stock) for e in _drain(subscription)]
+                finally:
+                    stock_events.unsubscribe(subscription)
+                    await engine.dispose()
+
+        assert asyncio.run(run()) == [("stock", 20, None), ("stock", 11, 20), ("low-stock", 7, 11)]